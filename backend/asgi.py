@@ -0,0 +1,199 @@
+from contextlib import asynccontextmanager
+from sqlalchemy import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.util import greenlet_spawn
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from itsdangerous import BadSignature
+from app import create_app
+from config import Config
+from database import db, shard_bind_key
+from extensions import load_user
+from locations import get_state_hierarchy
+from routes.analytics import build_analytics
+from routes.cri import cri_map_data
+import feed_cache
+import serializers
+import sharding
+
+# --- CONFIGURATION ---
+
+# Async driver per database backend; URIs that already name an async driver are kept
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+def async_url(url):
+    """The same database behind an async driver (e.g. sqlite:///x.db -> sqlite+aiosqlite:///x.db)."""
+    url = make_url(url)
+    if url.get_dialect().is_async:
+        return url.render_as_string(hide_password=False)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No async driver known for {backend} databases')
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def _read_config(flask_app):
+    """
+    The Flask app's configuration with every database (primary and shards)
+    switched to its async driver and pool. Engine URLs are taken from the
+    built app so relative SQLite paths resolve exactly as they do there.
+    """
+    config = dict(flask_app.config)
+    with flask_app.app_context():
+        engines = dict(db.engines)
+    config['SQLALCHEMY_DATABASE_URI'] = async_url(engines[None].url)
+    config['SQLALCHEMY_BINDS'] = {key: async_url(engine.url) for key, engine in engines.items() if key is not None}
+    config['ISSUE_SHARDS'] = {
+        name: {**spec, 'uri': config['SQLALCHEMY_BINDS'][shard_bind_key(name)]}
+        for name, spec in (flask_app.config.get('ISSUE_SHARDS') or {}).items()
+    }
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **(flask_app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}),
+        'poolclass': AsyncAdaptedQueuePool,
+        'pool_size': flask_app.config['ASYNC_DB_POOL_SIZE'],
+        'max_overflow': flask_app.config['ASYNC_DB_MAX_OVERFLOW'],
+    }
+    config['COMPRESS_STATIC'] = False  # static files are served by the Flask app
+    return config
+
+# --- READ API ---
+
+class ReadAPI:
+    """
+    The poll-heavy read endpoints on an event loop. Each request runs the
+    same synchronous code as the Flask views (models, cri_engine,
+    serializers, sharding) through SQLAlchemy's greenlet bridge, against a
+    second Flask app whose engines use the async driver: every database wait
+    yields to the loop, so an in-flight poll costs a coroutine rather than a
+    worker thread.
+    """
+
+    def __init__(self, flask_app):
+        self.app = create_app(_read_config(flask_app))
+        self.session_serializer = self.app.session_interface.get_signing_serializer(self.app)
+        self.session_cookie = self.app.config['SESSION_COOKIE_NAME']
+        self.session_max_age = int(self.app.permanent_session_lifetime.total_seconds())
+        self._locations = None
+
+    async def run(self, fn, *args):
+        """fn(*args) inside an app context, on the greenlet bridge."""
+        def call():
+            with self.app.app_context():
+                return fn(*args)
+        return await greenlet_spawn(call)
+
+    def json(self, data, status=200):
+        return Response(self.app.json.dumps(data), status_code=status, media_type='application/json')
+
+    def session_user_id(self, request):
+        """The Flask-Login user id from the signed Flask session cookie, or None."""
+        cookie = request.cookies.get(self.session_cookie)
+        if not cookie:
+            return None
+        try:
+            return self.session_serializer.loads(cookie, max_age=self.session_max_age).get('_user_id')
+        except BadSignature:
+            return None
+
+    # --- ENDPOINTS ---
+
+    async def cri_data(self, request):
+        district = request.path_params['district']
+
+        def read():
+            with sharding.use_shard(sharding.shard_for_district(district)):
+                return cri_map_data(district)
+        return self.json(await self.run(read))
+
+    async def community_feed(self, request):
+        fields, error = serializers.parse_fields(request.query_params.get('fields'), serializers.FEED_FIELDS)
+        if error:
+            return self.json({'error': error}, 400)
+        return self.json(await self.run(feed_cache.recent_issues, fields))
+
+    async def analytics(self, request):
+        user_id = self.session_user_id(request)
+        if user_id is None:
+            return self.json({'error': 'Unauthorized'}, 401)
+        try:
+            hotspot_limit = int(request.query_params['hotspots'])
+        except (KeyError, ValueError):
+            hotspot_limit = self.app.config.get('HOTSPOT_LIMIT', 5)
+
+        def read():
+            user = load_user(user_id)
+            if user is None:
+                return None
+            # Same scoping as the Flask view and its before_request shard router
+            if user.role != 'authority':
+                return build_analytics(None, hotspot_limit)
+            with sharding.use_shard(sharding.shard_for_district(user.district)):
+                return build_analytics(user.block, hotspot_limit)
+        data = await self.run(read)
+        if data is None:
+            return self.json({'error': 'Unauthorized'}, 401)
+        return self.json(data)
+
+    async def locations(self, request):
+        # Static for the life of the process: encoded once
+        if self._locations is None:
+            self._locations = self.app.json.dumps(get_state_hierarchy())
+        return Response(self._locations, media_type='application/json')
+
+    def routes(self):
+        return [
+            Route('/api/get_cri_data/{district}', self.cri_data),
+            Route('/api/community_feed', self.community_feed),
+            Route('/api/analytics', self.analytics),
+            Route('/api/locations', self.locations),
+        ]
+
+    async def close(self):
+        with self.app.app_context():
+            engines = list(db.engines.values())
+        await greenlet_spawn(lambda: [engine.dispose() for engine in engines])
+
+# --- APPLICATION FACTORIES ---
+
+def create_asgi_app(config=Config, wsgi_app=None):
+    """
+    ASGI application serving the async read API. `config` is what
+    create_app() takes. With `wsgi_app` (the Flask app), every other path is
+    passed through to it, so one process serves the whole API; without it,
+    route only the read paths here (e.g. from the reverse proxy).
+
+        uvicorn --factory asgi:create_asgi_app
+    """
+    flask_app = wsgi_app or create_app(config)
+    api = ReadAPI(flask_app)
+    routes = api.routes()
+    if wsgi_app is not None:
+        from a2wsgi import WSGIMiddleware  # only needed when mounting Flask
+        routes.append(Mount('/', app=WSGIMiddleware(wsgi_app)))
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await api.close()
+
+    middleware = [
+        Middleware(CORSMiddleware, allow_origins=flask_app.config['CORS_ORIGINS'], allow_credentials=True,
+                   allow_methods=['*'], allow_headers=['*']),
+        Middleware(GZipMiddleware, minimum_size=flask_app.config['COMPRESS_MIN_SIZE'],
+                   compresslevel=flask_app.config['COMPRESS_LEVEL']),
+    ]
+    return Starlette(routes=routes, middleware=middleware, lifespan=lifespan)
+
+def create_combined_app(config=Config):
+    """Async read API plus the Flask app for everything else, in one ASGI app.
+
+        uvicorn --factory asgi:create_combined_app
+    """
+    return create_asgi_app(config, wsgi_app=create_app(config))
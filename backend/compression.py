@@ -0,0 +1,150 @@
+import gzip
+import mimetypes
+import os
+import threading
+from flask import current_app, request, send_from_directory
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# --- CONFIGURATION ---
+
+# Encodings in server preference order; only used if the client accepts them
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+# Static text assets worth precompressing (images/videos are already compressed)
+STATIC_EXTENSIONS = ('.css', '.js', '.html', '.json', '.svg', '.txt')
+
+def available_encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+def compress(data, encoding, level):
+    """Compresses bytes; `level` is 1-9 (mapped onto brotli's 0-11 quality)."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(11, round(level * 11 / 9)))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def negotiate():
+    """Best encoding the client accepts (honouring q-values), or None."""
+    return request.accept_encodings.best_match(available_encodings())
+
+# --- DYNAMIC RESPONSES ---
+
+def compress_response(response):
+    """after_request hook: compresses JSON/text bodies above COMPRESS_MIN_SIZE."""
+    config = current_app.config
+    if (response.mimetype not in config['COMPRESS_MIMETYPES']
+            or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    if not 200 <= response.status_code < 300 or (response.content_length or 0) < config['COMPRESS_MIN_SIZE']:
+        return response
+
+    encoding = negotiate()
+    if encoding is None:
+        return response
+    response.set_data(compress(response.get_data(), encoding, config['COMPRESS_LEVEL']))
+    response.headers['Content-Encoding'] = encoding
+    # Same entity, different bytes: weak ETags still validate via make_conditional
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+# --- PRECOMPRESSED BODIES ---
+
+_bodies = {}
+_bodies_lock = threading.Lock()
+
+def precompressed(key, build):
+    """
+    Response for a payload that never changes for the life of the process
+    (e.g. the location hierarchy). `build()` returns the Response once; its
+    encoded variants are computed on first use and reused for every request.
+    """
+    with _bodies_lock:
+        variants = _bodies.get(key)
+        if variants is None:
+            response = build()
+            response.add_etag()
+            data = response.get_data()
+            variants = {'identity': data, 'mimetype': response.mimetype, 'etag': response.get_etag()[0]}
+            for encoding in available_encodings():
+                variants[encoding] = compress(data, encoding, 9)
+            _bodies[key] = variants
+
+    encoding = negotiate() if len(variants['identity']) >= current_app.config['COMPRESS_MIN_SIZE'] else None
+    response = current_app.response_class(variants[encoding or 'identity'], mimetype=variants['mimetype'])
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(variants['etag'], weak=True)
+    return response.make_conditional(request)
+
+# --- STATIC ASSETS ---
+
+def precompress_static(folder):
+    """
+    Writes .gz (and .br when brotli is installed) siblings for static text
+    assets that are missing or older than their source. Returns the number of
+    files written; an unwritable folder just means serving uncompressed.
+    """
+    written = 0
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = [d for d in dirs if d != 'uploads']
+        for name in files:
+            if not name.endswith(STATIC_EXTENSIONS):
+                continue
+            source = os.path.join(root, name)
+            for encoding in available_encodings():
+                target = source + SUFFIXES[encoding]
+                if _is_fresh(source, target):
+                    continue
+                try:
+                    with open(source, 'rb') as f:
+                        data = compress(f.read(), encoding, 9)
+                    tmp = f'{target}.tmp{os.getpid()}'
+                    with open(tmp, 'wb') as f:
+                        f.write(data)
+                    os.replace(tmp, target)
+                    written += 1
+                except OSError as e:
+                    print(f"Could not precompress {source}: {e}")
+                    return written
+    return written
+
+def _is_fresh(source, target):
+    try:
+        return os.path.getmtime(target) >= os.path.getmtime(source)
+    except OSError:
+        return False
+
+def send_static(filename):
+    """Static view: serves a fresh precompressed sibling when the client accepts it."""
+    app = current_app
+    encoding = negotiate()
+    if encoding:
+        source = safe_join(app.static_folder, filename)
+        if source and _is_fresh(source, source + SUFFIXES[encoding]):
+            response = send_from_directory(
+                app.static_folder, filename + SUFFIXES[encoding],
+                mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                max_age=app.get_send_file_max_age(filename)
+            )
+            response.headers['Content-Encoding'] = encoding
+            response.vary.add('Accept-Encoding')
+            return response
+    response = app.send_static_file(filename)
+    if filename.endswith(STATIC_EXTENSIONS):
+        response.vary.add('Accept-Encoding')
+    return response
+
+def init_app(app):
+    app.after_request(compress_response)
+    # Serving only: the siblings are written by `flask precompress-static` (at deploy time)
+    if app.static_folder and app.config.get('COMPRESS_STATIC'):
+        app.view_functions['static'] = send_static
@@ -1,34 +1,103 @@
 import os
 import sys
+import json
+
+# Load environment variables from .env file (cheap, no I/O beyond the file read)
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+    DOTENV_AVAILABLE = True
+except ImportError:
+    DOTENV_AVAILABLE = False
+
+DEV_SECRET_KEY = 'dev-insecure-key-change-in-production'
 
 class Config:
-    # SECRET_KEY configuration with security enforcement
+    # SECRET_KEY configuration with security enforcement (see check_config)
     SECRET_KEY = os.environ.get('SECRET_KEY')
-    if not SECRET_KEY:
-        # In development, provide a warning but use a development key
-        # In production, this should fail
-        if os.environ.get('FLASK_ENV') == 'production':
-            raise ValueError(
-                "SECRET_KEY environment variable must be set in production. "
-                "Generate a secure random key and set it in your .env file."
-            )
-        else:
-            print("\n" + "="*70, file=sys.stderr)
-            print("WARNING: Using insecure development SECRET_KEY!", file=sys.stderr)
-            print("Set SECRET_KEY environment variable for production use.", file=sys.stderr)
-            print("="*70 + "\n", file=sys.stderr)
-            SECRET_KEY = 'dev-insecure-key-change-in-production'
-    
+
     # SQLite Database Configuration (easier for local development)
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{os.path.join(BASE_DIR, "fixity.db")}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    
+
     # Upload Configuration
-    BASE_DIR = os.path.abspath(os.path.dirname(__file__))
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'static', 'uploads')
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'mp4', 'mov'}
 
+    # Resumable uploads (uploads.py): partial files, limits, and when unfinished ones are pruned
+    UPLOAD_PARTIAL_FOLDER = os.environ.get('UPLOAD_PARTIAL_FOLDER') or os.path.join(BASE_DIR, 'data', 'uploads_partial')
+    UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', 500 * 1024 * 1024))
+    UPLOAD_CHUNK_MAX_BYTES = int(os.environ.get('UPLOAD_CHUNK_MAX_BYTES', 8 * 1024 * 1024))
+    UPLOAD_SESSION_TTL = int(os.environ.get('UPLOAD_SESSION_TTL', 2 * 86400))
+
+    # Mail Config - Load from environment variables
+    MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
+    MAIL_PORT = int(os.environ.get('MAIL_PORT', 587))
+    MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS', 'True').lower() == 'true'
+    MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
+    MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
+
+    # Analytics: default number of rows in the hotspot table (override with ?hotspots=N)
+    HOTSPOT_LIMIT = int(os.environ.get('HOTSPOT_LIMIT', 5))
+
+    # State/district CRI rollups: server-side cache TTL and client max-age (seconds)
+    CRI_ROLLUP_CACHE_SECONDS = int(os.environ.get('CRI_ROLLUP_CACHE_SECONDS', 30))
+
+    # Partitioned Parquet snapshots for historical analytics (`flask snapshot-issues`)
+    SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR') or os.path.join(BASE_DIR, 'data', 'snapshots')
+
+    # Authority queue: how many of the riskiest open issues to return (override with ?limit=K)
+    AUTHORITY_TOP_K = int(os.environ.get('AUTHORITY_TOP_K', 50))
+
+    # CRI scoring rule sets (see data/scoring_rules.json); version None => file's "active"
+    SCORING_RULES_PATH = os.environ.get('SCORING_RULES_PATH') or os.path.join(BASE_DIR, 'data', 'scoring_rules.json')
+    SCORING_RULES_VERSION = os.environ.get('SCORING_RULES_VERSION')
+
+    # Response compression: gzip/brotli for JSON and text bodies of at least COMPRESS_MIN_SIZE bytes
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+    COMPRESS_MIMETYPES = {'application/json', 'text/html', 'text/css', 'text/javascript', 'application/javascript', 'text/csv', 'text/plain', 'image/svg+xml'}
+    # Serve fresh .gz/.br siblings of static text assets (written by `flask precompress-static`) when accepted
+    COMPRESS_STATIC = os.environ.get('COMPRESS_STATIC', 'True').lower() == 'true'
+
+    # Open mobile report endpoint: per-device token bucket (reports/minute, burst), per-IP
+    # buckets RATE_LIMIT_IP_FACTOR times larger (carrier NAT), and a host-wide cap on
+    # in-flight uploads. State is shared by all workers via RATE_LIMIT_STORE (SQLite file).
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+    RATE_LIMIT_STORE = os.environ.get('RATE_LIMIT_STORE')  # default: /dev/shm or the temp dir
+    MOBILE_REPORT_RATE = (int(os.environ.get('MOBILE_REPORTS_PER_MINUTE', 6)), int(os.environ.get('MOBILE_REPORT_BURST', 10)))
+    RATE_LIMIT_IP_FACTOR = int(os.environ.get('RATE_LIMIT_IP_FACTOR', 5))
+    MOBILE_UPLOAD_CONCURRENCY = int(os.environ.get('MOBILE_UPLOAD_CONCURRENCY', 8))
+    MOBILE_UPLOAD_LEASE_SECONDS = 120
+    MOBILE_REPORT_MAX_BYTES = int(os.environ.get('MOBILE_REPORT_MAX_BYTES', 25 * 1024 * 1024))
+
+    # Group-commit new reports (write_queue.py): batch up to N rows or MAX_DELAY_MS per commit
+    WRITE_QUEUE_ENABLED = os.environ.get('WRITE_QUEUE_ENABLED', 'False').lower() == 'true'
+    WRITE_QUEUE_MAX_BATCH = int(os.environ.get('WRITE_QUEUE_MAX_BATCH', 64))
+    WRITE_QUEUE_MAX_DELAY_MS = float(os.environ.get('WRITE_QUEUE_MAX_DELAY_MS', 5))
+    WRITE_QUEUE_TIMEOUT = 30  # seconds a request waits for its batch to commit
+
+    # Reverse geocoding of report coordinates (geocode.py). Centroids come from this
+    # JSON file when present ([{state, district, block, lat, lng}]), else from past issues
+    # filed under blocks of the location hierarchy.
+    GEOCODE_CENTROIDS_PATH = os.environ.get('GEOCODE_CENTROIDS_PATH') or os.path.join(BASE_DIR, 'data', 'block_centroids.json')
+    GEOCODE_MAX_KM = float(os.environ.get('GEOCODE_MAX_KM', 30))
+    GEOCODE_REFRESH_SECONDS = int(os.environ.get('GEOCODE_REFRESH_SECONDS', 3600))
+
+    # Optional issue sharding by district (sharding.py), as JSON:
+    # {"coastal": {"uri": "sqlite:///coastal.db", "districts": ["Puri", "Ganjam"]}}
+    # Unlisted districts, users and authorities stay in SQLALCHEMY_DATABASE_URI.
+    ISSUE_SHARDS = json.loads(os.environ.get('ISSUE_SHARDS') or '{}')
+
+    # Browser origins allowed to call the API with credentials (React dev server)
+    CORS_ORIGINS = ['http://localhost:5173', 'http://127.0.0.1:5173']
+
+    # Async read API (asgi.py): connections per database in the async driver's pool.
+    # Pollers beyond that wait on the pool without holding a thread.
+    ASYNC_DB_POOL_SIZE = int(os.environ.get('ASYNC_DB_POOL_SIZE', 10))
+    ASYNC_DB_MAX_OVERFLOW = int(os.environ.get('ASYNC_DB_MAX_OVERFLOW', 10))
+
     # Session/Cookie Security (Explicit for robustness)
     SESSION_COOKIE_SECURE = False  # Allow over HTTP
     SESSION_COOKIE_HTTPONLY = True # Prevent JS access
@@ -40,3 +109,31 @@ class DevelopmentConfig(Config):
 
 class ProductionConfig(Config):
     DEBUG = False
+
+def check_config(app):
+    """
+    Validates the loaded configuration and prints warnings.
+    Called once from create_app() instead of at import time.
+    """
+    if not DOTENV_AVAILABLE:
+        print("WARNING: python-dotenv not installed. Install with: pip install python-dotenv")
+        print("Environment variables will need to be set manually.")
+
+    if not app.config.get('SECRET_KEY'):
+        # In development, provide a warning but use a development key
+        # In production, this should fail
+        if os.environ.get('FLASK_ENV') == 'production':
+            raise ValueError(
+                "SECRET_KEY environment variable must be set in production. "
+                "Generate a secure random key and set it in your .env file."
+            )
+        print("\n" + "="*70, file=sys.stderr)
+        print("WARNING: Using insecure development SECRET_KEY!", file=sys.stderr)
+        print("Set SECRET_KEY environment variable for production use.", file=sys.stderr)
+        print("="*70 + "\n", file=sys.stderr)
+        app.config['SECRET_KEY'] = DEV_SECRET_KEY
+
+    # Validate required email configuration
+    if not app.config.get('MAIL_USERNAME') or not app.config.get('MAIL_PASSWORD'):
+        print("WARNING: Email credentials not configured. Email functionality will not work.")
+        print("Please set MAIL_USERNAME and MAIL_PASSWORD environment variables.")
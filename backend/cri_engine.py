@@ -1,56 +1,139 @@
+import os
+import json
 from datetime import datetime
 import math
 from models import Issue
 from database import db
-from sqlalchemy import func
+from sqlalchemy import case, func
+import projections
+import sharding
 
 # --- CONFIGURATION ---
 
-BASE_RISK = {
-    'Water Leakage': 6,
-    'Pothole': 5,
-    'Garbage': 3,
-    'Traffic Violation': 2,
-    # Fallbacks
-    'Other': 4
-}
+# Versioned rule sets live in data/scoring_rules.json; the built-in v1 rules
+# below (the original hardcoded weights) are used only if that file is missing.
+RULES_PATH = os.environ.get('SCORING_RULES_PATH') or os.path.join(
+    os.path.abspath(os.path.dirname(__file__)), 'data', 'scoring_rules.json'
+)
+RULES_VERSION = os.environ.get('SCORING_RULES_VERSION')  # None => file's "active"
 
-SEVERITY_MULTIPLIER = {
-    'low': 1.0,
-    'medium': 1.3,
-    'high': 1.7
+DEFAULT_RULES = {
+    'v1': {
+        'base_risk': {
+            'Water Leakage': 6,
+            'Pothole': 5,
+            'Garbage': 3,
+            'Traffic Violation': 2,
+            # Fallbacks
+            'Other': 4
+        },
+        'default_base_risk': 4,
+        'severity_multiplier': {
+            'low': 1.0,
+            'medium': 1.3,
+            'high': 1.7
+        },
+        'location_multiplier': {
+            'school': 1.5,
+            'hospital': 1.5,
+            'highway': 1.4,
+            'residential': 1.1,
+            # Fallback
+            'commercial': 1.2
+        },
+        'default_multiplier': 1.0,
+        'escalation_factor': 2
+    }
 }
 
-LOCATION_MULTIPLIER = {
-    'school': 1.5,
-    'hospital': 1.5,
-    'highway': 1.4,
-    'residential': 1.1,
-    # Fallback
-    'commercial': 1.2
-}
+class RuleSet:
+    """One immutable version of the scoring weights."""
+
+    def __init__(self, version, rules):
+        self.version = version
+        self.base_risk = rules['base_risk']
+        self.default_base_risk = rules.get('default_base_risk', 4)
+        self.severity_multiplier = rules['severity_multiplier']
+        self.location_multiplier = rules['location_multiplier']
+        self.default_multiplier = rules.get('default_multiplier', 1.0)
+        self.escalation_factor = rules.get('escalation_factor', 2)
+
+    def to_dict(self):
+        return {
+            'base_risk': self.base_risk,
+            'default_base_risk': self.default_base_risk,
+            'severity_multiplier': self.severity_multiplier,
+            'location_multiplier': self.location_multiplier,
+            'default_multiplier': self.default_multiplier,
+            'escalation_factor': self.escalation_factor
+        }
+
+_rule_sets = None
+_active_version = None
+
+def configure_rules(path=None, version=None):
+    """Points the engine at a rules file / version. Loading stays lazy."""
+    global RULES_PATH, RULES_VERSION, _rule_sets, _active_version
+    if path:
+        RULES_PATH = path
+    if version:
+        RULES_VERSION = version
+    _rule_sets = None
+    _active_version = None
+
+def _load_rules():
+    global _rule_sets, _active_version
+    try:
+        with open(RULES_PATH, 'r') as f:
+            raw = json.load(f)
+        versions = raw['versions']
+        active = raw.get('active') or sorted(versions)[-1]
+    except FileNotFoundError:
+        versions = DEFAULT_RULES
+        active = 'v1'
+
+    _rule_sets = {v: RuleSet(v, rules) for v, rules in versions.items()}
+    _active_version = RULES_VERSION or active
+    if _active_version not in _rule_sets:
+        raise ValueError(f"Scoring rule version '{_active_version}' not found in {RULES_PATH}")
+
+def get_rule_set(version=None):
+    """Returns the requested rule set, or the active one."""
+    if _rule_sets is None:
+        _load_rules()
+    if version is None:
+        version = _active_version
+    if version not in _rule_sets:
+        raise ValueError(f"Unknown scoring rule version '{version}'")
+    return _rule_sets[version]
+
+# Block CRI color bands: >= 80 red, >= 50 orange, else green
+CRI_THRESHOLDS = {'orange': 50, 'red': 80}
 
 # --- CORE LOGIC ---
 
-def calculate_issue_risk(issue, user_trust_score=1.0):
+def cri_color(total_risk):
+    if total_risk >= CRI_THRESHOLDS['red']:
+        return 'red'
+    elif total_risk >= CRI_THRESHOLDS['orange']:
+        return 'orange'
+    return 'green'
+
+def score_fields(category, severity_level, location_context, created_at, user_trust_score, rules, now=None):
     """
-    Calculates the exact risk score for an issue based on:
-    - Category Base Risk
-    - Severity & Location Context
-    - Time Decay (Logarithmic Escalation)
-    - User Trust Score
+    Pure scoring function over raw column values (no ORM objects), so it can run
+    inside the rescoring process pool as well as per request.
     """
-    
     # 1. Base Risk
-    base = BASE_RISK.get(issue.category, 4)
+    base = rules.base_risk.get(category, rules.default_base_risk)
     
     # 2. Multipliers
-    sev_mult = SEVERITY_MULTIPLIER.get(issue.severity_level, 1.0)
-    loc_mult = LOCATION_MULTIPLIER.get(issue.location_context, 1.0)
+    sev_mult = rules.severity_multiplier.get(severity_level, rules.default_multiplier)
+    loc_mult = rules.location_multiplier.get(location_context, rules.default_multiplier)
     
     # 3. Time Component (Escalation)
-    if issue.created_at:
-        delta = datetime.utcnow() - issue.created_at
+    if created_at:
+        delta = (now or datetime.utcnow()) - created_at
         
         # DEMO MODE: Use HOURS instead of DAYS for faster escalation visibility
         # Real-world would use days, but hackathon judges need to see movement.
@@ -61,9 +144,9 @@ def calculate_issue_risk(issue, user_trust_score=1.0):
     else:
         time_unit = 0
         
-    # Formula: log(hours + 1) * 2
-    # Adjusted multiplier (2 instead of 5) because hours grow faster than days.
-    time_escalation = math.log(time_unit + 1) * 2
+    # Formula: log(hours + 1) * escalation_factor
+    # Factor 2 (instead of 5) because hours grow faster than days.
+    time_escalation = math.log(time_unit + 1) * rules.escalation_factor
     
     # 4. Core Calculation
     marketing_risk = (base * sev_mult * loc_mult)
@@ -76,6 +159,34 @@ def calculate_issue_risk(issue, user_trust_score=1.0):
     
     return round(start_score, 2)
 
+def calculate_issue_risk(issue, user_trust_score=None, rules=None):
+    """
+    Calculates the exact risk score for an issue based on:
+    - Category Base Risk
+    - Severity & Location Context
+    - Time Decay (Logarithmic Escalation)
+    - User Trust Score (defaults to the issue's denormalized reporter_trust)
+    """
+    rules = rules or get_rule_set()
+    if user_trust_score is None:
+        user_trust_score = issue.reporter_trust if issue.reporter_trust is not None else 1.0
+    return score_fields(
+        issue.category, issue.severity_level, issue.location_context,
+        issue.created_at, user_trust_score, rules
+    )
+
+def apply_issue_risk(issue, user_trust_score=None, rules=None):
+    """
+    Scores the issue and records the rule version (and reporter trust, if given)
+    on it. Returns the new score.
+    """
+    rules = rules or get_rule_set()
+    if user_trust_score is not None:
+        issue.reporter_trust = user_trust_score
+    issue.severity_score = calculate_issue_risk(issue, user_trust_score, rules)
+    issue.rule_version = rules.version
+    return issue.severity_score
+
 def get_aggregated_cri_data(district_name):
     """
     Returns real aggregated CRI data for a district.
@@ -87,27 +198,31 @@ def get_aggregated_cri_data(district_name):
     # Note: Resolved issues should have severity_score = 0, so they don't contribute.
     
     # Query: Select block, SUM(severity_score) from issues where district = X group by block
+    # plus each block's open issue count and its first issue (for coordinates), in the same scan
     results = db.session.query(
         Issue.block,
-        func.sum(Issue.severity_score).label('total_risk')
+        func.sum(Issue.severity_score).label('total_risk'),
+        func.sum(case((Issue.status != 'Resolved', 1), else_=0)).label('open_count'),
+        func.min(Issue.id).label('first_id')
     ).filter(
         Issue.district == district_name
     ).group_by(Issue.block).all()
     
+    # Coordinates of those first issues: one query, two columns, no ORM objects
+    coords = {
+        row.id: (row.latitude, row.longitude)
+        for row in projections.issue_records(('id', 'latitude', 'longitude'), Issue.id.in_([r.first_id for r in results]))
+    } if results else {}
+    
     formatted_data = []
     
     # Hardcoded coords for demo/fallback (since we don't have a real geocoder for block centers)
     # We can perform a trick: clean the block name slightly or just rely on random jitter around district center if needed.
     # OR, we take the lat/lng of the *latest* issue in that block as the "center".
     
-    for block, total_risk in results:
+    for block, total_risk, open_count, first_id in results:
         # Determine color
-        if total_risk >= 80:
-            color = 'red'
-        elif total_risk >= 50:
-            color = 'orange'
-        else:
-            color = 'green'
+        color = cri_color(total_risk)
         
         # We don't have lat/lng on the block aggregation level easily unless we store it or average it.
         # For now, we will just pick a random offset from a "mock center" or skip lat/lng here
@@ -116,15 +231,7 @@ def get_aggregated_cri_data(district_name):
         # Let's average the lat/lng from issues in that block? 
         # That's expensive. Let's just grab the FIRST issue's lat/lng as a proxy for the block center.
         
-        first_issue = Issue.query.filter_by(district=district_name, block=block).first()
-        lat = first_issue.latitude if first_issue else 20.0
-        lng = first_issue.longitude if first_issue else 85.0
-        
-        # Count unresolved issues in this block
-        issue_count = Issue.query.filter_by(
-            district=district_name, 
-            block=block
-        ).filter(Issue.status != 'Resolved').count()
+        lat, lng = coords.get(first_id, (20.0, 85.0))
         
         formatted_data.append({
             'block': block,
@@ -132,7 +239,87 @@ def get_aggregated_cri_data(district_name):
             'color': color,
             'lat': lat,
             'lng': lng,
-            'issue_count': issue_count  # Add issue count for mobile app
+            'issue_count': open_count or 0  # Add issue count for mobile app
         })
         
     return formatted_data
+
+# --- HIERARCHICAL ROLLUP ---
+
+COLOR_RANK = {'green': 0, 'orange': 1, 'red': 2}
+
+def _rollup_node(name, cri, issue_count, color, children_key=None, children=None):
+    node = {'name': name, 'cri': round(cri, 1), 'issue_count': issue_count, 'color': color}
+    if children_key:
+        node[children_key] = children
+    return node
+
+def _worst_color(nodes):
+    return max((n['color'] for n in nodes), key=COLOR_RANK.get, default='green')
+
+def get_cri_rollup(hierarchy, state=None, district=None):
+    """
+    Block -> district -> state CRI aggregates from ONE grouped query.
+
+    `hierarchy` is State -> District -> [Blocks] (locations.get_state_hierarchy());
+    blocks listed there with no open issues are included as zero. Each level
+    carries the open-risk sum, unresolved count and a color: blocks use the
+    CRI_THRESHOLDS bands, districts/states take the worst color beneath them.
+    """
+    query = db.session.query(
+        Issue.district,
+        Issue.block,
+        func.sum(Issue.severity_score),
+        func.count(Issue.id)
+    ).filter(Issue.status != 'Resolved')
+    if district is not None:
+        query = query.filter(Issue.district == district)
+    else:
+        query = query.filter(Issue.state == state)
+    # Districts don't span issue shards: a district rollup is local, a state one gathers
+    rows = sharding.gather(query.group_by(Issue.district, Issue.block).all, local=district is not None)
+
+    # Start from the known hierarchy so empty blocks show up as zero
+    districts = {}
+    known = hierarchy.get(state, {})
+    for d, blocks in known.items():
+        if district is None or d == district:
+            districts[d] = {b: (0.0, 0) for b in blocks}
+    for d, block, total_risk, count in rows:
+        districts.setdefault(d, {})[block] = (total_risk or 0.0, count)
+
+    district_nodes = []
+    state_risk = 0.0
+    for d, blocks in districts.items():
+        block_nodes = [
+            _rollup_node(b, risk, count, cri_color(risk))
+            for b, (risk, count) in sorted(blocks.items(), key=lambda kv: (kv[0] is None, kv[0]))
+        ]
+        district_risk = sum((risk for risk, _ in blocks.values()), 0.0)
+        state_risk += district_risk
+        district_nodes.append(_rollup_node(
+            d,
+            district_risk,
+            sum(count for _, count in blocks.values()),
+            _worst_color(block_nodes),
+            'blocks', block_nodes
+        ))
+    district_nodes.sort(key=lambda n: (n['name'] is None, n['name']))
+
+    if district is not None:
+        if not district_nodes:
+            return _rollup_node(district, 0.0, 0, 'green', 'blocks', [])
+        node = district_nodes[0]
+        node['level'] = 'district'
+        node['state'] = state
+        return node
+
+    node = _rollup_node(
+        state,
+        state_risk,
+        sum(n['issue_count'] for n in district_nodes),
+        _worst_color(district_nodes),
+        'districts', district_nodes
+    )
+    node['level'] = 'state'
+    return node
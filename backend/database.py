@@ -1,3 +1,37 @@
+import contextvars
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import inspect
+from sqlalchemy.sql.util import find_tables
 
-db = SQLAlchemy()
+# Issue shard the current context works on (see sharding.py); None => primary database
+current_shard = contextvars.ContextVar('current_shard', default=None)
+
+# Tables that always live in the primary database, whichever shard is active
+GLOBAL_TABLES = frozenset({'users', 'authorities', 'upload_sessions'})
+
+def shard_bind_key(name):
+    return f'shard_{name}'
+
+class ShardedSession(Session):
+    """
+    Session that sends statements to the active issue shard's engine, except
+    for statements that only touch GLOBAL_TABLES. Without an active shard (or
+    with sharding off) it behaves exactly like Flask-SQLAlchemy's Session.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        shard = current_shard.get()
+        if bind is None and shard is not None and not _only_global(mapper, clause):
+            return self._db.engines[shard_bind_key(shard)]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def _only_global(mapper, clause):
+    if mapper is not None:
+        return inspect(mapper).local_table.name in GLOBAL_TABLES
+    if clause is not None:
+        names = {table.name for table in find_tables(clause, include_crud=True) if hasattr(table, 'name')}
+        return bool(names) and names <= GLOBAL_TABLES
+    return False
+
+db = SQLAlchemy(session_options={'class_': ShardedSession})
@@ -1,4 +1,8 @@
-from app import app, db, User, Authority
+from app import create_app
+from database import db
+from models import User, Authority
+
+app = create_app()
 
 with app.app_context():
     print("\n--- CITIZENS ---")
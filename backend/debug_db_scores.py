@@ -1,4 +1,8 @@
-from app import app, db, Issue
+from app import create_app
+from database import db
+from models import Issue
+
+app = create_app()
 
 with app.app_context():
     issues = Issue.query.filter(Issue.status != 'Resolved').all()
@@ -0,0 +1,202 @@
+from datetime import datetime, timedelta
+from flask import has_request_context
+from flask_login import current_user
+from sqlalchemy import event, inspect, insert, select
+from sqlalchemy.orm import Session
+from database import db
+from models import Issue, IssueEvent
+from resolution_stats import QuantileSketch, PERCENTILES
+import sharding
+
+# --- WRITE PATH ---
+
+def record_events(connection, rows):
+    """
+    Appends issue_events rows (dicts with issue_id, block, kind, prev_status,
+    status, prev_score, score and optionally authority_id / ts) in one
+    executemany INSERT on `connection`.
+    """
+    if not rows:
+        return
+    now = datetime.utcnow()
+    connection.execute(insert(IssueEvent.__table__), [
+        {'authority_id': None, 'ts': now, **row} for row in rows
+    ])
+
+def score_events(updates, previous, block_of, status_of=None):
+    """
+    Score-change events for a Core executemany of {'b_id', 'b_score'} dicts.
+    `previous` maps issue id -> old score; `block_of` / `status_of` map id ->
+    block / status (status defaults to 'Pending' for the open-only bulk paths).
+    """
+    status_of = status_of or {}
+    return [
+        {
+            'issue_id': params['b_id'], 'block': block_of.get(params['b_id']), 'kind': 'score',
+            'prev_status': status_of.get(params['b_id'], 'Pending'), 'status': status_of.get(params['b_id'], 'Pending'),
+            'prev_score': previous.get(params['b_id']), 'score': params['b_score']
+        }
+        for params in updates
+    ]
+
+def _actor_id():
+    if has_request_context() and getattr(current_user, 'role', None) == 'authority':
+        return current_user.id
+    return None
+
+def _previous(attr):
+    history = attr.history
+    return history.deleted[0] if history.deleted else attr.value
+
+@event.listens_for(Session, 'after_flush')
+def _record_issue_changes(session, flush_context):
+    # ORM writes (submit, update_status): one event per new issue and per
+    # status/score change, written in the same transaction
+    rows = []
+    for obj in session.new:
+        if isinstance(obj, Issue):
+            rows.append({
+                'issue_id': obj.id, 'block': obj.block, 'kind': 'created',
+                'prev_status': None, 'status': obj.status, 'prev_score': None, 'score': obj.severity_score
+            })
+    for obj in session.dirty:
+        if not isinstance(obj, Issue):
+            continue
+        attrs = inspect(obj).attrs
+        status_changed = attrs.status.history.has_changes()
+        if not status_changed and not attrs.severity_score.history.has_changes():
+            continue
+        rows.append({
+            'issue_id': obj.id, 'block': obj.block, 'kind': 'status' if status_changed else 'score',
+            'prev_status': _previous(attrs.status), 'status': obj.status,
+            'prev_score': _previous(attrs.severity_score), 'score': obj.severity_score
+        })
+    if rows:
+        actor = _actor_id()
+        record_events(session.connection(), [{**row, 'authority_id': actor} for row in rows])
+
+# --- SLA METRICS ---
+
+def _scope(block):
+    return [IssueEvent.block == block] if block is not None else []
+
+def _summary(sketch):
+    summary = {'count': sketch.count, 'avg_seconds': sketch.total / sketch.count if sketch.count else None}
+    for p in PERCENTILES:
+        summary[f'p{p}_seconds'] = sketch.quantile(p / 100)
+    return summary
+
+def _sla_sketches(block, since, now):
+    """
+    (time_in_state, open, turnaround) sketch dicts and the reopen count for
+    the active shard, from one (block, ts) range scan of issue_events (joined
+    to issues by primary key for creation times).
+    """
+    rows = db.session.execute(
+        select(IssueEvent.issue_id, IssueEvent.prev_status, IssueEvent.status, IssueEvent.authority_id,
+               IssueEvent.ts, Issue.created_at)
+        .outerjoin(Issue, Issue.id == IssueEvent.issue_id)
+        .where(*_scope(block), IssueEvent.ts >= since, IssueEvent.kind != 'score')
+        .order_by(IssueEvent.ts, IssueEvent.id)
+    ).all()
+
+    in_state = {}
+    still_open = {}
+    turnaround = {}
+    reopened = 0
+    entered = {}  # issue_id -> (status, ts) of its current state
+
+    for issue_id, prev_status, status, authority_id, ts, created_at in rows:
+        if issue_id in entered:
+            state, start = entered[issue_id]
+            in_state.setdefault(state, QuantileSketch()).add((ts - start).total_seconds())
+        entered[issue_id] = (status, ts)
+        if prev_status == 'Resolved' and status != 'Resolved':
+            reopened += 1
+        if status == 'Resolved' and prev_status != 'Resolved' and created_at is not None:
+            turnaround.setdefault(authority_id, QuantileSketch()).add((ts - created_at).total_seconds())
+
+    for status, start in entered.values():
+        if status != 'Resolved':
+            still_open.setdefault(status, QuantileSketch()).add((now - start).total_seconds())
+
+    return in_state, still_open, turnaround, reopened
+
+def _merge_sketches(into, sketches):
+    for key, sketch in sketches.items():
+        into.setdefault(key, QuantileSketch()).merge(sketch)
+
+def sla_metrics(block=None, since=None, now=None, local=False):
+    """
+    Time-in-state distributions, reopen count and per-authority turnaround for
+    status events since `since`, merged over issue shards (`local`: active
+    shard only, when the caller knows it owns `block`). An issue's events live
+    in its own shard, so per-shard sketches merge exactly.
+
+    A state interval counts once the issue leaves that state inside the window;
+    intervals still running at `now` are reported separately as `open`.
+    """
+    now = now or datetime.utcnow()
+    since = since or now - timedelta(days=30)
+
+    in_state = {}
+    still_open = {}
+    turnaround = {}
+    reopened = 0
+    for shard_in_state, shard_open, shard_turnaround, shard_reopened in sharding.scatter(
+        lambda: _sla_sketches(block, since, now), local=local
+    ):
+        _merge_sketches(in_state, shard_in_state)
+        _merge_sketches(still_open, shard_open)
+        _merge_sketches(turnaround, shard_turnaround)
+        reopened += shard_reopened
+
+    return {
+        'since': since.isoformat(),
+        'time_in_state': {state: _summary(sketch) for state, sketch in sorted(in_state.items())},
+        'open': {state: _summary(sketch) for state, sketch in sorted(still_open.items())},
+        'reopened': reopened,
+        'turnaround_by_authority': [
+            {'authority_id': authority_id, **_summary(sketch)}
+            for authority_id, sketch in sorted(turnaround.items(), key=lambda item: (item[0] is None, item[0] or 0))
+        ]
+    }
+
+# --- TREND ---
+
+def _contribution(status, score):
+    return (score or 0.0) if status is not None and status != 'Resolved' else 0.0
+
+def daily_risk_trend(block=None, days=7, now=None):
+    """
+    Total open risk at the end of each of the last `days` days, oldest first,
+    as [(date, total)]. Starts from the current open total and replays the
+    window's events backwards (each event knows its before/after state).
+    """
+    now = now or datetime.utcnow()
+    today = now.date()
+    first_day = today - timedelta(days=days - 1)
+    window_start = datetime(first_day.year, first_day.month, first_day.day)
+
+    open_total = db.session.query(db.func.coalesce(db.func.sum(Issue.severity_score), 0.0)).filter(
+        Issue.status != 'Resolved', *([Issue.block == block] if block is not None else [])
+    ).scalar()
+    events = db.session.execute(
+        select(IssueEvent.ts, IssueEvent.prev_status, IssueEvent.status, IssueEvent.prev_score, IssueEvent.score)
+        .where(*_scope(block), IssueEvent.ts > window_start)
+        .order_by(IssueEvent.ts.desc(), IssueEvent.id.desc())
+    ).all()
+
+    totals = []
+    total = open_total
+    position = 0
+    for offset in range(days):
+        day = today - timedelta(days=offset)
+        end_of_day = datetime(day.year, day.month, day.day) + timedelta(days=1)
+        # Undo every event after the end of this day
+        while position < len(events) and events[position][0] >= end_of_day:
+            _, prev_status, status, prev_score, score = events[position]
+            total += _contribution(prev_status, prev_score) - _contribution(status, score)
+            position += 1
+        totals.append((day, round(total, 2)))
+    return list(reversed(totals))
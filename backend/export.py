@@ -0,0 +1,154 @@
+import csv
+import io
+import json
+from datetime import datetime
+from sqlalchemy import select
+from database import db
+from models import Issue
+import sharding
+
+# --- CONFIGURATION ---
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Exported columns (no reporter identity)
+EXPORT_COLUMNS = [
+    'id', 'title', 'description', 'category', 'severity_level', 'location_context',
+    'status', 'severity_score', 'rule_version', 'latitude', 'longitude',
+    'state', 'district', 'block', 'image_path', 'created_at', 'resolved_at'
+]
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+# --- QUERY ---
+
+def jurisdiction_filters(authority):
+    """An authority exports its block; a district/state office (no block) its district/state."""
+    if authority.block:
+        return [Issue.block == authority.block]
+    if authority.district:
+        return [Issue.district == authority.district]
+    if authority.state:
+        return [Issue.state == authority.state]
+    return [Issue.id == None]  # no jurisdiction => nothing
+
+def build_export_query(scope, district=None, block=None, status=None, date_from=None, date_to=None):
+    stmt = select(*[getattr(Issue, c) for c in EXPORT_COLUMNS]).where(*scope)
+    if district:
+        stmt = stmt.where(Issue.district == district)
+    if block:
+        stmt = stmt.where(Issue.block == block)
+    if status:
+        stmt = stmt.where(Issue.status == status)
+    if date_from:
+        stmt = stmt.where(Issue.created_at >= date_from)
+    if date_to:
+        stmt = stmt.where(Issue.created_at < date_to)
+    return stmt.order_by(Issue.id)
+
+def iter_chunks(stmt, chunk_size=EXPORT_CHUNK_SIZE):
+    """Streams result rows in fixed-size lists using a server-side cursor."""
+    result = db.session.execute(stmt.execution_options(yield_per=chunk_size))
+    for partition in result.partitions(chunk_size):
+        yield partition
+
+def iter_all_shards(stmt, chunk_size=EXPORT_CHUNK_SIZE):
+    """iter_chunks over every issue shard in turn (shard ids are disjoint ranges, so still in id order)."""
+    for shard in sharding.shard_names():
+        with sharding.use_shard(shard):
+            yield from iter_chunks(stmt, chunk_size)
+
+# --- ENCODERS (each yields bytes, one piece per chunk) ---
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def stream_ndjson(chunks):
+    for rows in chunks:
+        yield ''.join(
+            json.dumps({c: _json_value(v) for c, v in zip(EXPORT_COLUMNS, row)}) + '\n'
+            for row in rows
+        ).encode('utf-8')
+
+def stream_csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in chunks:
+        writer.writerows([_json_value(v) for v in row] for row in rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+class _ByteSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the generator."""
+
+    def __init__(self):
+        self.pieces = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.pieces.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.pieces)
+        self.pieces = []
+        return data
+
+def parquet_available():
+    try:
+        import pyarrow
+        return True
+    except ImportError:
+        return False
+
+def stream_parquet(chunks):
+    """One Parquet row group per chunk, flushed to the client as it is written."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('id', pa.int64()), ('title', pa.string()), ('description', pa.string()),
+        ('category', pa.string()), ('severity_level', pa.string()), ('location_context', pa.string()),
+        ('status', pa.string()), ('severity_score', pa.float64()), ('rule_version', pa.string()),
+        ('latitude', pa.float64()), ('longitude', pa.float64()),
+        ('state', pa.string()), ('district', pa.string()), ('block', pa.string()),
+        ('image_path', pa.string()),
+        ('created_at', pa.timestamp('us')), ('resolved_at', pa.timestamp('us'))
+    ])
+
+    sink = _ByteSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for rows in chunks:
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                schema=schema
+            ))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+ENCODERS = {
+    'ndjson': stream_ndjson,
+    'csv': stream_csv,
+    'parquet': stream_parquet
+}
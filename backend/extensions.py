@@ -0,0 +1,17 @@
+from flask_login import LoginManager
+from flask_mail import Mail
+
+# Extension instances are created unbound and attached in create_app(),
+# so importing them never needs an application.
+mail = Mail()
+login_manager = LoginManager()
+login_manager.login_view = 'auth.login_page'
+
+@login_manager.user_loader
+def load_user(user_id):
+    from models import User, Authority
+    # Try finding in User table first, then Authority
+    user = User.query.get(int(user_id))
+    if user:
+        return user
+    return Authority.query.get(int(user_id))
@@ -0,0 +1,209 @@
+import threading
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from database import db, current_shard
+from models import Issue, IssueTombstone
+import serializers
+import sharding
+import sync
+
+# --- CONFIGURATION ---
+
+# Issues the public feed shows (and the buffer keeps)
+FEED_LIMIT = 50
+
+# Every field ?fields= may ask for is kept, so projections are served from memory too
+BUFFER_FIELDS = tuple(serializers.ISSUE_FIELDS)
+
+# Changes fetched to catch up with other workers; beyond this the buffer is reloaded
+MAX_DELTA = 500
+
+def _sort_key(item):
+    # created_at is an ISO string here; same-format ISO strings sort chronologically
+    return (item['created_at'] or '', item['id'])
+
+# --- RING BUFFER ---
+
+class FeedBuffer:
+    """
+    The newest `size` issues, serialized, newest first.
+
+    The buffer remembers the change sequence position (sync.py) of each issue
+    shard it reflects. A read compares that with the current head (one
+    primary-key read per shard): equal => the feed is a copy from memory;
+    behind => only issues with a higher change_seq are fetched and merged in,
+    new ones inserted in order and changed ones patched in place. Commits in
+    this process are applied directly after commit (see _apply_pending), so
+    the writing worker doesn't need even that delta.
+
+    Every issue carries the change_seq it was read at and an older version
+    never overwrites a newer one, so concurrent catch-ups can't go backwards.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.lock = threading.Lock()
+        self.entries = deque(maxlen=size)  # (sort key, issue id), newest first
+        self.items = {}  # issue id -> item dict
+        self.seqs = {}  # issue id -> change_seq of that item
+        self.heads = None  # {shard: change_seq} reflected; None => (re)load on next read
+
+    def is_current(self, heads):
+        return self.heads is not None and all(self.heads.get(shard, 0) >= seq for shard, seq in heads.items())
+
+    def put(self, issue_id, seq, item):
+        """Inserts or patches one issue (call with the lock held)."""
+        if self.seqs.get(issue_id, -1) >= seq:
+            return
+        key = _sort_key(item)
+        current = self.items.get(issue_id)
+        if current is not None:
+            if _sort_key(current) == key:
+                current.update(item)
+                self.seqs[issue_id] = seq
+                return
+            self.entries.remove((_sort_key(current), issue_id))
+            del self.items[issue_id], self.seqs[issue_id]
+        if len(self.entries) == self.size:
+            if key < self.entries[-1][0]:
+                return  # older than everything kept
+            _, evicted = self.entries.pop()
+            del self.items[evicted], self.seqs[evicted]
+        position = next((i for i, (k, _) in enumerate(self.entries) if k < key), len(self.entries))
+        self.entries.insert(position, (key, issue_id))
+        self.items[issue_id] = item
+        self.seqs[issue_id] = seq
+
+    def replace(self, heads, changes):
+        """Swaps in a full load taken at `heads`, unless the buffer is already past it."""
+        if self.heads is not None and not all(seq >= self.heads.get(shard, 0) for shard, seq in heads.items()):
+            return
+        self.entries.clear()
+        self.items.clear()
+        self.seqs.clear()
+        for issue_id, seq, item in changes:
+            self.put(issue_id, seq, item)
+        self.heads = dict(heads)
+
+    def merge(self, heads, changes, deleted):
+        """Applies a delta; returns False when it removed a kept issue (reload instead)."""
+        if self.heads is None or any(issue_id in self.items for issue_id in deleted):
+            return False
+        for issue_id, seq, item in changes:
+            self.put(issue_id, seq, item)
+        for shard, seq in heads.items():
+            self.heads[shard] = max(self.heads.get(shard, 0), seq)
+        return True
+
+    def copy(self, fields, limit):
+        return [{f: self.items[issue_id][f] for f in fields} for _, issue_id in islice(self.entries, limit)]
+
+_buffer = FeedBuffer(FEED_LIMIT)
+
+# --- DATABASE READS (never under the buffer lock: the async read API runs them on its event loop) ---
+
+def _read_heads():
+    return dict(sharding.scatter(lambda: (current_shard.get(), sync.current_sequence(db.session.connection()))))
+
+def _load():
+    stmt = serializers.select_issues(BUFFER_FIELDS, extra=(Issue.id, Issue.change_seq, Issue.created_at)).order_by(
+        Issue.created_at.desc()
+    ).limit(_buffer.size)
+    rows = sharding.gather(lambda: db.session.execute(stmt).all(), key=lambda row: row[-1] or datetime.min, reverse=True, limit=_buffer.size)
+    return [(row[-3], row[-2] or 0, item) for row, item in zip(rows, serializers.rows_to_dicts(rows, BUFFER_FIELDS))]
+
+def _changes_since(heads):
+    """(changes, deleted ids) committed after `heads` in every shard, or None if there are too many."""
+    def shard_changes():
+        since = heads.get(current_shard.get(), 0)
+        rows = db.session.execute(
+            serializers.select_issues(BUFFER_FIELDS, extra=(Issue.id, Issue.change_seq)).where(
+                Issue.change_seq > since
+            ).order_by(Issue.change_seq).limit(MAX_DELTA + 1)
+        ).all()
+        deleted = db.session.execute(
+            select(IssueTombstone.issue_id).where(IssueTombstone.change_seq > since)
+        ).scalars().all()
+        return rows, deleted
+
+    changes = []
+    deleted = set()
+    for rows, shard_deleted in sharding.scatter(shard_changes):
+        if len(rows) > MAX_DELTA:
+            return None
+        changes += [(row[-2], row[-1], item) for row, item in zip(rows, serializers.rows_to_dicts(rows, BUFFER_FIELDS))]
+        deleted.update(shard_deleted)
+    # A tombstone also marks an issue leaving a block; if its row changed too, it still exists
+    return changes, deleted - {issue_id for issue_id, _, _ in changes}
+
+def recent_issues(fields, limit=FEED_LIMIT):
+    """
+    The newest `limit` (at most FEED_LIMIT) issues as dicts of `fields`,
+    from memory after a version check.
+    """
+    heads = _read_heads()
+    with _buffer.lock:
+        if _buffer.is_current(heads):
+            return _buffer.copy(fields, limit)
+        since = dict(_buffer.heads) if _buffer.heads is not None else None
+
+    delta = _changes_since(since) if since is not None else None
+    with _buffer.lock:
+        applied = delta is not None and _buffer.merge(heads, *delta)
+    if not applied:
+        changes = _load()
+        with _buffer.lock:
+            _buffer.replace(heads, changes)
+    with _buffer.lock:
+        return _buffer.copy(fields, limit)
+
+# --- LOCAL WRITES ---
+
+@event.listens_for(Session, 'after_flush')
+def _track_feed_changes(session, flush_context):
+    # New and changed issues are serialized now (after commit they're expired)
+    # and applied once the transaction commits.
+    changes = []
+    seqs = []
+    deleted = []
+    for obj in session.new:
+        if isinstance(obj, IssueTombstone):
+            seqs.append(obj.change_seq)
+            deleted.append(obj.issue_id)
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Issue) or obj.change_seq is None:
+            continue
+        if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+            continue
+        changes.append((obj.id, obj.change_seq, serializers.object_to_dict(obj, BUFFER_FIELDS)))
+        seqs.append(obj.change_seq)
+    if seqs:
+        session.info.setdefault('feed_pending', []).append((current_shard.get(), seqs, changes, deleted))
+
+@event.listens_for(Session, 'after_commit')
+def _apply_pending(session):
+    pending = session.info.pop('feed_pending', None)
+    if not pending:
+        return
+    by_shard = {}
+    for shard, seqs, changes, deleted in pending:
+        entry = by_shard.setdefault(shard, ([], [], []))
+        entry[0].extend(seqs)
+        entry[1].extend(changes)
+        entry[2].extend(deleted)
+    with _buffer.lock:
+        for shard, (seqs, changes, deleted) in by_shard.items():
+            # Only if these are exactly the next numbers after what the buffer
+            # reflects; otherwise the next read catches up from the database
+            if _buffer.heads is None or _buffer.heads.get(shard, 0) != min(seqs) - 1 or len(set(seqs)) != max(seqs) - min(seqs) + 1:
+                continue
+            deleted = set(deleted) - {issue_id for issue_id, _, _ in changes}
+            if not _buffer.merge({shard: max(seqs)}, changes, deleted):
+                _buffer.heads = None
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending(session):
+    session.info.pop('feed_pending', None)
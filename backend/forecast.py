@@ -0,0 +1,104 @@
+from datetime import datetime
+import numpy as np
+from database import db
+from models import Issue
+import cri_engine
+
+# --- CONFIGURATION ---
+
+MAX_HORIZON_HOURS = 24 * 30
+MAX_STEPS = 2000
+# Bisection rounds for threshold crossings (horizon / 2^40 is far below a second)
+CROSSING_ITERATIONS = 40
+
+# --- CORE LOGIC ---
+
+def _block_risk_at(static, hours0, trust, escalation_factor, block_idx, n_blocks, offsets):
+    """
+    Block CRI at per-block time offsets (hours from now) as one vector op:
+    sum over the block's issues of (static + f*log(h0 + t + 1)) * trust.
+    """
+    t = offsets[block_idx]
+    risk = (static + escalation_factor * np.log1p(hours0 + t)) * trust
+    return np.bincount(block_idx, weights=risk, minlength=n_blocks)
+
+def forecast_district(district_name, horizon_hours=24, step_hours=1, now=None):
+    """
+    Projects every block's CRI over the next `horizon_hours`.
+    The time term log(hours + 1) * f is closed-form, so the projection is exact:
+    one (issues x time steps) matrix for the curves, and a vectorized bisection
+    across all blocks for the moment each CRI_THRESHOLDS band is crossed.
+    """
+    now = now or datetime.utcnow()
+    rules = cri_engine.get_rule_set()
+
+    rows = db.session.query(
+        Issue.block, Issue.category, Issue.severity_level, Issue.location_context,
+        Issue.created_at, Issue.reporter_trust
+    ).filter(
+        Issue.district == district_name,
+        Issue.status != 'Resolved'
+    ).all()
+
+    steps = np.arange(0, horizon_hours + step_hours / 2, step_hours, dtype=float)
+
+    blocks = sorted({r[0] for r in rows}, key=lambda b: (b is None, b))
+    if not rows:
+        return {'hours': steps.tolist(), 'blocks': []}
+
+    block_pos = {b: i for i, b in enumerate(blocks)}
+    n_blocks = len(blocks)
+
+    # Per-issue constants (one pass over rows; everything after is NumPy)
+    block_idx = np.fromiter((block_pos[r[0]] for r in rows), dtype=np.int64, count=len(rows))
+    static = np.fromiter((
+        rules.base_risk.get(category, rules.default_base_risk)
+        * rules.severity_multiplier.get(severity, rules.default_multiplier)
+        * rules.location_multiplier.get(location, rules.default_multiplier)
+        for _, category, severity, location, _, _ in rows
+    ), dtype=float, count=len(rows))
+    hours0 = np.fromiter((
+        max(0.0, (now - created_at).total_seconds() / 3600) if created_at else 0.0
+        for _, _, _, _, created_at, _ in rows
+    ), dtype=float, count=len(rows))
+    trust = np.fromiter((1.0 if r[5] is None else r[5] for r in rows), dtype=float, count=len(rows))
+    f = rules.escalation_factor
+
+    # Curves: (issues x steps) matrix, summed per block
+    issue_curves = (static[:, None] + f * np.log1p(hours0[:, None] + steps[None, :])) * trust[:, None]
+    order = np.argsort(block_idx, kind='stable')
+    starts = np.searchsorted(block_idx[order], np.arange(n_blocks))
+    curves = np.add.reduceat(issue_curves[order], starts, axis=0)
+
+    # Threshold crossings: curves are non-decreasing, so bisect each block
+    # between "now" and the horizon where the band is crossed within it
+    crossings = {}
+    horizon = steps[-1]
+    for band, threshold in cri_engine.CRI_THRESHOLDS.items():
+        at_now = curves[:, 0] >= threshold
+        at_end = curves[:, -1] >= threshold
+        lo = np.zeros(n_blocks)
+        hi = np.full(n_blocks, horizon)
+        for _ in range(CROSSING_ITERATIONS):
+            mid = (lo + hi) / 2
+            above = _block_risk_at(static, hours0, trust, f, block_idx, n_blocks, mid) >= threshold
+            hi = np.where(above, mid, hi)
+            lo = np.where(above, lo, mid)
+        when = np.where(at_now, 0.0, np.where(at_end, hi, np.nan))
+        crossings[band] = when
+
+    result = []
+    for i, block in enumerate(blocks):
+        cri_now = float(curves[i, 0])
+        result.append({
+            'block': block,
+            'cri': round(cri_now, 1),
+            'color': cri_engine.cri_color(cri_now),
+            'curve': np.round(curves[i], 1).tolist(),
+            'crossings': {
+                band: (None if np.isnan(when[i]) else round(float(when[i]), 3))
+                for band, when in crossings.items()
+            }
+        })
+
+    return {'hours': steps.tolist(), 'blocks': result}
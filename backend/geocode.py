@@ -0,0 +1,169 @@
+import json
+import math
+import os
+import statistics
+import threading
+import time
+from flask import current_app
+from sqlalchemy import select
+from database import db
+from models import Issue
+from locations import get_state_hierarchy
+import sharding
+
+# --- CONFIGURATION ---
+
+# Grid cell size in degrees (~28 km at Odisha's latitude); blocks are 10-40 km across
+CELL_DEGREES = 0.25
+
+# Issues sampled per shard (most recent first) when centroids are learned from issue coordinates
+CENTROID_SAMPLE = 200000
+
+EARTH_RADIUS_KM = 6371.0
+
+# --- GRID INDEX ---
+
+class GridIndex:
+    """
+    Uniform lat/lng grid over named points. A nearest-neighbour query scans
+    the query's cell, then rings of cells around it, and stops once the
+    nearest point found is closer than anything the next ring could hold.
+    """
+
+    def __init__(self, points, cell_degrees=CELL_DEGREES):
+        self.cell = cell_degrees
+        self.cells = {}
+        for lat, lng, payload in points:
+            self.cells.setdefault(self._cell(lat, lng), []).append((lat, lng, payload))
+        self.size = len(points)
+
+    def _cell(self, lat, lng):
+        return (int(math.floor(lat / self.cell)), int(math.floor(lng / self.cell)))
+
+    @staticmethod
+    def distance_km(lat1, lng1, lat2, lng2):
+        # Equirectangular approximation: well under 1% error at block scale
+        x = math.radians(lng2 - lng1) * math.cos(math.radians((lat1 + lat2) / 2))
+        y = math.radians(lat2 - lat1)
+        return EARTH_RADIUS_KM * math.hypot(x, y)
+
+    def nearest(self, lat, lng, max_km):
+        """(payload, distance_km) of the nearest point within `max_km`, or None."""
+        if not self.cells:
+            return None
+        ci, cj = self._cell(lat, lng)
+        # A cell is at least this many km tall/wide (longitude shrinks with latitude)
+        cell_km = self.cell * math.pi / 180 * EARTH_RADIUS_KM * max(0.1, math.cos(math.radians(abs(lat) + self.cell)))
+        max_ring = int(max_km / cell_km) + 1
+        best = None
+        for ring in range(max_ring + 1):
+            if best is not None and best[1] <= (ring - 1) * cell_km:
+                break
+            for i in range(ci - ring, ci + ring + 1):
+                for j in range(cj - ring, cj + ring + 1):
+                    if ring and abs(i - ci) != ring and abs(j - cj) != ring:
+                        continue  # interior cells were scanned in earlier rings
+                    for plat, plng, payload in self.cells.get((i, j), ()):
+                        d = self.distance_km(lat, lng, plat, plng)
+                        if d <= max_km and (best is None or d < best[1]):
+                            best = (payload, d)
+        return best
+
+# --- CENTROIDS ---
+
+def _file_centroids(path):
+    """[(lat, lng, (state, district, block))] from a centroid file: a JSON list of
+    {state, district, block, lat, lng} objects."""
+    with open(path, 'r') as f:
+        rows = json.load(f)
+    return [(float(r['lat']), float(r['lng']), (r['state'], r['district'], r['block'])) for r in rows]
+
+def _issue_centroids():
+    """
+    Block centroids learned from reported coordinates: the per-coordinate
+    median of recent issues in each block, so a minority of misfiled reports
+    can't drag a centroid away. Only blocks in the location hierarchy are
+    learned: issues filed wholesale under a block that doesn't exist (the old
+    Pune/Wakad default, with Odisha coordinates) would otherwise form a
+    centroid of their own and keep attracting new reports.
+    """
+    known = {
+        (state, district, block)
+        for state, districts in get_state_hierarchy().items()
+        for district, blocks in districts.items()
+        for block in blocks
+    }
+    stmt = (
+        select(Issue.state, Issue.district, Issue.block, Issue.latitude, Issue.longitude)
+        .where(Issue.block.isnot(None), Issue.latitude.isnot(None), Issue.longitude.isnot(None),
+               (Issue.latitude != 0) | (Issue.longitude != 0))
+        .order_by(Issue.id.desc()).limit(CENTROID_SAMPLE)
+    )
+    # Every shard's own recent sample: blocks don't span shards, and a report
+    # is geocoded before it is routed, so sharded districts must be learned too
+    rows = sharding.gather(lambda: db.session.execute(stmt).all())
+    groups = {}
+    for state, district, block, lat, lng in rows:
+        if (state, district, block) not in known:
+            continue
+        groups.setdefault((state, district, block), []).append((lat, lng))
+    return [
+        (statistics.median(p[0] for p in points), statistics.median(p[1] for p in points), key)
+        for key, points in groups.items()
+    ]
+
+def load_centroids():
+    """Centroids from GEOCODE_CENTROIDS_PATH when that file exists, else learned from issues."""
+    path = current_app.config.get('GEOCODE_CENTROIDS_PATH')
+    if path and os.path.exists(path):
+        return _file_centroids(path)
+    return _issue_centroids()
+
+_index = None
+_built_at = 0.0
+_building = False
+_lock = threading.Lock()
+
+def get_index():
+    """
+    The process-wide index, built on first use and refreshed every
+    GEOCODE_REFRESH_SECONDS. The rebuild runs outside the lock in whichever
+    request notices it is due; other requests keep using the current index
+    meanwhile, and the new one is swapped in when ready.
+    """
+    global _index, _built_at, _building
+    refresh = current_app.config.get('GEOCODE_REFRESH_SECONDS', 3600)
+    with _lock:
+        if _index is not None and (_building or time.monotonic() - _built_at <= refresh):
+            return _index
+        _building = True
+    try:
+        index = GridIndex(load_centroids())
+    except Exception:
+        with _lock:
+            _building = False
+        raise
+    with _lock:
+        _index, _built_at, _building = index, time.monotonic(), False
+        return index
+
+# --- LOOKUP ---
+
+def reverse_geocode(lat, lng):
+    """(state, district, block) of the nearest known block centroid, or None."""
+    if lat is None or lng is None or (lat == 0 and lng == 0):
+        return None
+    found = get_index().nearest(lat, lng, current_app.config.get('GEOCODE_MAX_KM', 30))
+    return found[0] if found else None
+
+def fill_location(state, district, block, lat, lng):
+    """
+    Location names for a new report: what the client sent, otherwise the
+    reverse-geocoded block for its coordinates (None when nothing is near).
+    """
+    if state and district and block:
+        return state, district, block
+    found = reverse_geocode(lat, lng)
+    if found is None:
+        return state or None, district or None, block or None
+    return found
@@ -0,0 +1,371 @@
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from urllib.parse import quote, urlsplit
+import click
+
+# --- CONFIGURATION ---
+
+# Client behaviour, taken from the clients themselves
+DASHBOARD_POLL_SECONDS = 5   # AuthorityDashboard.tsx: setInterval(fetchData, 5000)
+ANALYTICS_POLL_SECONDS = 5   # Analytics.tsx: setInterval(fetchData, 5000)
+MAP_POLL_SECONDS = 30        # CRIMap.tsx auto-refresh
+ANALYTICS_PAGE_SHARE = 0.3   # authorities spend most of their time on the dashboard
+PAGE_DWELL_SECONDS = 120     # mean time on one page / one district before switching
+STATUS_UPDATE_CHANCE = 0.02  # per dashboard poll, an authority acts on an issue
+REPORT_BURST = (1, 4)        # reports per burst from one phone
+REPORT_GAP_SECONDS = (2, 10) # between reports in a burst (taking the next photo)
+
+# Load-test authority accounts (--setup). load_user() looks ids up in users
+# first, so these ids are kept far above any real user id.
+AUTHORITY_ID_BASE = 10 ** 9
+AUTHORITY_EMAIL = 'loadtest-authority-{}@example.invalid'
+AUTHORITY_PASSWORD = 'loadtest-password'
+
+CATEGORIES = ['Pothole', 'Water Leakage', 'Garbage', 'Traffic Violation', 'Stray Animals', 'Electricity']
+PERCENTILES = (50, 95, 99)
+
+# --- STATISTICS ---
+
+class Stats:
+    """Latencies and outcomes per endpoint, shared by every simulated client."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.limited = {}
+        self.late_polls = 0
+        self.started = time.monotonic()
+        self.finished = None
+
+    def record(self, endpoint, seconds, status):
+        with self.lock:
+            self.latencies.setdefault(endpoint, []).append(seconds)
+            if status == 429:
+                self.limited[endpoint] = self.limited.get(endpoint, 0) + 1
+            elif status is None or status >= 400:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def late(self):
+        with self.lock:
+            self.late_polls += 1
+
+    def summary(self):
+        elapsed = (self.finished or time.monotonic()) - self.started
+        rows = []
+        for endpoint in sorted(self.latencies):
+            values = sorted(self.latencies[endpoint])
+            row = {
+                'endpoint': endpoint,
+                'requests': len(values),
+                'rps': len(values) / elapsed if elapsed else 0.0,
+                'errors': self.errors.get(endpoint, 0),
+                'rate_limited': self.limited.get(endpoint, 0),
+            }
+            for p in PERCENTILES:
+                row[f'p{p}'] = _percentile(values, p)
+            rows.append(row)
+        return rows
+
+    def totals(self):
+        values = sorted(v for values in self.latencies.values() for v in values)
+        requests = len(values)
+        errors = sum(self.errors.values())
+        return {
+            'requests': requests,
+            'errors': errors,
+            'error_rate': errors / requests if requests else 0.0,
+            'late_polls': self.late_polls,
+            **{f'p{p}': _percentile(values, p) for p in PERCENTILES},
+        }
+
+def _percentile(values, p):
+    """Nearest-rank percentile of a sorted list (0.0 for no samples)."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+# --- HTTP CLIENT ---
+
+class Client:
+    """
+    One simulated browser/phone: a keep-alive connection, a cookie jar and
+    its own think-time RNG. Every request is timed into `stats`.
+    """
+
+    def __init__(self, base_url, stats, stop, timeout, rng, headers=None):
+        url = urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = url.netloc
+        self.stats = stats
+        self.stop = stop
+        self.timeout = timeout
+        self.rng = rng
+        self.headers = dict(headers or {})
+        self.cookies = {}
+        self.connection = None
+
+    def request(self, method, path, endpoint=None, body=None, headers=None):
+        """Returns (status, parsed JSON or None); status None means the request failed."""
+        headers = {**self.headers, **(headers or {})}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{k}={v}' for k, v in self.cookies.items())
+        start = time.monotonic()
+        status, payload = None, None
+        try:
+            if self.connection is None:
+                self.connection = self.connection_class(self.netloc, timeout=self.timeout)
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+            status = response.status
+            for cookie in response.msg.get_all('Set-Cookie') or ():
+                name, _, value = cookie.split(';', 1)[0].partition('=')
+                self.cookies[name.strip()] = value.strip()
+            if response.getheader('Content-Type', '').startswith('application/json'):
+                payload = json.loads(data)
+        except (OSError, http.client.HTTPException, ValueError):
+            self.close()
+        self.stats.record(endpoint or f'{method} {path}', time.monotonic() - start, status)
+        return status, payload
+
+    def get(self, path, endpoint=None):
+        return self.request('GET', path, endpoint)
+
+    def post_json(self, path, data, endpoint=None):
+        return self.request('POST', path, endpoint, json.dumps(data), {'Content-Type': 'application/json'})
+
+    def post_multipart(self, path, fields, files, endpoint=None):
+        boundary = uuid.uuid4().hex
+        parts = []
+        for name, value in fields.items():
+            parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+        for name, (filename, content) in files.items():
+            parts.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                f'Content-Type: image/jpeg\r\n\r\n'.encode() + content + b'\r\n'
+            )
+        parts.append(f'--{boundary}--\r\n'.encode())
+        return self.request('POST', path, endpoint, b''.join(parts), {'Content-Type': f'multipart/form-data; boundary={boundary}'})
+
+    def think(self, seconds):
+        """Sleeps like a user would; returns False once the run is over."""
+        return not self.stop.wait(max(0.0, seconds))
+
+    def dwell(self):
+        return self.rng.expovariate(1 / PAGE_DWELL_SECONDS)
+
+    def poll(self, interval, until, fetch):
+        """
+        Calls fetch() on a fixed setInterval-style schedule until `until`
+        (monotonic) or the end of the run. A poll that starts late because the
+        previous response was slower than the interval counts as a late poll.
+        """
+        next_at = time.monotonic()
+        while not self.stop.is_set() and next_at < until:
+            fetch()
+            next_at += interval
+            delay = next_at - time.monotonic()
+            if delay < 0:
+                self.stats.late()
+                next_at = time.monotonic()
+            elif not self.think(delay):
+                return
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+# --- SIMULATED USERS ---
+
+def run_authority(client, index):
+    """Logs in, then alternates between the dashboard and analytics pages, polling each every 5s."""
+    status, _ = client.post_json('/api/login', {'email': AUTHORITY_EMAIL.format(index), 'password': AUTHORITY_PASSWORD})
+    if status != 200:
+        return
+    client.get('/api/me')
+    while not client.stop.is_set():
+        until = time.monotonic() + client.dwell()
+        if client.rng.random() < ANALYTICS_PAGE_SHARE:
+            client.poll(ANALYTICS_POLL_SECONDS, until, lambda: client.get('/api/analytics'))
+            continue
+
+        def dashboard():
+            _, issues = client.get('/api/authority_issues')
+            if issues and client.rng.random() < STATUS_UPDATE_CHANCE:
+                issue = client.rng.choice(issues)
+                status = 'Resolved' if issue.get('status') == 'In Progress' else 'In Progress'
+                client.post_json('/api/update_status', {'issue_id': issue['id'], 'status': status})
+        client.poll(DASHBOARD_POLL_SECONDS, until, dashboard)
+
+def run_map_viewer(client, districts):
+    """Opens the CRI map (locations once), then watches one district at a time with auto-refresh on."""
+    client.get('/api/locations')
+    while not client.stop.is_set():
+        district = client.rng.choice(districts)
+        path = f'/api/get_cri_data/{quote(district)}'
+        client.poll(MAP_POLL_SECONDS, time.monotonic() + client.dwell(),
+                    lambda: client.get(path, 'GET /api/get_cri_data/<district>'))
+
+def run_reporter(client, districts, image_bytes, idle_seconds):
+    """Opens the app (feed + CRI snapshot), submits a burst of reports, goes idle, repeats."""
+    while not client.stop.is_set():
+        district = client.rng.choice(list(districts))
+        client.get('/api/community_feed')
+        client.get(f'/api/get_cri_data/{quote(district)}', 'GET /api/get_cri_data/<district>')
+        for _ in range(client.rng.randint(*REPORT_BURST)):
+            if not client.think(client.rng.uniform(*REPORT_GAP_SECONDS)):
+                return
+            fields = {
+                'category': client.rng.choice(CATEGORIES),
+                'description': 'Load test report',
+                'state': 'Odisha',
+                'district': district,
+                'block': client.rng.choice(districts[district]) if districts[district] else '',
+            }
+            files = {'image': (f'loadtest-{uuid.uuid4().hex}.jpg', os.urandom(image_bytes))} if image_bytes else {}
+            client.post_multipart('/api/mobile/report', fields, files)
+        if not client.think(client.rng.expovariate(1 / idle_seconds)):
+            return
+
+# --- RUNNER ---
+
+def run_step(base_url, authorities, viewers, reporters, duration, ramp_up, timeout, image_bytes, idle_seconds, seed):
+    """Runs one load level for `duration` seconds and returns its Stats."""
+    stats = Stats()
+    stop = threading.Event()
+    master = random.Random(seed)
+
+    probe = Client(base_url, stats, stop, timeout, master)
+    _, hierarchy = probe.get('/api/locations')
+    probe.close()
+    districts = {d: blocks for d, blocks in ((hierarchy or {}).get('Odisha') or {}).items()} or {'Khordha': []}
+
+    def start(target, *args, headers=None):
+        client = Client(base_url, stats, stop, timeout, random.Random(master.random()), headers)
+
+        def body():
+            # Stagger start-up so logins don't all land in the same instant
+            if client.think(client.rng.uniform(0, ramp_up)):
+                target(client, *args)
+            client.close()
+        thread = threading.Thread(target=body, daemon=True)
+        thread.start()
+        return thread
+
+    stats.started = time.monotonic()
+    threads = [start(run_authority, i) for i in range(authorities)]
+    threads += [start(run_map_viewer, list(districts)) for _ in range(viewers)]
+    threads += [
+        start(run_reporter, districts, image_bytes, idle_seconds, headers={'X-Client-Id': f'loadtest-{i}'})
+        for i in range(reporters)
+    ]
+    stop.wait(duration)
+    stop.set()
+    stats.finished = time.monotonic()
+    for thread in threads:
+        thread.join(timeout)
+    return stats
+
+def print_report(stats, label):
+    click.echo(f'\n{label}')
+    click.echo(f"{'endpoint':<40} {'reqs':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'429':>5}")
+    for row in stats.summary():
+        click.echo(
+            f"{row['endpoint']:<40} {row['requests']:>7} {row['rps']:>8.1f} {row['p50'] * 1000:>8.0f} "
+            f"{row['p95'] * 1000:>8.0f} {row['p99'] * 1000:>8.0f} {row['errors']:>7} {row['rate_limited']:>5}"
+        )
+    totals = stats.totals()
+    click.echo(
+        f"total: {totals['requests']} requests, error rate {totals['error_rate']:.1%}, "
+        f"p95 {totals['p95'] * 1000:.0f} ms, p99 {totals['p99'] * 1000:.0f} ms, {totals['late_polls']} late polls"
+    )
+
+def setup_authorities(count):
+    """Creates (or resets) `count` load-test authority accounts, spread over the Odisha blocks."""
+    from werkzeug.security import generate_password_hash
+    from app import create_app
+    from database import db
+    from locations import get_odisha_data
+    from models import Authority
+
+    blocks = [(district, block) for district, names in get_odisha_data().items() for block in names]
+    password = generate_password_hash(AUTHORITY_PASSWORD)
+    app = create_app()
+    with app.app_context():
+        for i in range(count):
+            district, block = blocks[i % len(blocks)]
+            authority = db.session.get(Authority, AUTHORITY_ID_BASE + i) or Authority(id=AUTHORITY_ID_BASE + i)
+            authority.username = f'loadtest-authority-{i}'
+            authority.email = AUTHORITY_EMAIL.format(i)
+            authority.password = password
+            authority.state, authority.district, authority.block = 'Odisha', district, block
+            db.session.add(authority)
+        db.session.commit()
+
+@click.command()
+@click.option('--url', default='http://localhost:8000', show_default=True, help='Server under test.')
+@click.option('--authorities', '-n', default=10, show_default=True, help='Authorities polling dashboard/analytics.')
+@click.option('--viewers', '-m', default=50, show_default=True, help='Anonymous CRI map viewers.')
+@click.option('--reporters', '-k', default=10, show_default=True, help='Mobile app users submitting reports.')
+@click.option('--duration', default=60.0, show_default=True, help='Seconds per load step.')
+@click.option('--ramp-up', default=5.0, show_default=True, help='Seconds over which clients start.')
+@click.option('--steps', default='1', show_default=True, help='Comma-separated multipliers of -n/-m/-k, run in turn.')
+@click.option('--max-error-rate', default=0.01, show_default=True, help='Stop stepping up above this error rate.')
+@click.option('--max-p95', default=2.0, show_default=True, help='Stop stepping up above this p95 latency (seconds).')
+@click.option('--timeout', default=30.0, show_default=True, help='Per-request timeout (seconds).')
+@click.option('--image-kb', default=256, show_default=True, help='Photo size per mobile report (0: no photo).')
+@click.option('--report-idle', default=60.0, show_default=True, help='Mean seconds a reporter idles between bursts.')
+@click.option('--seed', default=1, show_default=True, help='Seed for reproducible client behaviour.')
+@click.option('--setup', is_flag=True, help='First create the load-test authority accounts in the configured database.')
+@click.option('--json-out', type=click.Path(dir_okay=False), help='Also write per-step results as JSON.')
+def main(url, authorities, viewers, reporters, duration, ramp_up, steps, max_error_rate, max_p95,
+         timeout, image_kb, report_idle, seed, setup, json_out):
+    """
+    Simulates authorities, CRI map viewers and mobile reporters against a
+    running server and reports throughput, p50/p95/p99 latency and errors
+    per endpoint. With --steps 1,2,4,8 the load is multiplied step by step
+    until the error rate or p95 crosses its limit, which is the concurrency
+    at which the deployment falls over.
+
+    Authorities log in as loadtest-authority-<i>@example.invalid (create them
+    with --setup, run from backend/ against the server's DATABASE_URL).
+    Reporters send their own X-Client-Id, but all share this machine's IP,
+    so start the server with RATE_LIMIT_ENABLED=False to measure raw
+    capacity (429s are counted separately, not as errors). Photos are saved
+    by the server as loadtest-*.jpg under static/uploads.
+    """
+    multipliers = [float(m) for m in steps.split(',')]
+    if setup:
+        setup_authorities(int(authorities * max(multipliers)))
+        click.echo(f'Created {int(authorities * max(multipliers))} load-test authorities.')
+
+    results = []
+    for step, factor in enumerate(multipliers, 1):
+        level = (round(authorities * factor), round(viewers * factor), round(reporters * factor))
+        label = f'step {step}: {level[0]} authorities, {level[1]} map viewers, {level[2]} reporters'
+        click.echo(f'Running {label} for {duration:.0f}s...')
+        stats = run_step(url, *level, duration, ramp_up, timeout, image_kb * 1024, report_idle, seed + step)
+        print_report(stats, label)
+        totals = stats.totals()
+        results.append({'step': step, 'authorities': level[0], 'viewers': level[1], 'reporters': level[2],
+                        'totals': totals, 'endpoints': stats.summary()})
+        if totals['error_rate'] > max_error_rate or totals['p95'] > max_p95:
+            click.echo(f'\nFell over at {label} (error rate {totals["error_rate"]:.1%}, p95 {totals["p95"]:.2f}s).')
+            break
+    else:
+        if len(multipliers) > 1:
+            click.echo('\nEvery step stayed within the limits.')
+
+    if json_out:
+        with open(json_out, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
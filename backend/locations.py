@@ -0,0 +1,41 @@
+import os
+import json
+from functools import lru_cache
+
+DATA_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'data', 'odisha_data.json')
+
+@lru_cache(maxsize=None)
+def get_odisha_data():
+    """
+    Returns the Odisha District -> [Blocks] hierarchy.
+    Loaded on first use (not at import) and cached for the life of the process.
+    """
+    try:
+        with open(DATA_PATH, 'r') as f:
+            data = json.load(f)
+        print(f"Loaded {len(data)} districts from odisha_data.json")
+        return data
+    except Exception as e:
+        print(f"Error loading odisha_data.json: {e}")
+        return {}
+
+# Demo states kept alongside the real Odisha hierarchy
+DEMO_STATES = {
+    'Maharashtra': { 'Pune': [], 'Mumbai': [] },
+    'Delhi': {'Central Delhi': [], 'South Delhi': []}
+}
+
+def get_state_hierarchy():
+    """Returns State -> District -> [Blocks] for every supported state."""
+    return {
+        'Odisha': get_odisha_data(),
+        # Keep legacy demo states if needed, or just partial lists
+        **DEMO_STATES
+    }
+
+def find_state_for_district(district):
+    """Returns the state a district belongs to, or None."""
+    for state, districts in get_state_hierarchy().items():
+        if district in districts:
+            return state
+    return None
@@ -0,0 +1,84 @@
+import sqlite3
+import os
+
+# Adds columns introduced after v2 to an existing SQLite database.
+# (New tables are created by `flask --app app init-db`.)
+DB_PATH = "fixity.db"
+
+NEW_COLUMNS = [
+    ('issues', 'rule_version', 'VARCHAR(20)'),
+    ('issues', 'reporter_trust', 'FLOAT'),
+    ('issues', 'change_seq', 'INTEGER'),
+]
+
+NEW_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_issues_block_change_seq ON issues (block, change_seq)",
+    "CREATE INDEX IF NOT EXISTS ix_issues_user_change_seq ON issues (user_id, change_seq)",
+    "CREATE INDEX IF NOT EXISTS ix_issues_change_seq ON issues (change_seq)",
+]
+
+# One-off data fixes for the new columns, run after they are added
+BACKFILLS = [
+    ("issues.reporter_trust",
+     "UPDATE issues SET reporter_trust = COALESCE("
+     "(SELECT trust_score FROM users WHERE users.id = issues.user_id), 1.0) "
+     "WHERE reporter_trust IS NULL"),
+    # Existing issues enter the sync sequence in id order (sync.py continues from the max)
+    ("issues.change_seq",
+     "UPDATE issues SET change_seq = id WHERE change_seq IS NULL"),
+    # Seed the event log with each existing issue's creation and resolution.
+    # Scores of already-resolved issues are unknown, so they replay as 0.
+    ("issue_events (created)",
+     "INSERT INTO issue_events (issue_id, block, kind, prev_status, status, prev_score, score, ts) "
+     "SELECT id, block, 'created', NULL, "
+     "CASE WHEN status = 'Resolved' THEN 'Pending' ELSE status END, NULL, "
+     "CASE WHEN status = 'Resolved' THEN 0.0 ELSE severity_score END, "
+     "COALESCE(created_at, CURRENT_TIMESTAMP) FROM issues "
+     "WHERE NOT EXISTS (SELECT 1 FROM issue_events e WHERE e.issue_id = issues.id)"),
+    ("issue_events (resolved)",
+     "INSERT INTO issue_events (issue_id, block, kind, prev_status, status, prev_score, score, ts) "
+     "SELECT id, block, 'status', 'Pending', 'Resolved', 0.0, 0.0, resolved_at FROM issues "
+     "WHERE status = 'Resolved' AND resolved_at IS NOT NULL AND NOT EXISTS "
+     "(SELECT 1 FROM issue_events e WHERE e.issue_id = issues.id AND e.kind = 'status')"),
+]
+
+def migrate():
+    print(f"Migrating {DB_PATH}...")
+    try:
+        if not os.path.exists(DB_PATH):
+            print(f"Error: {DB_PATH} not found.")
+            return
+
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        
+        for table, column, col_type in NEW_COLUMNS:
+            # Check if column exists
+            cursor.execute(f"PRAGMA table_info({table})")
+            columns = [info[1] for info in cursor.fetchall()]
+            
+            if column not in columns:
+                print(f"Adding '{table}.{column}' column...")
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
+            else:
+                print(f"'{table}.{column}' column already exists.")
+        
+        for sql in NEW_INDEXES:
+            cursor.execute(sql)
+        
+        for name, sql in BACKFILLS:
+            print(f"Backfilling '{name}'...")
+            try:
+                cursor.execute(sql)
+            except sqlite3.OperationalError as e:
+                # e.g. a table init-db hasn't created yet; re-run after it
+                print(f"Skipped '{name}': {e}")
+        
+        conn.commit()
+        conn.close()
+        print("Migration successful.")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+
+if __name__ == "__main__":
+    migrate()
@@ -59,6 +59,11 @@ class Issue(db.Model):
     image_path = db.Column(db.String(255))
     status = db.Column(db.String(20), default='Pending')
     severity_score = db.Column(db.Float, default=0.0)
+    # Scoring rule set version (cri_engine / data/scoring_rules.json) used for severity_score
+    rule_version = db.Column(db.String(20))
+    # Reporter's User.trust_score, denormalized so scoring never needs to join users
+    # (kept in sync by rescore.py when trust_score changes)
+    reporter_trust = db.Column(db.Float, default=1.0)
     
     # Location Data
     state = db.Column(db.String(50))
@@ -68,4 +73,131 @@ class Issue(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     resolved_at = db.Column(db.DateTime, nullable=True)
 
-    user = db.relationship('User', backref=db.backref('issues', lazy=True))
\ No newline at end of file
+    # Position in the global change sequence (sync.py); stamped by every write path
+    change_seq = db.Column(db.Integer, index=True)
+
+    user = db.relationship('User', backref=db.backref('issues', lazy=True))
+
+    __table_args__ = (
+        db.Index('ix_issues_block_change_seq', 'block', 'change_seq'),
+        db.Index('ix_issues_user_change_seq', 'user_id', 'change_seq'),
+    )
+
+class ResolutionSketch(db.Model):
+    """
+    Mergeable quantile sketch of resolution times (seconds) for one (block, category).
+    Percentiles for any scope are answered by merging the rows in that scope.
+    """
+    __tablename__ = 'resolution_sketches'
+
+    id = db.Column(db.Integer, primary_key=True)
+    block = db.Column(db.String(50), index=True)
+    category = db.Column(db.String(50))
+
+    count = db.Column(db.Integer, default=0)
+    sum_seconds = db.Column(db.Float, default=0.0)
+    # JSON object: {bucket_key: count} (see resolution_stats.QuantileSketch)
+    buckets = db.Column(db.Text, default='{}')
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (db.UniqueConstraint('block', 'category', name='uq_resolution_sketch_scope'),)
+
+
+class BlockVersion(db.Model):
+    """
+    Change counter per block, bumped in the same transaction as any write that
+    changes which open issues a block has or how they rank. In-memory indexes
+    (priority_index.py) compare against it to know when they are stale.
+    """
+    __tablename__ = 'block_versions'
+
+    block = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+class SyncSequence(db.Model):
+    """
+    Named monotonically increasing counter. Writers increment it inside their
+    own transaction, so values become visible in commit order.
+    """
+    __tablename__ = 'sync_sequences'
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+class IssueTombstone(db.Model):
+    """An issue that left a sync scope (deleted, or moved out of a block)."""
+    __tablename__ = 'issue_tombstones'
+
+    id = db.Column(db.Integer, primary_key=True)
+    issue_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, index=True)
+    block = db.Column(db.String(50), index=True)
+    change_seq = db.Column(db.Integer, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class IssueEvent(db.Model):
+    """
+    Append-only history of issue status and score changes (events.py).
+    Each row carries the state before and after, so any window of history can
+    be replayed forwards or backwards from the (block, ts) index alone.
+    """
+    __tablename__ = 'issue_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    issue_id = db.Column(db.Integer, nullable=False, index=True)
+    block = db.Column(db.String(50))
+    # Authority that made the change (None for citizens, jobs and time escalation)
+    authority_id = db.Column(db.Integer)
+    kind = db.Column(db.String(10), nullable=False)  # created | status | score
+
+    prev_status = db.Column(db.String(20))
+    status = db.Column(db.String(20))
+    prev_score = db.Column(db.Float)
+    score = db.Column(db.Float)
+
+    ts = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    __table_args__ = (db.Index('ix_issue_events_block_ts', 'block', 'ts'),)
+
+
+class ThresholdAlert(db.Model):
+    """
+    A threshold crossing found by the escalation scheduler (thresholds.py):
+    an issue passing the high-risk line (issue_id set) or a block entering a
+    CRI color band (issue_id None).
+    """
+    __tablename__ = 'threshold_alerts'
+
+    id = db.Column(db.Integer, primary_key=True)
+    issue_id = db.Column(db.Integer)
+    district = db.Column(db.String(50))
+    block = db.Column(db.String(50))
+    level = db.Column(db.String(10), nullable=False)  # high_risk | orange | red
+    score = db.Column(db.Float)
+    # When the score crossed the line (the scheduler fires within one tick of it)
+    crossed_at = db.Column(db.DateTime, nullable=False)
+    ts = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (db.Index('ix_threshold_alerts_block_id', 'block', 'id'),)
+
+
+class UploadSession(db.Model):
+    """
+    A resumable upload (uploads.py). Received bytes live in a .part file whose
+    size is the current offset; finalize moves it into UPLOAD_FOLDER.
+    The id is an unguessable token and is the client's only handle.
+    """
+    __tablename__ = 'upload_sessions'
+
+    id = db.Column(db.String(32), primary_key=True)
+    filename = db.Column(db.String(255), nullable=False)
+    size = db.Column(db.BigInteger, nullable=False)
+    # Name in UPLOAD_FOLDER once finalized (what Issue.image_path refers to)
+    stored_name = db.Column(db.String(255))
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    completed_at = db.Column(db.DateTime)
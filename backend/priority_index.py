@@ -0,0 +1,212 @@
+import heapq
+import math
+import threading
+from bisect import insort
+from datetime import datetime
+from sqlalchemy import event, inspect, select, update, insert
+from sqlalchemy.orm import Session
+from database import db
+from models import Issue, BlockVersion
+import cri_engine
+
+# --- CONFIGURATION ---
+
+# Re-key a block's sorted list once its reference time is this old. Between
+# re-keys every score can only have grown by at most b_max * log(hours + 1),
+# which bounds how far past the K-th entry a top-K scan has to look.
+REKEY_SECONDS = 600
+
+# Issue columns that change an issue's position in the index. Updates that only
+# touch severity_score (time escalation written back on read) don't.
+INDEXED_FIELDS = ('status', 'block', 'category', 'severity_level', 'location_context', 'created_at', 'reporter_trust')
+
+EPOCH = datetime(1970, 1, 1)
+
+def _hours(dt):
+    return (dt - EPOCH).total_seconds() / 3600
+
+# --- PER-BLOCK INDEX ---
+
+class BlockIndex:
+    """
+    Open issues of one block, kept sorted by risk at a reference time.
+
+    Every issue's current risk is a + b*log(max(0, T - c) + 1) with per-issue
+    constants a = base*sev*loc*trust, b = f*trust, c = created_at (hours).
+    Risk only grows, and between the reference time and now it grows by at
+    most b_max * log(now - ref + 1), so a top-K query walks the sorted list
+    only until the reference score falls that far below the K-th best.
+    """
+
+    def __init__(self, version, params, now_hours):
+        self.version = version
+        self.params = params  # issue_id -> (a, b, c)
+        self.rekey(now_hours)
+
+    @staticmethod
+    def risk(params, t_hours):
+        a, b, c = params
+        return a + b * math.log(max(0.0, t_hours - c) + 1)
+
+    def rekey(self, now_hours):
+        self.ref_hours = now_hours
+        self.b_max = max((p[1] for p in self.params.values()), default=0.0)
+        self.entries = sorted((-self.risk(p, now_hours), issue_id) for issue_id, p in self.params.items())
+
+    def upsert(self, issue_id, params):
+        self.remove(issue_id)
+        self.params[issue_id] = params
+        self.b_max = max(self.b_max, params[1])
+        insort(self.entries, (-self.risk(params, self.ref_hours), issue_id))
+
+    def remove(self, issue_id):
+        params = self.params.pop(issue_id, None)
+        if params is None:
+            return
+        entry = (-self.risk(params, self.ref_hours), issue_id)
+        self.entries.pop(self.entries.index(entry))
+
+    def top(self, k, now_hours):
+        """[(issue_id, current_risk)] for the k riskiest issues, highest first."""
+        if now_hours - self.ref_hours > REKEY_SECONDS / 3600:
+            self.rekey(now_hours)
+        slack = self.b_max * math.log(max(0.0, now_hours - self.ref_hours) + 1)
+
+        heap = []
+        for neg_ref, issue_id in self.entries:
+            if len(heap) == k and -neg_ref + slack < heap[0][0]:
+                break
+            item = (self.risk(self.params[issue_id], now_hours), -issue_id)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+        return [(-neg_id, round(score, 2)) for score, neg_id in sorted(heap, reverse=True)]
+
+_indexes = {}
+_lock = threading.Lock()
+
+def issue_params(category, severity_level, location_context, created_at, reporter_trust, rules):
+    """(a, b, c) such that the issue's risk at hour T is a + b*log(max(0, T - c) + 1)."""
+    trust = 1.0 if reporter_trust is None else reporter_trust
+    base = rules.base_risk.get(category, rules.default_base_risk)
+    sev_mult = rules.severity_multiplier.get(severity_level, rules.default_multiplier)
+    loc_mult = rules.location_multiplier.get(location_context, rules.default_multiplier)
+    c = _hours(created_at) if created_at else float('inf')  # unset created_at => no escalation yet
+    return (base * sev_mult * loc_mult * trust, rules.escalation_factor * trust, c)
+
+def _block_key(block):
+    return block or ''
+
+def _db_version(block):
+    version = db.session.execute(
+        select(BlockVersion.version).where(BlockVersion.block == _block_key(block))
+    ).scalar()
+    return version or 0
+
+def _load_block(block, version):
+    rules = cri_engine.get_rule_set()
+    rows = db.session.execute(select(
+        Issue.id, Issue.category, Issue.severity_level, Issue.location_context,
+        Issue.created_at, Issue.reporter_trust
+    ).where(Issue.block == block, Issue.status != 'Resolved')).all()
+    params = {row[0]: issue_params(*row[1:], rules) for row in rows}
+    return BlockIndex(version, params, _hours(datetime.utcnow()))
+
+def top_issues(block, k):
+    """
+    [(issue_id, current_risk)] for the k riskiest open issues in `block`.
+    One primary-key read of block_versions per call; the block is reloaded from
+    the database only when another process has changed it since. The reload
+    runs outside the lock, so a cold block doesn't hold up other blocks' queues.
+    """
+    version = _db_version(block)
+    key = _block_key(block)
+    with _lock:
+        index = _indexes.get(key)
+        if index is not None and index.version == version:
+            return index.top(k, _hours(datetime.utcnow()))
+    loaded = _load_block(block, version)
+    with _lock:
+        index = _indexes.get(key)
+        # A concurrent load or an after-commit update may have got there first
+        if index is None or index.version < version:
+            index = _indexes[key] = loaded
+        return index.top(k, _hours(datetime.utcnow()))
+
+# --- VERSIONING (shared across workers through the database) ---
+
+def bump_block_versions(connection, blocks):
+    """Increments block_versions for each block; returns {block: new_version}."""
+    table = BlockVersion.__table__
+    versions = {}
+    for block in set(blocks):
+        key = _block_key(block)
+        result = connection.execute(
+            update(table).where(table.c.block == key).values(version=table.c.version + 1)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(block=key, version=1))
+        versions[block] = connection.execute(
+            select(table.c.version).where(table.c.block == key)
+        ).scalar()
+    return versions
+
+def _is_open(issue):
+    return issue.status != 'Resolved'
+
+@event.listens_for(Session, 'after_flush')
+def _track_issue_changes(session, flush_context):
+    # ORM writes (submit, status change): bump the block versions inside the
+    # same transaction and remember the change so this process can apply it
+    # to its own index after commit instead of reloading the block.
+    changed = {}
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, Issue):
+            continue
+        if obj in session.dirty:
+            attrs = inspect(obj).attrs
+            if not any(attrs[field].history.has_changes() for field in INDEXED_FIELDS):
+                continue
+            # Moved between blocks: drop it from the old one
+            for old_block in attrs.block.history.deleted:
+                changed.setdefault(old_block, []).append((obj.id, None))
+        removed = obj in session.deleted or not _is_open(obj)
+        changed.setdefault(obj.block, []).append((obj.id, None if removed else obj))
+
+    if not changed:
+        return
+
+    rules = cri_engine.get_rule_set()
+    new_versions = bump_block_versions(session.connection(), changed)
+    pending = session.info.setdefault('priority_index_pending', [])
+    for block, items in changed.items():
+        updates = [
+            (issue_id, None if obj is None else issue_params(
+                obj.category, obj.severity_level, obj.location_context, obj.created_at, obj.reporter_trust, rules
+            ))
+            for issue_id, obj in items
+        ]
+        pending.append((block, new_versions[block], updates))
+
+@event.listens_for(Session, 'after_commit')
+def _apply_pending(session):
+    pending = session.info.pop('priority_index_pending', None)
+    if not pending:
+        return
+    with _lock:
+        for block, new_version, updates in pending:
+            index = _indexes.get(_block_key(block))
+            # Only if we were exactly one change behind; otherwise reload lazily
+            if index is None or index.version != new_version - 1:
+                continue
+            for issue_id, params in updates:
+                if params is None:
+                    index.remove(issue_id)
+                else:
+                    index.upsert(issue_id, params)
+            index.version = new_version
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending(session):
+    session.info.pop('priority_index_pending', None)
@@ -0,0 +1,61 @@
+from datetime import datetime
+from sqlalchemy import func, select
+from database import db
+from models import Issue
+import serializers
+import sharding
+
+# --- ISSUE RECORDS ---
+
+# Read-only paths select just the columns they use. A Core select returns Row
+# records (tuples with named access): no ORM instances are built, nothing is
+# added to the session's identity map, and unused columns (description,
+# image_path, ...) are never fetched.
+
+def issue_records(fields, *where, order_by=None, limit=None):
+    """Records of the `fields` columns (serializers.ISSUE_FIELDS names) in the active shard."""
+    stmt = serializers.select_issues(fields).where(*where)
+    if order_by is not None:
+        stmt = stmt.order_by(order_by)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return db.session.execute(stmt).all()
+
+def recent_issue_records(fields, *where, limit=None):
+    """Newest-first records matching `where`, merged across issue shards."""
+    fields = tuple(fields)
+    if 'created_at' not in fields:
+        fields += ('created_at',)
+    return sharding.gather(
+        lambda: issue_records(fields, *where, order_by=Issue.created_at.desc(), limit=limit),
+        key=lambda record: record.created_at or datetime.min, reverse=True, limit=limit
+    )
+
+def issue_records_by_id(fields, issue_ids):
+    """{issue id: record} for the given ids in the active shard."""
+    fields = tuple(fields)
+    if 'id' not in fields:
+        fields += ('id',)
+    return {record.id: record for record in issue_records(fields, Issue.id.in_(issue_ids))} if issue_ids else {}
+
+# --- AGGREGATES ---
+
+def count_issues(*where, local=False):
+    """COUNT(*) of issues matching `where`, summed over issue shards (`local`: active shard only)."""
+    stmt = select(func.count()).select_from(Issue).where(*where)
+    return sum(sharding.scatter(lambda: db.session.execute(stmt).scalar() or 0, local=local))
+
+def open_risk_by_category(block=None):
+    """
+    {category: open risk} from one grouped query per shard, for `block`
+    (None => system-wide), instead of loading the issues.
+    """
+    stmt = select(Issue.category, func.sum(Issue.severity_score)).where(
+        Issue.status != 'Resolved'
+    ).group_by(Issue.category)
+    if block is not None:
+        stmt = stmt.where(Issue.block == block)
+    totals = {}
+    for category, risk in sharding.gather(lambda: db.session.execute(stmt).all(), local=block is not None):
+        totals[category] = totals.get(category, 0.0) + (risk or 0.0)
+    return totals
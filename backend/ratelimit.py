@@ -0,0 +1,181 @@
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from functools import wraps
+from flask import current_app, request, jsonify
+
+# --- CONFIGURATION ---
+
+def default_store_path():
+    """Limiter database on a memory-backed filesystem when the host has one (Linux /dev/shm)."""
+    root = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(root, 'fixity-ratelimit.db')
+
+# Every this many decisions a worker drops buckets idle for IDLE_SECONDS (full again by then)
+PRUNE_EVERY = 1000
+IDLE_SECONDS = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS ix_buckets_updated ON buckets (updated);
+CREATE TABLE IF NOT EXISTS slots (name TEXT NOT NULL, token TEXT PRIMARY KEY, expires REAL NOT NULL);
+"""
+
+# --- SHARED STORE ---
+
+class LimiterStore:
+    """
+    Token buckets and in-flight slots in a small SQLite file shared by every
+    worker on the host. Each decision is one short IMMEDIATE transaction.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._decisions = 0
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')  # throwaway state, no fsync needed
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def take(self, limits, now=None):
+        """
+        Spends one token from every bucket in `limits` ({key: (rate_per_sec, burst)})
+        or from none of them. Returns 0 when allowed, else the seconds until
+        every bucket has a token again.
+        """
+        now = time.time() if now is None else now
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            levels = {}
+            wait = 0.0
+            for key, (rate, burst) in limits.items():
+                row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+                tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+                levels[key] = tokens
+                if tokens < 1:
+                    wait = max(wait, (1 - tokens) / rate)
+            if wait == 0:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                    [(key, tokens - 1, now) for key, tokens in levels.items()]
+                )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        self._decisions += 1
+        if self._decisions % PRUNE_EVERY == 0:
+            self.prune(now - IDLE_SECONDS)
+        return wait
+
+    def acquire(self, name, limit, lease_seconds, now=None):
+        """Takes one of `limit` slots; returns a release token or None when all are busy."""
+        now = time.time() if now is None else now
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Leases expire so a worker killed mid-upload can't leak its slot
+            conn.execute('DELETE FROM slots WHERE name = ? AND expires < ?', (name, now))
+            busy = conn.execute('SELECT COUNT(*) FROM slots WHERE name = ?', (name,)).fetchone()[0]
+            token = None
+            if busy < limit:
+                token = uuid.uuid4().hex
+                conn.execute('INSERT INTO slots (name, token, expires) VALUES (?, ?, ?)', (name, token, now + lease_seconds))
+            conn.execute('COMMIT')
+            return token
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def release(self, token):
+        self._conn().execute('DELETE FROM slots WHERE token = ?', (token,))
+
+    def prune(self, older_than):
+        """Drops buckets idle since `older_than` (they would be full anyway)."""
+        self._conn().execute('DELETE FROM buckets WHERE updated < ?', (older_than,))
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store():
+    path = current_app.config.get('RATE_LIMIT_STORE') or default_store_path()
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = LimiterStore(path)
+        return _stores[path]
+
+# --- MOBILE REPORT LIMITER ---
+
+def client_identity():
+    """
+    (device id or None, remote address) for the current request. The device
+    id comes from the X-Client-Id header or ?client_id= only, never the form,
+    so the limiter decides before the upload body is parsed.
+    """
+    client_id = (request.headers.get('X-Client-Id') or request.args.get('client_id') or '').strip()[:64]
+    return client_id or None, request.remote_addr or 'unknown'
+
+def _too_many(message, retry_after):
+    response = jsonify({'success': False, 'error': message})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+def limit_uploads(name):
+    """
+    Decorator for open upload endpoints: rejects oversized bodies (413) and
+    sheds with 429 + Retry-After when the caller's device or IP bucket is empty
+    or too many uploads are already in flight across all workers.
+    Limiter failures are logged and let the request through.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            config = current_app.config
+            if not config.get('RATE_LIMIT_ENABLED', True):
+                return view(*args, **kwargs)
+
+            max_bytes = config.get('MOBILE_REPORT_MAX_BYTES')
+            if max_bytes and (request.content_length or 0) > max_bytes:
+                return jsonify({'success': False, 'error': 'Upload too large'}), 413
+
+            client_id, address = client_identity()
+            per_minute, burst = config['MOBILE_REPORT_RATE']
+            limits = {f'{name}:ip:{address}': (per_minute / 60.0 * config['RATE_LIMIT_IP_FACTOR'], burst * config['RATE_LIMIT_IP_FACTOR'])}
+            if client_id:
+                limits[f'{name}:client:{client_id}'] = (per_minute / 60.0, burst)
+
+            store = get_store()
+            slot = None
+            try:
+                wait = store.take(limits)
+                if wait:
+                    return _too_many('Too many reports, slow down', wait)
+                slot = store.acquire(name, config['MOBILE_UPLOAD_CONCURRENCY'], config['MOBILE_UPLOAD_LEASE_SECONDS'])
+                if slot is None:
+                    return _too_many('Server busy, retry shortly', 1)
+            except sqlite3.Error as e:
+                print(f"Rate limiter unavailable, not limiting: {e}")
+
+            try:
+                return view(*args, **kwargs)
+            finally:
+                if slot is not None:
+                    try:
+                        store.release(slot)
+                    except sqlite3.Error as e:
+                        print(f"Could not release upload slot (expires on its own): {e}")
+        return wrapper
+    return decorator
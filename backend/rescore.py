@@ -0,0 +1,173 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from sqlalchemy import bindparam, event, func, or_, select, update
+from sqlalchemy.orm import Session, object_session
+from database import db
+from models import Issue, User
+import cri_engine
+import priority_index
+import sync
+import events
+import sharding
+
+# --- CONFIGURATION ---
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# --- WORKER (runs in the process pool, no DB access) ---
+
+def _score_chunk(args):
+    """Scores one chunk of (id, category, severity, location, created_at, trust, ...) rows."""
+    version, rules_dict, rows, now = args
+    rules = cri_engine.RuleSet(version, rules_dict)
+    return [
+        {'b_id': issue_id, 'b_score': cri_engine.score_fields(category, severity, location, created_at, trust, rules, now)}
+        for issue_id, category, severity, location, created_at, trust, *_rest in rows
+    ]
+
+# --- JOB ---
+
+def _needs_rescore(version):
+    return (Issue.status != 'Resolved') & or_(Issue.rule_version == None, Issue.rule_version != version)
+
+def _fetch_chunk(version, after_id, chunk_size):
+    """Next chunk by keyset pagination on id (reporter trust is denormalized on issues)."""
+    return [tuple(row) for row in db.session.query(
+        Issue.id, Issue.category, Issue.severity_level, Issue.location_context,
+        Issue.created_at, func.coalesce(Issue.reporter_trust, 1.0), Issue.block,
+        Issue.severity_score, Issue.status
+    ).filter(
+        Issue.id > after_id, _needs_rescore(version)
+    ).order_by(Issue.id).limit(chunk_size).all()]
+
+def _write_chunk(updates, version, rows):
+    """
+    One executemany UPDATE per chunk plus one executemany INSERT of the
+    matching score events. Issues resolved since the chunk was read are
+    dropped first (their rows locked where the database supports it), so
+    they keep their score and get no event. Returns the number updated.
+    """
+    table = Issue.__table__
+    still_open = set(db.session.execute(
+        select(table.c.id).where(
+            table.c.id.in_([params['b_id'] for params in updates]), table.c.status != 'Resolved'
+        ).with_for_update()
+    ).scalars())
+    updates = [params for params in updates if params['b_id'] in still_open]
+    rows = [row for row in rows if row[0] in still_open]
+    if updates:
+        stmt = update(table).where(
+            table.c.id == bindparam('b_id'),
+            table.c.status != 'Resolved'
+        ).values(severity_score=bindparam('b_score'), rule_version=version, change_seq=bindparam('b_seq'))
+        sync.stamp_updates(db.session.connection(), updates)
+        db.session.execute(stmt, updates)
+        events.record_events(db.session.connection(), events.score_events(
+            updates, {row[0]: row[7] for row in rows}, {row[0]: row[6] for row in rows}, {row[0]: row[8] for row in rows}
+        ))
+        priority_index.bump_block_versions(db.session.connection(), {row[6] for row in rows})
+    db.session.commit()
+    return len(updates)
+
+def rescore_unresolved(version=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=1, pause=0.0, progress=None):
+    """
+    Re-scores every unresolved issue that was not scored with `version`
+    (default: the active rule set). Returns the number of issues updated.
+
+    Resumable by construction: finished rows carry the new rule_version and are
+    skipped on the next run. Each chunk commits on its own, so live writers only
+    ever wait for one short UPDATE; `pause` adds a sleep between chunk batches.
+    """
+    rules = cri_engine.get_rule_set(version)
+    rules_dict = rules.to_dict()
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    last_id = 0
+    total = 0
+
+    try:
+        while True:
+            # Read up to `workers` chunks ahead so the pool stays busy
+            chunks = []
+            for _ in range(max(1, workers)):
+                rows = _fetch_chunk(rules.version, last_id, chunk_size)
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                chunks.append(rows)
+            # Release the read transaction before scoring
+            db.session.commit()
+            if not chunks:
+                break
+
+            now = datetime.utcnow()
+            jobs = [(rules.version, rules_dict, rows, now) for rows in chunks]
+            results = pool.map(_score_chunk, jobs) if pool else map(_score_chunk, jobs)
+            for rows, updates in zip(chunks, results):
+                total += _write_chunk(updates, rules.version, rows)
+
+            if progress:
+                progress(f"Rescored {total} issues (last id {last_id}) with rules {rules.version}")
+            if pause:
+                time.sleep(pause)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    return total
+
+# --- REPORTER TRUST SYNC ---
+
+def rescore_reporter_issues(connection, user_id, trust_score):
+    """
+    Copies a reporter's new trust score onto their open issues and re-scores just
+    those issues, in one SELECT and one executemany UPDATE on `connection`.
+    """
+    table = Issue.__table__
+    rows = connection.execute(select(
+        table.c.id, table.c.category, table.c.severity_level,
+        table.c.location_context, table.c.created_at, table.c.block,
+        table.c.severity_score, table.c.status
+    ).where(table.c.user_id == user_id, table.c.status != 'Resolved')).all()
+    if not rows:
+        return 0
+
+    rules = cri_engine.get_rule_set()
+    now = datetime.utcnow()
+    updates = [
+        {'b_id': issue_id, 'b_score': cri_engine.score_fields(category, severity, location, created_at, trust_score, rules, now)}
+        for issue_id, category, severity, location, created_at, *_rest in rows
+    ]
+    sync.stamp_updates(connection, updates)
+    connection.execute(update(table).where(
+        table.c.id == bindparam('b_id')
+    ).values(
+        severity_score=bindparam('b_score'), reporter_trust=trust_score, rule_version=rules.version,
+        change_seq=bindparam('b_seq')
+    ), updates)
+    events.record_events(connection, events.score_events(
+        updates, {row[0]: row[6] for row in rows}, {row[0]: row[5] for row in rows}, {row[0]: row[7] for row in rows}
+    ))
+    priority_index.bump_block_versions(connection, {row[5] for row in rows})
+    return len(updates)
+
+@event.listens_for(User.trust_score, 'set')
+def _on_trust_score_set(target, value, oldvalue, initiator):
+    # Only existing users; new users have no issues yet
+    session = object_session(target)
+    if session is None or target.id is None or value == oldvalue:
+        return
+    session.info.setdefault('trust_changes', {})[target.id] = 1.0 if value is None else value
+
+@event.listens_for(Session, 'after_flush')
+def _rescore_trust_changes(session, flush_context):
+    # Runs inside the same transaction as the trust_score UPDATE
+    changes = session.info.pop('trust_changes', None)
+    if not changes:
+        return
+    # A reporter's issues may be spread over several district shards
+    for shard in sharding.shard_names():
+        with sharding.use_shard(shard):
+            connection = session.connection()
+            for user_id, trust_score in changes.items():
+                rescore_reporter_issues(connection, user_id, trust_score)
@@ -0,0 +1,189 @@
+import json
+import math
+from database import db
+from models import Issue, ResolutionSketch
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+import sharding
+
+# --- CONFIGURATION ---
+
+# Relative accuracy of the quantile sketch (1% => p90 of "10 hours" is within +/- 6 mins)
+SKETCH_RELATIVE_ACCURACY = 0.01
+# Durations below this (seconds) all fall into the zero bucket
+SKETCH_MIN_VALUE = 1.0
+
+PERCENTILES = (50, 90, 99)
+
+# --- QUANTILE SKETCH ---
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch (DDSketch style).
+    Every value lands in bucket ceil(log_gamma(x)), so any quantile is
+    reported within SKETCH_RELATIVE_ACCURACY of the true value, and two
+    sketches merge exactly by adding bucket counts.
+    """
+
+    gamma = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+    log_gamma = math.log(gamma)
+
+    def __init__(self, buckets=None, count=0, total=0.0):
+        self.buckets = buckets or {}
+        self.count = count
+        self.total = total
+
+    def add(self, value):
+        key = self._key(value)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        self.count += 1
+        self.total += max(0.0, value)
+
+    def merge(self, other):
+        for key, n in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + n
+        self.count += other.count
+        self.total += other.total
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.buckets))
+
+    def _key(self, value):
+        if value < SKETCH_MIN_VALUE:
+            return 0
+        return max(1, int(math.ceil(math.log(value) / self.log_gamma)))
+
+    def _value(self, key):
+        if key == 0:
+            return 0.0
+        # Midpoint of the bucket (gamma^(k-1), gamma^k] in relative terms
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    # --- persistence ---
+
+    @classmethod
+    def from_row(cls, row):
+        buckets = {int(k): v for k, v in json.loads(row.buckets or '{}').items()}
+        return cls(buckets, row.count or 0, row.sum_seconds or 0.0)
+
+    def to_row(self, row):
+        row.buckets = json.dumps({str(k): v for k, v in self.buckets.items()})
+        row.count = self.count
+        row.sum_seconds = self.total
+
+# --- WRITE PATH ---
+
+def _locked_sketch(block, category):
+    return ResolutionSketch.query.filter_by(block=block, category=category).with_for_update().first()
+
+def record_resolution(issue):
+    """
+    Adds a newly resolved issue's resolution time to its (block, category) sketch.
+    Call inside the same transaction that sets resolved_at; does not commit.
+    """
+    if not issue.resolved_at or not issue.created_at:
+        return
+    seconds = (issue.resolved_at - issue.created_at).total_seconds()
+
+    row = _locked_sketch(issue.block, issue.category)
+    if not row:
+        # First resolution in this scope. A concurrent first resolution may
+        # insert the row too: the loser's savepoint rolls back (not the status
+        # update) and it locks and updates the winner's row instead.
+        try:
+            with db.session.begin_nested():
+                db.session.add(ResolutionSketch(
+                    block=issue.block, category=issue.category, count=0, sum_seconds=0.0, buckets='{}'
+                ))
+        except IntegrityError:
+            pass
+        row = _locked_sketch(issue.block, issue.category)
+
+    sketch = QuantileSketch.from_row(row)
+    sketch.add(seconds)
+    sketch.to_row(row)
+
+def rebuild_sketches():
+    """
+    Rebuilds every sketch from resolved issue history (one streaming pass).
+    Used once to backfill, or to repair drift; returns the number of sketches written.
+    """
+    sketches = {}
+    rows = db.session.query(
+        Issue.block, Issue.category, Issue.created_at, Issue.resolved_at
+    ).filter(
+        Issue.status == 'Resolved', Issue.resolved_at != None
+    ).yield_per(5000)
+
+    for block, category, created_at, resolved_at in rows:
+        sketch = sketches.setdefault((block, category), QuantileSketch())
+        sketch.add((resolved_at - created_at).total_seconds())
+
+    ResolutionSketch.query.delete()
+    for (block, category), sketch in sketches.items():
+        row = ResolutionSketch(block=block, category=category)
+        sketch.to_row(row)
+        db.session.add(row)
+    db.session.commit()
+    return len(sketches)
+
+# --- READ PATH ---
+
+def _seconds_between(start, end):
+    """SQL expression for (end - start) in seconds on the active database."""
+    if db.engine.dialect.name == 'sqlite':
+        return (func.julianday(end) - func.julianday(start)) * 86400.0
+    return func.extract('epoch', end - start)
+
+def get_resolution_stats(block=None, category=None):
+    """
+    Returns {'count', 'avg_seconds', 'p50', 'p90', 'p99'} for the given scope.
+    The mean is a single SQL aggregate; percentiles come from merged sketches.
+    """
+    query = db.session.query(
+        func.count(Issue.id),
+        func.avg(_seconds_between(Issue.created_at, Issue.resolved_at))
+    ).filter(Issue.status == 'Resolved', Issue.resolved_at != None)
+    if block is not None:
+        query = query.filter(Issue.block == block)
+    if category is not None:
+        query = query.filter(Issue.category == category)
+    # A block lives in one issue shard; wider scopes combine every shard
+    local = block is not None
+    parts = sharding.scatter(query.one, local=local)
+    count = sum(part[0] or 0 for part in parts)
+    avg_seconds = sum((part[0] or 0) * part[1] for part in parts if part[1] is not None) / count if count else None
+
+    # Just the sketch columns, as plain rows (from_row only reads these)
+    sketch_query = select(ResolutionSketch.buckets, ResolutionSketch.count, ResolutionSketch.sum_seconds)
+    if block is not None:
+        sketch_query = sketch_query.where(ResolutionSketch.block == block)
+    if category is not None:
+        sketch_query = sketch_query.where(ResolutionSketch.category == category)
+
+    merged = QuantileSketch()
+    for row in sharding.gather(lambda: db.session.execute(sketch_query).all(), local=local):
+        merged.merge(QuantileSketch.from_row(row))
+
+    stats = {'count': count or 0, 'avg_seconds': avg_seconds}
+    for p in PERCENTILES:
+        stats[f'p{p}'] = merged.quantile(p / 100)
+    return stats
+
+def format_duration(seconds):
+    """Human-readable duration used on the analytics dashboard."""
+    if seconds is None:
+        return "N/A"
+    if seconds < 3600:
+        return f"{int(seconds / 60)} mins"
+    elif seconds < 86400:
+        return f"{round(seconds / 3600, 1)} hours"
+    return f"{round(seconds / 86400, 1)} days"
@@ -0,0 +1,15 @@
+from routes import auth, pages, cri, issues, analytics, export, search, sync, sla, uploads, alerts
+
+def register_blueprints(app):
+    """Attach every route blueprint to the application."""
+    app.register_blueprint(auth.bp)
+    app.register_blueprint(pages.bp)
+    app.register_blueprint(cri.bp)
+    app.register_blueprint(issues.bp)
+    app.register_blueprint(analytics.bp)
+    app.register_blueprint(export.bp)
+    app.register_blueprint(search.bp)
+    app.register_blueprint(sync.bp)
+    app.register_blueprint(sla.bp)
+    app.register_blueprint(uploads.bp)
+    app.register_blueprint(alerts.bp)
@@ -0,0 +1,37 @@
+from flask import Blueprint, request, jsonify
+from flask_login import login_required, current_user
+from sqlalchemy import select
+from database import db
+from models import ThresholdAlert
+import serializers
+
+bp = Blueprint('alerts', __name__)
+
+# Most alerts one request returns; clients page with ?since=
+MAX_ALERTS = 200
+
+ALERT_FIELDS = ('id', 'issue_id', 'district', 'block', 'level', 'score', 'crossed_at', 'ts')
+ALERT_COLUMNS = [getattr(ThresholdAlert, f) for f in ALERT_FIELDS]
+
+@bp.route('/api/alerts')
+@login_required
+def get_alerts():
+    """
+    Threshold crossings recorded by the escalation scheduler, oldest first.
+    Authorities see their block; others may pass ?block= (default: all).
+    ?since=<id> returns only alerts after that one, so a poll can pass the
+    last id it saw. Alerts live with their issues, so with sharding on the
+    ids count per shard and the district (the authority's, or ?district=)
+    picks which one is read.
+    """
+    if current_user.role == 'authority':
+        block = current_user.block
+    else:
+        block = request.args.get('block')
+    since = request.args.get('since', 0, type=int)
+    limit = max(1, min(request.args.get('limit', MAX_ALERTS, type=int), MAX_ALERTS))
+    stmt = select(*ALERT_COLUMNS).where(ThresholdAlert.id > since)
+    if block:
+        stmt = stmt.where(ThresholdAlert.block == block)
+    rows = db.session.execute(stmt.order_by(ThresholdAlert.id).limit(limit)).all()
+    return jsonify(serializers.rows_to_dicts(rows, ALERT_FIELDS))
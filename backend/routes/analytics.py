@@ -0,0 +1,232 @@
+from datetime import datetime
+from flask import Blueprint, current_app, request, jsonify
+from flask_login import login_required, current_user
+from sqlalchemy import func
+from database import db
+from models import Issue
+import projections
+import resolution_stats
+import snapshots
+import events
+import sharding
+
+bp = Blueprint('analytics', __name__)
+
+# Upper bound for ?hotspots=N so one request can't ask for an unbounded table
+MAX_HOTSPOT_LIMIT = 500
+
+def get_hotspots(limit):
+    """
+    Top `limit` blocks by open risk as (block, total_risk, issue_count,
+    dominant_category, oldest_created_at) rows, in a single query.
+    Dominant category is picked with a ROW_NUMBER() window over per-block
+    category counts instead of one GROUP BY per block.
+    """
+    open_filter = Issue.status != 'Resolved'
+
+    block_totals = db.session.query(
+        Issue.block.label('block'),
+        func.sum(Issue.severity_score).label('total_risk'),
+        func.count(Issue.id).label('issue_count'),
+        func.min(Issue.created_at).label('oldest_created')
+    ).filter(open_filter).group_by(Issue.block).subquery()
+
+    category_ranks = db.session.query(
+        Issue.block.label('block'),
+        Issue.category.label('category'),
+        func.row_number().over(
+            partition_by=Issue.block,
+            order_by=(func.count(Issue.id).desc(), Issue.category)
+        ).label('rank')
+    ).filter(open_filter).group_by(Issue.block, Issue.category).subquery()
+
+    return db.session.query(
+        block_totals.c.block,
+        block_totals.c.total_risk,
+        block_totals.c.issue_count,
+        category_ranks.c.category,
+        block_totals.c.oldest_created
+    ).outerjoin(
+        category_ranks,
+        (category_ranks.c.block == block_totals.c.block) & (category_ranks.c.rank == 1)
+    ).order_by(block_totals.c.total_risk.desc()).limit(limit).all()
+
+@bp.route('/api/analytics')
+@login_required
+def get_analytics():
+    """
+    Analytics dashboard endpoint.
+    For authorities: Shows analytics for their assigned block only.
+    For others: Shows system-wide analytics.
+    """
+    # Filter by block if user is an authority
+    scope_block = current_user.block if current_user.role == 'authority' else None
+    hotspot_limit = request.args.get('hotspots', current_app.config.get('HOTSPOT_LIMIT', 5), type=int)
+    return jsonify(build_analytics(scope_block, hotspot_limit))
+
+def build_analytics(scope_block, hotspot_limit):
+    """
+    The analytics package for one block (None => system-wide). Shared by the
+    Flask view and the async read API (asgi.py).
+    """
+    # --- 1. Top Summary (The "oh no" row) ---
+    
+    # A block lives in one issue shard; system-wide figures scatter-gather over all of them
+    local = scope_block is not None
+    # Open risk per category, summed in SQL: no per-issue rows are loaded
+    category_risk = projections.open_risk_by_category(scope_block)
+    
+    # CRI Calculation: Simple Sum (matching Authority Dashboard)
+    # Sum of all active issue severity scores, capped at 100
+    if category_risk:
+        total_raw_risk = sum(category_risk.values())
+        current_cri = min(100, int(total_raw_risk))
+    else:
+        current_cri = 0
+    
+    # High Risk Issues (Real)
+    high_risk_count = projections.count_issues(Issue.status != 'Resolved', Issue.severity_score > 70)
+    
+    # Avg Resolution Time (Real)
+    # SQL aggregate for the mean + merged quantile sketches for percentiles,
+    # scoped to the authority's block like the rest of the summary.
+    res_stats = resolution_stats.get_resolution_stats(block=scope_block)
+    avg_res_time = resolution_stats.format_duration(res_stats['avg_seconds'])
+    res_time_percentiles = {
+        f'p{p}': resolution_stats.format_duration(res_stats[f'p{p}'])
+        for p in resolution_stats.PERCENTILES
+    }
+    
+    # Repeat Complaint Rate (Real)
+    # Logic: Count issues with same (category, block) / Total Issues
+    all_issues_count = projections.count_issues()
+    if all_issues_count > 0:
+        # Blocks don't span shards, so per-shard (block, category) counts add up
+        unique_combinations = sum(sharding.scatter(db.session.query(
+            Issue.block, Issue.category
+        ).group_by(Issue.block, Issue.category).count))
+        
+        # Simple heuristic: (1 - unique/total) * 100
+        repeat_rate_val = (1 - (unique_combinations / all_issues_count)) * 100
+        repeat_rate_val = max(0, repeat_rate_val) # Safety
+        repeat_rate = f"{int(repeat_rate_val)}%"
+    else:
+        repeat_rate = "0%"
+    
+    # --- 2. CRI Risk Breakdown (Pillars) ---
+    PILLAR_MAP = {
+        'Pothole': 'Infrastructure', 
+        'Water Leakage': 'Public Health', 
+        'Garbage': 'Public Health', 
+        'Traffic Violation': 'Public Safety',
+        'Stray Animals': 'Public Safety',
+        'Electricity': 'Infrastructure'
+    }
+    
+    pillar_counts = {'Public Safety': 0, 'Public Health': 0, 'Infrastructure': 0, 'Governance': 0}
+    
+    for category, risk in category_risk.items():
+        pillar = PILLAR_MAP.get(category, 'Governance')
+        pillar_counts[pillar] += risk
+        
+    total_pillar_risk = sum(pillar_counts.values()) or 1
+    pillar_data = [
+        {'name': p, 'risk': round(s, 1), 'percent': round((s/total_pillar_risk)*100)} 
+        for p, s in pillar_counts.items()
+    ]
+    
+    # --- 3. Risk Over Time (Trend) - REAL ---
+    # Open risk at the end of each of the last 7 days, replayed from the
+    # issue event log (one range scan) instead of one issues query per day
+    trend_labels = []
+    trend_vals = []
+    shard_trends = sharding.scatter(lambda: events.daily_risk_trend(block=scope_block, days=7), local=local)
+    for daily in zip(*shard_trends):
+        trend_labels.append(daily[0][0].strftime('%a')) # Mon, Tue...
+        trend_vals.append(min(100, int(sum(total_risk for _, total_risk in daily))))
+
+    trend_data = {
+        'labels': trend_labels,
+        'values': trend_vals
+    }
+    
+    # --- 4. Hotspot Table (Real) ---
+    # One query regardless of N (see get_hotspots)
+    hotspot_limit = max(1, min(hotspot_limit, MAX_HOTSPOT_LIMIT))
+    
+    hotspot_data = []
+    hotspot_rows = sharding.gather(
+        lambda: get_hotspots(hotspot_limit), key=lambda row: row[1] or 0.0, reverse=True, limit=hotspot_limit
+    )
+    for block, risk, count, dominant, oldest_created in hotspot_rows:
+        # Calculate "Unresolved Time" for the oldest issue in this block
+        if oldest_created:
+            delta = datetime.utcnow() - oldest_created
+            if delta.days > 0:
+               duration_str = f"{delta.days}d"
+            else:
+               duration_str = f"{int(delta.seconds / 3600)}h"
+        else:
+            duration_str = "0h"
+        
+        hotspot_data.append({
+            'area': block,
+            'cri': round(risk, 1),
+            'issue_count': count,
+            'dominant_risk': dominant or 'General',
+            'duration': duration_str # "6d" or "4h"
+        })
+        
+    # --- 5. Issue Load Distribution (Real) ---
+    cat_distribution = sharding.gather(db.session.query(
+        Issue.category, func.count(Issue.id)
+    ).group_by(Issue.category).all)
+    
+    dist_data = {}
+    for cat, count in cat_distribution:
+        dist_data[cat] = dist_data.get(cat, 0) + count
+
+    
+    return {
+        'summary': {
+            'cri_score': current_cri,
+            'high_risk_count': high_risk_count,
+            'avg_res_time': avg_res_time,
+            'res_time_percentiles': res_time_percentiles,
+            'repeat_rate': repeat_rate
+        },
+        'pillars': pillar_data,
+        'trend': trend_data,
+        'hotspots': hotspot_data,
+        'distribution': dist_data
+    }
+
+@bp.route('/api/analytics/history')
+@login_required
+def get_analytics_history():
+    """
+    Long-range analytics answered from the latest Parquet snapshot (see
+    snapshots.py), not the live issues table.
+    ?report=category_distribution|resolution_lag&from=YYYY-MM&to=YYYY-MM
+    Authorities are scoped to their block; others may pass state/district.
+    """
+    report = request.args.get('report', 'category_distribution')
+    if report not in snapshots.REPORTS:
+        return jsonify({'error': f"Unknown report '{report}'"}), 400
+
+    snapshot_path, snapshot_name = snapshots.current_snapshot(current_app.config['SNAPSHOT_DIR'])
+    if snapshot_path is None:
+        return jsonify({'error': 'No analytics snapshot yet. Run `flask snapshot-issues`.'}), 503
+
+    if current_user.role == 'authority':
+        scope = {'state': current_user.state, 'district': current_user.district, 'block': current_user.block}
+    else:
+        scope = {'state': request.args.get('state'), 'district': request.args.get('district')}
+
+    data = snapshots.REPORTS[report](
+        snapshot_path,
+        month_from=request.args.get('from'),
+        month_to=request.args.get('to'),
+        **scope
+    )
+    return jsonify({'report': report, 'snapshot': snapshot_name, 'data': data})
@@ -0,0 +1,220 @@
+import random
+import string
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, session, jsonify
+from flask_login import login_user, logout_user, login_required, current_user
+from flask_mail import Message
+from werkzeug.security import generate_password_hash, check_password_hash
+from database import db
+from extensions import mail
+from models import User, Authority
+
+bp = Blueprint('auth', __name__)
+
+# --- HELPER: OTP GENERATOR ---
+def generate_otp():
+    return ''.join(random.choices(string.digits, k=4))
+
+# --- AUTHENTICATION ---
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login_page():
+    if request.method == 'POST':
+        email = request.form.get('email')
+        password = request.form.get('password')
+        
+        # 1. Check Citizen Table
+        user = User.query.filter_by(email=email).first()
+        if user and check_password_hash(user.password, password):
+            if not user.is_verified:
+                flash('Please verify your email first.', 'warning')
+                return render_template('login.html')
+            login_user(user)
+            return redirect(url_for('pages.profile'))
+            
+        # 2. Check Authority Table
+        auth_user = Authority.query.filter_by(email=email).first()
+        if auth_user and check_password_hash(auth_user.password, password):
+            login_user(auth_user)
+            return redirect(url_for('pages.authority_dashboard'))
+            
+        flash('Invalid Credentials', 'error')
+        
+    return render_template('login.html')
+
+# --- API: LOGIN (JSON) ---
+@bp.route('/api/login', methods=['POST'])
+def api_login():
+    data = request.json
+    email = data.get('email')
+    password = data.get('password')
+    
+    # 1. Check Authority Table (PRIORITY: Gov IDs must not be shadowed by citizen accounts)
+    auth_user = Authority.query.filter_by(email=email).first()
+    if auth_user and check_password_hash(auth_user.password, password):
+        login_user(auth_user)
+        return jsonify({'success': True, 'redirect': '/authority/dashboard', 'role': 'authority'})
+
+    # 2. Check Citizen Table
+    user = User.query.filter_by(email=email).first()
+    if user and check_password_hash(user.password, password):
+        if not user.is_verified:
+            return jsonify({'success': False, 'error': 'Please verify your email first'}), 400
+        login_user(user)
+        return jsonify({'success': True, 'redirect': '/profile', 'role': 'citizen'})
+        
+    return jsonify({'success': False, 'error': 'Invalid credentials'}), 401
+
+# --- API: LOGOUT (JSON) ---
+@bp.route('/api/logout', methods=['POST'])
+def api_logout():
+    logout_user()
+    return jsonify({'success': True})
+
+# --- API: REGISTER AUTHORITY (JSON) ---
+@bp.route('/api/register/authority', methods=['POST'])
+def api_register_authority():
+    data = request.json
+    username = data.get('username')
+    email = data.get('email')
+    password = data.get('password')
+    state = data.get('state')
+    district = data.get('district')
+    block = data.get('block')
+    
+    if Authority.query.filter_by(email=email).first():
+        return jsonify({'success': False, 'error': 'Email already registered'}), 400
+        
+    hashed_pw = generate_password_hash(password)
+    new_auth = Authority(
+        username=username,
+        email=email,
+        password=hashed_pw,
+        state=state,
+        district=district,
+        block=block,
+        role='authority'
+    )
+    db.session.add(new_auth)
+    db.session.commit()
+    
+    return jsonify({'success': True, 'redirect': '/login'})
+
+@bp.route('/register', methods=['GET'])
+def register_page():
+    return render_template('register.html')
+
+# --- API: SEND OTP (CITIZEN) ---
+@bp.route('/api/send_otp', methods=['POST'])
+def send_otp_api():
+    data = request.json
+    email = data.get('email')
+    
+    # Check if email exists
+    if User.query.filter_by(email=email).first():
+        return jsonify({'error': 'Email already registered'}), 400
+        
+    otp = generate_otp()
+    
+    # --- SEND EMAIL LOGIC STARTS HERE ---
+    try:
+        msg = Message('Your Fixity OTP', sender=current_app.config['MAIL_USERNAME'], recipients=[email])
+        msg.body = f'Your verification code is: {otp}'
+        mail.send(msg)
+        print(f"Email sent to {email}")
+    except Exception as e:
+        print(f"Error sending email: {e}")
+        return jsonify({'error': f'Failed to send email: {str(e)}'}), 500
+    # ------------------------------------
+
+    # Store OTP in session temporarily
+    session['temp_otp'] = otp
+    session['temp_email'] = email
+    
+    return jsonify({'message': 'OTP Sent Successfully'})
+# --- API: VERIFY OTP & REGISTER CITIZEN ---
+@bp.route('/api/register_citizen', methods=['POST'])
+def register_citizen():
+    data = request.json
+    username = data.get('username')
+    password = data.get('password')
+    user_otp = data.get('otp')
+    
+    # Debug Session
+    print(f"DEBUG REGISTER: Session keys: {list(session.keys())}")
+    print(f"DEBUG REGISTER: Input OTP: {user_otp}, Session OTP: {session.get('temp_otp')}")
+    
+    # Verify OTP
+    if 'temp_otp' not in session or session['temp_otp'] != user_otp:
+        return jsonify({'error': 'Invalid OTP'}), 400
+        
+    hashed_pw = generate_password_hash(password)
+    new_user = User(
+        username=username,
+        email=session['temp_email'],
+        password=hashed_pw,
+        is_verified=True,
+        role='citizen'
+    )
+    
+    db.session.add(new_user)
+    db.session.commit()
+    
+    # Clear session temp data
+    session.pop('temp_otp', None)
+    session.pop('temp_email', None)
+    
+    return jsonify({'redirect': url_for('auth.login_page')})
+
+# --- AUTHORITY REGISTRATION (NO OTP) ---
+@bp.route('/register/authority', methods=['POST'])
+def register_authority():
+    username = request.form.get('username')
+    email = request.form.get('email')
+    password = request.form.get('password')
+    state = request.form.get('state')
+    district = request.form.get('district')
+    block = request.form.get('block')
+    
+    if Authority.query.filter_by(email=email).first():
+        flash('Email already registered', 'error')
+        return redirect(url_for('auth.register_page'))
+        
+    hashed_pw = generate_password_hash(password)
+    new_auth = Authority(
+        username=username,
+        email=email,
+        password=hashed_pw,
+        state=state,
+        district=district,
+        block=block,
+        role='authority'
+    )
+    db.session.add(new_auth)
+    db.session.commit()
+    
+    flash('Authority Account Created. Please Login.', 'success')
+    return redirect(url_for('auth.login_page'))
+
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    return redirect(url_for('auth.login_page'))
+
+@bp.route('/api/me')
+def get_current_user():
+    """Get current logged in user info"""
+    if current_user.is_authenticated:
+        user_data = {
+            'id': current_user.id,
+            'username': current_user.username,
+            'email': current_user.email,
+            'role': current_user.role,
+            'created_at': current_user.created_at.isoformat() if current_user.created_at else None
+        }
+        if current_user.role == 'authority':
+            user_data['state'] = current_user.state
+            user_data['district'] = current_user.district
+            user_data['block'] = current_user.block
+        return jsonify(user_data)
+    return jsonify(None)
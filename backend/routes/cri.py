@@ -0,0 +1,284 @@
+import time
+from datetime import datetime
+from flask import Blueprint, current_app, request, jsonify
+import cri_engine
+import compression
+from locations import get_odisha_data, get_state_hierarchy, find_state_for_district
+
+bp = Blueprint('cri', __name__)
+
+@bp.route('/api/get_cri_data/<district>')
+def get_cri_data(district):
+    return jsonify(cri_map_data(district))
+
+def cri_map_data(district):
+    """Map blocks of a district with their CRI (shared with the async read API)."""
+    # REAL CRI ENGINE AGGREGATION
+    data = cri_engine.get_aggregated_cri_data(district)
+    
+    # If no data found (empty DB), we want to return the REAL BLOCKS with 0 risk (Green)
+    # instead of fake random data, if the district exists in our real dataset.
+    if not data:
+        odisha_data = get_odisha_data()
+        if district in odisha_data:
+            block_list = odisha_data[district]
+            # Generate "Safe" default state for real blocks
+            # We need approximate lat/lng for these blocks for the map to work nicely.
+            # IN A REAL APP: We would have a database of lat/lng for every block.
+            # HERE: We will generate them deterministically around a district center.
+
+            # Geocoding centers for major districts (approximate) - Expand as needed
+            district_centers = {
+                'Khordha': {'lat': 20.1, 'lng': 85.6},
+                'Cuttack': {'lat': 20.5, 'lng': 85.8},
+                'Puri': {'lat': 19.8, 'lng': 85.8},
+                'Ganjam': {'lat': 19.3, 'lng': 84.9},
+                'Sundargarh': {'lat': 22.1, 'lng': 84.0},
+                'Sambalpur': {'lat': 21.4, 'lng': 83.9},
+                # Default for others (center of Odisha)
+                'Default': {'lat': 20.95, 'lng': 84.8}
+            }
+
+            center = district_centers.get(district, district_centers['Default'])
+            import random
+
+            # Deterministic seed based on district name to keep map stable
+            import hashlib
+            seed = int(hashlib.md5(district.encode()).hexdigest()[:8], 16)
+            random.seed(seed)
+
+            real_data_result = []
+            for block in block_list:
+                # Scatter blocks around the district center
+                lat_offset = random.uniform(-0.3, 0.3)
+                lng_offset = random.uniform(-0.3, 0.3)
+
+                real_data_result.append({
+                    'block': block,
+                    'cri': 0, # Default safe
+                    'color': 'green',
+                    'lat': center['lat'] + lat_offset,
+                    'lng': center['lng'] + lng_offset,
+                    'issue_count': 0  # No issues for safe blocks
+                })
+            return real_data_result
+
+        # Fallback to demo data for non-Odisha locations (e.g. Pune/Delhi demos)
+        # DEMO DATA INJECTOR (Requested by User)
+        if district == 'Pune': # Example for specific demo flow
+             data.append({
+                'block': 'Demo Block (Wakad)',
+                'cri': 75.5,
+                'color': 'orange',
+                'lat': 18.5983,
+                'lng': 73.7759
+            })
+        
+        # If still empty (other districts), use the larger fake generator
+        if not data:
+             return get_cri_data_fake(district)
+        
+    return data
+
+def get_cri_data_fake(district):
+    import random
+    
+    # Comprehensive CRI Data for major districts
+    fake_data = {
+        'Pune': [
+            {'block': 'Hinjewadi', 'cri': 85, 'color': 'red', 'lat': 18.5913, 'lng': 73.7389},
+            {'block': 'Wakad', 'cri': 45, 'color': 'green', 'lat': 18.5983, 'lng': 73.7759},
+            {'block': 'Baner', 'cri': 72, 'color': 'orange', 'lat': 18.5590, 'lng': 73.7868},
+            {'block': 'Shivajinagar', 'cri': 60, 'color': 'orange', 'lat': 18.5314, 'lng': 73.8446},
+            {'block': 'Kothrud', 'cri': 35, 'color': 'green', 'lat': 18.5074, 'lng': 73.8077},
+            {'block': 'Hadapsar', 'cri': 78, 'color': 'orange', 'lat': 18.5089, 'lng': 73.9260}
+        ],
+        'Central Delhi': [
+            {'block': 'Connaught Place', 'cri': 55, 'color': 'orange', 'lat': 28.6315, 'lng': 77.2167},
+            {'block': 'Karol Bagh', 'cri': 82, 'color': 'red', 'lat': 28.6529, 'lng': 77.1905},
+            {'block': 'Paharganj', 'cri': 68, 'color': 'orange', 'lat': 28.6448, 'lng': 77.2107}
+        ],
+        'South Delhi': [
+            {'block': 'Saket', 'cri': 42, 'color': 'green', 'lat': 28.5245, 'lng': 77.2066},
+            {'block': 'Greater Kailash', 'cri': 38, 'color': 'green', 'lat': 28.5485, 'lng': 77.2436},
+            {'block': 'Hauz Khas', 'cri': 65, 'color': 'orange', 'lat': 28.5494, 'lng': 77.2001}
+        ],
+        'Mumbai City': [
+            {'block': 'Colaba', 'cri': 48, 'color': 'green', 'lat': 18.9067, 'lng': 72.8147},
+            {'block': 'Fort', 'cri': 55, 'color': 'orange', 'lat': 18.9322, 'lng': 72.8347},
+            {'block': 'Marine Lines', 'cri': 62, 'color': 'orange', 'lat': 18.9432, 'lng': 72.8235}
+        ],
+        'Mumbai Suburban': [
+            {'block': 'Andheri', 'cri': 88, 'color': 'red', 'lat': 19.1136, 'lng': 72.8697},
+            {'block': 'Bandra', 'cri': 72, 'color': 'orange', 'lat': 19.0596, 'lng': 72.8295},
+            {'block': 'Borivali', 'cri': 45, 'color': 'green', 'lat': 19.2307, 'lng': 72.8567},
+            {'block': 'Goregaon', 'cri': 78, 'color': 'orange', 'lat': 19.1663, 'lng': 72.8526}
+        ],
+        'Bengaluru Urban': [
+            {'block': 'Whitefield', 'cri': 82, 'color': 'red', 'lat': 12.9698, 'lng': 77.7500},
+            {'block': 'Koramangala', 'cri': 55, 'color': 'orange', 'lat': 12.9352, 'lng': 77.6245},
+            {'block': 'Electronic City', 'cri': 68, 'color': 'orange', 'lat': 12.8399, 'lng': 77.6770},
+            {'block': 'Indiranagar', 'cri': 42, 'color': 'green', 'lat': 12.9784, 'lng': 77.6408},
+            {'block': 'HSR Layout', 'cri': 75, 'color': 'orange', 'lat': 12.9116, 'lng': 77.6389}
+        ],
+        'Hyderabad': [
+            {'block': 'Gachibowli', 'cri': 78, 'color': 'orange', 'lat': 17.4401, 'lng': 78.3489},
+            {'block': 'HITEC City', 'cri': 85, 'color': 'red', 'lat': 17.4435, 'lng': 78.3772},
+            {'block': 'Banjara Hills', 'cri': 38, 'color': 'green', 'lat': 17.4156, 'lng': 78.4347},
+            {'block': 'Secunderabad', 'cri': 62, 'color': 'orange', 'lat': 17.4399, 'lng': 78.4983}
+        ],
+        'Chennai': [
+            {'block': 'T. Nagar', 'cri': 65, 'color': 'orange', 'lat': 13.0418, 'lng': 80.2341},
+            {'block': 'Anna Nagar', 'cri': 52, 'color': 'orange', 'lat': 13.0850, 'lng': 80.2101},
+            {'block': 'Velachery', 'cri': 78, 'color': 'orange', 'lat': 12.9815, 'lng': 80.2180},
+            {'block': 'OMR', 'cri': 88, 'color': 'red', 'lat': 12.9089, 'lng': 80.2271}
+        ],
+        'Ahmedabad': [
+            {'block': 'SG Highway', 'cri': 72, 'color': 'orange', 'lat': 23.0469, 'lng': 72.5178},
+            {'block': 'Satellite', 'cri': 45, 'color': 'green', 'lat': 23.0225, 'lng': 72.5270},
+            {'block': 'Navrangpura', 'cri': 58, 'color': 'orange', 'lat': 23.0369, 'lng': 72.5594},
+            {'block': 'Maninagar', 'cri': 82, 'color': 'red', 'lat': 22.9938, 'lng': 72.6097}
+        ],
+        'Kolkata': [
+            {'block': 'Salt Lake', 'cri': 48, 'color': 'green', 'lat': 22.5800, 'lng': 88.4179},
+            {'block': 'New Town', 'cri': 38, 'color': 'green', 'lat': 22.5958, 'lng': 88.4795},
+            {'block': 'Park Street', 'cri': 65, 'color': 'orange', 'lat': 22.5551, 'lng': 88.3525},
+            {'block': 'Howrah', 'cri': 85, 'color': 'red', 'lat': 22.5958, 'lng': 88.2636}
+        ],
+        'Jaipur': [
+            {'block': 'Malviya Nagar', 'cri': 55, 'color': 'orange', 'lat': 26.8505, 'lng': 75.8019},
+            {'block': 'Vaishali Nagar', 'cri': 42, 'color': 'green', 'lat': 26.9124, 'lng': 75.7390},
+            {'block': 'Mansarovar', 'cri': 68, 'color': 'orange', 'lat': 26.8684, 'lng': 75.7542},
+            {'block': 'MI Road', 'cri': 78, 'color': 'orange', 'lat': 26.9124, 'lng': 75.7873}
+        ],
+        'Lucknow': [
+            {'block': 'Gomti Nagar', 'cri': 52, 'color': 'orange', 'lat': 26.8565, 'lng': 81.0167},
+            {'block': 'Hazratganj', 'cri': 65, 'color': 'orange', 'lat': 26.8497, 'lng': 80.9470},
+            {'block': 'Aliganj', 'cri': 75, 'color': 'orange', 'lat': 26.8989, 'lng': 80.9372},
+            {'block': 'Indira Nagar', 'cri': 48, 'color': 'green', 'lat': 26.8742, 'lng': 81.0017}
+        ],
+        # Explicit empty lists for Real-Time districts to prevent "Block A" generation
+        'Khordha': [], 
+        'Bhubaneswar': [],
+        
+        'Cuttack': [
+            {'block': 'Cuttack Ward 1', 'cri': 55, 'color': 'orange', 'lat': 20.4625, 'lng': 85.8828},
+            {'block': 'CDA Sector 6', 'cri': 40, 'color': 'green', 'lat': 20.4800, 'lng': 85.8500},
+            {'block': 'Chauliaganj', 'cri': 85, 'color': 'red', 'lat': 20.4500, 'lng': 85.9000},
+            {'block': 'Badambadi', 'cri': 72, 'color': 'orange', 'lat': 20.4600, 'lng': 85.8700}
+        ],
+        'Puri': [
+            {'block': 'Grand Road', 'cri': 65, 'color': 'orange', 'lat': 19.8135, 'lng': 85.8312},
+            {'block': 'Sea Beach', 'cri': 45, 'color': 'green', 'lat': 19.7980, 'lng': 85.8240},
+            {'block': 'Talabania', 'cri': 78, 'color': 'orange', 'lat': 19.8200, 'lng': 85.8400}
+        ],
+        'Rourkela': [
+            {'block': 'Civil Township', 'cri': 42, 'color': 'green', 'lat': 22.2604, 'lng': 84.8536},
+            {'block': 'Sector 19', 'cri': 88, 'color': 'red', 'lat': 22.2500, 'lng': 84.8700},
+            {'block': 'Chhend', 'cri': 60, 'color': 'orange', 'lat': 22.2700, 'lng': 84.8300}
+        ],
+        'Darjeeling': [
+            {'block': 'Mall Road', 'cri': 35, 'color': 'green', 'lat': 27.0410, 'lng': 88.2663},
+            {'block': 'Ghoom', 'cri': 55, 'color': 'orange', 'lat': 27.0100, 'lng': 88.2500}
+        ],
+        'Siliguri': [
+            {'block': 'Hill Cart Road', 'cri': 75, 'color': 'orange', 'lat': 26.7271, 'lng': 88.3953},
+            {'block': 'Sevoke Road', 'cri': 82, 'color': 'red', 'lat': 26.7400, 'lng': 88.4100},
+            {'block': 'Pradhan Nagar', 'cri': 50, 'color': 'orange', 'lat': 26.7100, 'lng': 88.3800}
+        ]
+    }
+    
+    result = fake_data.get(district, [])
+
+    # If district not found, generate random data based on district name
+    if not result:
+        # Generate mock data for unknown districts
+        import hashlib
+        seed = int(hashlib.md5(district.encode()).hexdigest()[:8], 16)
+        random.seed(seed)
+        
+        base_lat = 20.0 + random.uniform(-8, 10)
+        base_lng = 77.0 + random.uniform(-5, 8)
+    
+        blocks = ['Block A', 'Block B', 'Block C', 'Block D']
+        result = []
+        for i, block in enumerate(blocks):
+            cri = random.randint(25, 95)
+            color = 'red' if cri >= 80 else 'orange' if cri >= 50 else 'green'
+            result.append({
+                'block': f'{district} {block}',
+                'cri': cri,
+                'color': color,
+                'issue_count': random.randint(1, 15), # Fake count
+                'lat': base_lat + random.uniform(-0.1, 0.1),
+                'lng': base_lng + random.uniform(-0.1, 0.1)
+            })
+    
+    return result
+
+@bp.route('/api/forecast/<district>')
+def get_cri_forecast(district):
+    """
+    Projected CRI per block over the next ?hours=N (default 24) at ?step=H
+    hour resolution, with the hours until each block crosses 50 (orange) / 80 (red).
+    """
+    import forecast  # NumPy is only needed here; keep it off the startup path
+
+    hours = request.args.get('hours', 24, type=float)
+    step = request.args.get('step', 1, type=float)
+    hours = max(1.0, min(hours, forecast.MAX_HORIZON_HOURS))
+    step = max(step if step and step > 0 else 1.0, hours / forecast.MAX_STEPS)
+
+    now = datetime.utcnow()
+    data = forecast.forecast_district(district, horizon_hours=hours, step_hours=step, now=now)
+    data['district'] = district
+    data['generated_at'] = now.isoformat()
+    return jsonify(data)
+
+# --- HIERARCHICAL ROLLUP (STATE / DISTRICT) ---
+# Small per-process cache keyed by level; clients may also cache per Cache-Control/ETag.
+# Only names from the location hierarchy are built (and cached), so its size is bounded.
+_rollup_cache = {}
+
+def _cached_rollup(level, name, build):
+    ttl = current_app.config.get('CRI_ROLLUP_CACHE_SECONDS', 30)
+    key = (level, name)
+    hit = _rollup_cache.get(key)
+    now = time.monotonic()
+    if hit and now - hit[0] < ttl:
+        data = hit[1]
+    else:
+        data = build()
+        _rollup_cache[key] = (now, data)
+
+    response = jsonify(data)
+    response.cache_control.public = True
+    response.cache_control.max_age = ttl
+    response.add_etag()
+    return response.make_conditional(request)
+
+@bp.route('/api/cri/state/<state>')
+def get_state_rollup(state):
+    """State -> District -> Block CRI rollup (blocks without issues included as zero)."""
+    if state not in get_state_hierarchy():
+        return jsonify({'error': f"Unknown state '{state}'"}), 404
+    return _cached_rollup('state', state, lambda: cri_engine.get_cri_rollup(get_state_hierarchy(), state=state))
+
+@bp.route('/api/cri/district/<district>')
+def get_district_rollup(district):
+    """District -> Block CRI rollup (blocks without issues included as zero)."""
+    state = find_state_for_district(district)
+    if state is None:
+        return jsonify({'error': f"Unknown district '{district}'"}), 404
+    return _cached_rollup('district', district, lambda: cri_engine.get_cri_rollup(
+        get_state_hierarchy(), state=state, district=district
+    ))
+
+# --- NEW API ENDPOINTS FOR REACT FRONTEND ---
+# --- API: LOCATIONS (HIERARCHY) ---
+@bp.route('/api/locations')
+def get_locations():
+    """Return the hierarchy of States -> Districts -> Blocks"""
+    # Currently focused on Odisha as the primary supported state.
+    # Static for the life of the process: encoded and compressed once.
+    return compression.precompressed('locations', lambda: jsonify(get_state_hierarchy()))
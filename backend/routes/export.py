@@ -0,0 +1,49 @@
+from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_login import login_required, current_user
+import export
+
+bp = Blueprint('export', __name__)
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d') if value else None
+
+@bp.route('/api/export')
+@login_required
+def export_issues():
+    """
+    Streams every issue in the authority's jurisdiction.
+    Query params: format=ndjson|csv|parquet, district, block, status,
+    from=YYYY-MM-DD (inclusive), to=YYYY-MM-DD (exclusive).
+    """
+    if current_user.role != 'authority':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    fmt = request.args.get('format', 'ndjson').lower()
+    if fmt not in export.ENCODERS:
+        return jsonify({'error': f"Unsupported format '{fmt}'"}), 400
+    if fmt == 'parquet' and not export.parquet_available():
+        return jsonify({'error': 'Parquet export requires pyarrow'}), 400
+
+    try:
+        date_from = _parse_date(request.args.get('from'))
+        date_to = _parse_date(request.args.get('to'))
+    except ValueError:
+        return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+
+    stmt = export.build_export_query(
+        export.jurisdiction_filters(current_user),
+        district=request.args.get('district'),
+        block=request.args.get('block'),
+        status=request.args.get('status'),
+        date_from=date_from,
+        date_to=date_to
+    )
+
+    body = export.ENCODERS[fmt](export.iter_all_shards(stmt))
+    filename = f"fixity_issues_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return Response(
+        stream_with_context(body),
+        mimetype=export.EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,287 @@
+import os
+from datetime import datetime
+from flask import Blueprint, current_app, request, jsonify
+from flask_login import login_required, current_user
+from werkzeug.security import generate_password_hash
+from werkzeug.utils import secure_filename
+from database import db
+from sqlalchemy import bindparam, update
+from models import User, Issue
+import cri_engine
+import resolution_stats
+import priority_index
+import serializers
+import sync
+import ratelimit
+import write_queue
+import events
+import uploads
+import geocode
+import sharding
+import feed_cache
+
+bp = Blueprint('issues', __name__)
+
+@bp.route('/api/mobile/report', methods=['POST'])
+@ratelimit.limit_uploads('mobile_report')
+def mobile_submit_report():
+    """
+    Open endpoint for Mobile App (No Auth).
+    Uses a default 'Mobile User' to satisfy DB constraints.
+    Rate limited per device (X-Client-Id) and IP; see ratelimit.py.
+    """
+    # 1. Get or Create Mobile User
+    mobile_user = User.query.filter_by(email='mobile@fixity.com').first()
+    if not mobile_user:
+        hashed_pw = generate_password_hash('mobile123')
+        mobile_user = User(
+            username='Mobile Citizen',
+            email='mobile@fixity.com',
+            password=hashed_pw,
+            is_verified=True,
+            role='citizen'
+        )
+        db.session.add(mobile_user)
+        db.session.commit()
+
+    # 2. Parse Request
+    # Mobile sends: category, latitude, longitude, description, image
+    category = request.form.get('category')
+    latitude = request.form.get('latitude')
+    longitude = request.form.get('longitude')
+    description = request.form.get('description') or "Reported via Mobile App"
+    
+    # Auto-generate Title
+    title = f"Mobile Report: {category}"
+
+    # Get Location Hierarchy from request (sent by updated mobile app),
+    # otherwise reverse-geocode the coordinates to the nearest block
+    lat_value = float(latitude) if latitude else 0.0
+    lng_value = float(longitude) if longitude else 0.0
+    state, district, block = geocode.fill_location(
+        request.form.get('state'), request.form.get('district'), request.form.get('block'), lat_value, lng_value
+    )
+    location_context = request.form.get('location_context') or "residential"
+    sharding.use_district(district)
+
+    # Handle Image
+    image_path = None
+    if 'image' in request.files:
+        file = request.files['image']
+        if file and file.filename:
+            filename = secure_filename(file.filename)
+            upload_folder = current_app.config.get('UPLOAD_FOLDER', 'static/uploads')
+            os.makedirs(upload_folder, exist_ok=True)
+            file.save(os.path.join(upload_folder, filename))
+            image_path = filename
+    # Or a finished resumable upload (routes/uploads.py), attached by reference
+    if image_path is None and request.form.get('upload_id'):
+        try:
+            image_path = uploads.resolve_upload(request.form['upload_id'])
+        except uploads.UploadError as e:
+            return jsonify({'success': False, 'error': str(e)}), e.status
+
+    # 3. Create Issue
+    new_issue = Issue(
+        user_id=mobile_user.id,
+        title=title,
+        description=description,
+        category=category,
+        latitude=lat_value,
+        longitude=lng_value,
+        state=state,
+        district=district,
+        block=block,
+        image_path=image_path,
+        status='Pending',
+        severity_level='medium',
+        location_context=location_context
+    )
+
+    # 4. Calculate Risk Score
+    # Using default trust score 1.0 since mobile user is generic
+    cri_engine.apply_issue_risk(new_issue, user_trust_score=1.0)
+    
+    # Commits on this session, or via the group-commit queue when enabled
+    write_queue.save_issue(new_issue)
+
+    return jsonify({'success': True, 'message': 'Mobile report submitted'})
+
+
+@bp.route('/api/submit_report', methods=['POST'])
+@login_required
+def submit_report():
+    """Submit a new issue report"""
+    title = request.form.get('title')
+    description = request.form.get('description')
+    category = request.form.get('category')
+    latitude = request.form.get('latitude')
+    longitude = request.form.get('longitude')
+    latitude = float(latitude) if latitude else None
+    longitude = float(longitude) if longitude else None
+    state, district, block = geocode.fill_location(
+        request.form.get('state'), request.form.get('district'), request.form.get('block'), latitude, longitude
+    )
+    sharding.use_district(district)
+    
+    # New Risk Context Fields
+    severity_level = request.form.get('severity_level', 'medium')
+    location_context = request.form.get('location_context', 'residential')
+    
+    # Handle image upload
+    image_path = None
+    if 'image' in request.files:
+        file = request.files['image']
+        if file and file.filename:
+            filename = secure_filename(file.filename)
+            upload_folder = current_app.config.get('UPLOAD_FOLDER', 'static/uploads')
+            os.makedirs(upload_folder, exist_ok=True)
+            file.save(os.path.join(upload_folder, filename))
+            image_path = filename
+    # Or a finished resumable upload (routes/uploads.py), attached by reference
+    if image_path is None and request.form.get('upload_id'):
+        try:
+            image_path = uploads.resolve_upload(request.form['upload_id'])
+        except uploads.UploadError as e:
+            return jsonify({'success': False, 'error': str(e)}), e.status
+    
+    # Create Issue Instance
+    new_issue = Issue(
+        user_id=current_user.id,
+        title=title,
+        description=description,
+        category=category,
+        latitude=latitude,
+        longitude=longitude,
+        state=state,
+        district=district,
+        block=block,
+        image_path=image_path,
+        status='Pending',
+        # Store context
+        severity_level=severity_level,
+        location_context=location_context
+    )
+    
+    # CALCULATE RISK SCORE
+    trust_score = getattr(current_user, 'trust_score', 1.0)
+    # Ensure creation time is set for calculation if needed, though DB usually sets on commit.
+    # cri_engine handles None/empty created_at by assuming 0 days.
+    cri_engine.apply_issue_risk(new_issue, user_trust_score=trust_score)
+    
+    write_queue.save_issue(new_issue)
+    
+    return jsonify({'success': True, 'redirect': '/profile'})
+
+@bp.route('/api/update_status', methods=['POST'])
+@login_required
+def update_status():
+    """Update issue status (for authorities)"""
+    if current_user.role != 'authority':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    data = request.json
+    issue_id = data.get('issue_id')
+    status = data.get('status')
+    
+    try:
+        sharding.use_issue_id(issue_id)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Issue not found'}), 404
+    issue = Issue.query.get(issue_id)
+    if issue:
+        issue.status = status
+        
+        # RISK LOGIC: RESOLVED ISSUES DROP TO 0
+        if status == 'Resolved':
+            issue.severity_score = 0.0
+            # Set resolution timestamp if not already set
+            if not issue.resolved_at:
+                issue.resolved_at = datetime.utcnow()
+                # First resolution only: feed the (block, category) percentile sketch
+                resolution_stats.record_resolution(issue)
+            
+        db.session.commit()
+        return jsonify({'success': True})
+    return jsonify({'error': 'Issue not found'}), 404
+
+@bp.route('/api/my_issues')
+@login_required
+def get_my_issues():
+    """Get issues reported by current user (?fields= to project)"""
+    fields, error = serializers.parse_fields(request.args.get('fields'), serializers.ISSUE_LIST_FIELDS)
+    if error:
+        return jsonify({'error': error}), 400
+    # A citizen's issues may live in several district shards
+    return jsonify(serializers.fetch_recent_issue_dicts([Issue.user_id == current_user.id], fields))
+
+@bp.route('/api/community_feed')
+def get_community_feed():
+    """Get all issues for community feed (?fields= to project)"""
+    fields, error = serializers.parse_fields(request.args.get('fields'), serializers.FEED_FIELDS)
+    if error:
+        return jsonify({'error': error}), 400
+    # Served from the in-memory feed buffer after a version check
+    return jsonify(feed_cache.recent_issues(fields))
+
+@bp.route('/api/authority_issues')
+@login_required
+def get_authority_issues():
+    """Get issues for authority's block"""
+    if current_user.role != 'authority':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    # RISK FIRST: the K riskiest unresolved issues, from the in-memory priority index
+    limit = request.args.get('limit', current_app.config.get('AUTHORITY_TOP_K', 50), type=int)
+    ranked = priority_index.top_issues(current_user.block, max(1, limit))
+    
+    fields, error = serializers.parse_fields(request.args.get('fields'), serializers.ISSUE_LIST_FIELDS)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    # Projected columns only, plus what the escalation write-back needs
+    stmt = serializers.select_issues(fields, extra=(Issue.status, Issue.id, Issue.severity_score, Issue.rule_version)).where(
+        Issue.id.in_([issue_id for issue_id, _ in ranked])
+    )
+    rows_by_id = {row[-3]: row for row in db.session.execute(stmt)}
+    
+    # --- TIME-BASED ESCALATION ON READ ---
+    # The index already ranks by the current (escalated) risk; write it back for
+    # the returned issues so stored scores stay accurate to the minute.
+    # This avoids needing a background cron job.
+    rules = cri_engine.get_rule_set()
+    score_updates = []
+    previous_scores = {}
+    rows = []
+    for issue_id, new_score in ranked:
+        row = rows_by_id.get(issue_id)
+        if row is None:
+            continue
+        # Reporter trust comes from the denormalized Issue.reporter_trust column,
+        # so there is no per-issue lookup of Issue.user here.
+        old_score, rule_version = row[-2], row[-1]
+        
+        if abs(new_score - (old_score or 0.0)) > 0.1 or rule_version != rules.version: # simple float comparison
+            score_updates.append({'b_id': issue_id, 'b_score': new_score})
+            previous_scores[issue_id] = old_score
+        rows.append(row)
+            
+    if score_updates:
+        # Score-only change: one executemany UPDATE, no ORM objects
+        table = Issue.__table__
+        sync.stamp_updates(db.session.connection(), score_updates)
+        db.session.execute(update(table).where(table.c.id == bindparam('b_id')).values(
+            severity_score=bindparam('b_score'), rule_version=rules.version, change_seq=bindparam('b_seq')
+        ), score_updates)
+        events.record_events(db.session.connection(), events.score_events(
+            score_updates, previous_scores, {issue_id: current_user.block for issue_id in previous_scores},
+            {row[-3]: row[-4] for row in rows}
+        ))
+        db.session.commit()
+    
+    result = serializers.rows_to_dicts(rows, fields)
+    if 'severity_score' in fields:
+        current = dict(ranked)
+        for item, row in zip(result, rows):
+            item['severity_score'] = current[row[-3]]
+    return jsonify(result)
@@ -0,0 +1,64 @@
+import os
+from flask import Blueprint, current_app, render_template, redirect, url_for, send_from_directory
+from flask_login import login_required, current_user
+from models import Issue
+import priority_index
+import projections
+import feed_cache
+import serializers
+
+bp = Blueprint('pages', __name__)
+
+# Columns the page templates read (records, not ORM objects)
+PROFILE_FIELDS = ('id', 'title', 'description', 'status', 'block', 'district', 'image_path')
+DASHBOARD_FIELDS = ('id', 'title', 'description', 'status', 'severity_score', 'block', 'district', 'image_path', 'created_at')
+
+# --- STATIC FILE SERVING FOR UPLOADS ---
+@bp.route('/api/static/uploads/<path:filename>')
+def serve_uploads(filename):
+    """Serve uploaded files to the frontend"""
+    upload_folder = current_app.config.get('UPLOAD_FOLDER', 'static/uploads')
+    return send_from_directory(os.path.join(current_app.root_path, upload_folder), filename)
+
+@bp.route('/')
+def home():
+    return render_template('fixity.html')
+
+# --- CORE FEATURES ---
+
+@bp.route('/profile')
+@login_required
+def profile():
+    if current_user.role != 'citizen':
+        return redirect(url_for('pages.authority_dashboard'))
+    my_issues = projections.recent_issue_records(PROFILE_FIELDS, Issue.user_id == current_user.id)
+    return render_template('profile.html', user=current_user, issues=my_issues)
+
+@bp.route('/authority/dashboard')
+@login_required
+def authority_dashboard():
+    if current_user.role != 'authority':
+        return redirect(url_for('pages.profile'))
+    
+    # Show issues relevant to authority's block - RISK FIRST (top K from the priority index)
+    ranked = priority_index.top_issues(current_user.block, current_app.config.get('AUTHORITY_TOP_K', 50))
+    issues_by_id = projections.issue_records_by_id(DASHBOARD_FIELDS, [issue_id for issue_id, _ in ranked])
+    issues = [issues_by_id[issue_id] for issue_id, _ in ranked if issue_id in issues_by_id]
+    return render_template('authority_dashboard.html', authority=current_user, issues=issues)
+
+@bp.route('/report', methods=['GET'])
+@login_required
+def report():
+    return render_template('report.html')
+
+@bp.route('/community')
+def community_feed():
+    # Public feed, from the same in-memory buffer as /api/community_feed
+    issues = feed_cache.recent_issues(serializers.FEED_FIELDS)
+    return render_template('all_reported.html', issues=issues)
+
+# --- MAP VISUALIZATION ---
+
+@bp.route('/map')
+def map_page():
+    return render_template('cri_map.html')
@@ -0,0 +1,28 @@
+from flask import Blueprint, request, jsonify
+import search
+
+bp = Blueprint('search', __name__)
+
+@bp.route('/api/search')
+def search_issues():
+    """
+    Public ranked full-text search over issue titles and descriptions.
+    Query params: q, district, block, category, status, limit (max 100), offset.
+    """
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'error': 'Missing search query ?q='}), 400
+
+    try:
+        results = search.search_issues(
+            q,
+            district=request.args.get('district'),
+            block=request.args.get('block'),
+            category=request.args.get('category'),
+            status=request.args.get('status'),
+            limit=request.args.get('limit', 20, type=int),
+            offset=request.args.get('offset', 0, type=int)
+        )
+    except search.SearchIndexMissing:
+        return jsonify({'error': 'Search is not available yet: the search index has not been built'}), 503
+    return jsonify({'query': q, 'results': results})
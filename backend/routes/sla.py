@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify
+from flask_login import login_required, current_user
+import events
+
+bp = Blueprint('sla', __name__)
+
+# Longest window one request may scan
+MAX_SLA_DAYS = 365
+
+@bp.route('/api/sla')
+@login_required
+def get_sla():
+    """
+    SLA metrics from the issue event log: time spent in each status, issues
+    still waiting, reopen count and resolution turnaround per authority.
+    Authorities see their block; others may pass ?block= (default: all).
+    ?days=N sets the window (default 30).
+    """
+    days = max(1, min(request.args.get('days', 30, type=int), MAX_SLA_DAYS))
+    is_authority = current_user.role == 'authority'
+    block = current_user.block if is_authority else request.args.get('block')
+    since = datetime.utcnow() - timedelta(days=days)
+    # The request is already on the block's shard only for an authority or an explicit ?district=
+    local = block is not None and (is_authority or request.args.get('district') is not None)
+    return jsonify({'block': block, 'days': days, **events.sla_metrics(block=block, since=since, local=local)})
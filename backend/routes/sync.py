@@ -0,0 +1,42 @@
+from flask import Blueprint, request, jsonify
+from flask_login import login_required, current_user
+from models import Issue, IssueTombstone
+import serializers
+import sharding
+import sync
+
+bp = Blueprint('sync', __name__)
+
+@bp.route('/api/sync')
+@login_required
+def sync_issues():
+    """
+    Delta sync for the mobile app and dashboards.
+    Returns issues created or changed after ?since=<token> (omit for a full
+    fetch) plus ids that left the caller's scope, and the token to send next.
+    Citizens sync their own issues; authorities sync their block.
+    """
+    fields, error = serializers.parse_fields(request.args.get('fields'), serializers.ISSUE_LIST_FIELDS)
+    if error:
+        return jsonify({'error': error}), 400
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+
+    if current_user.role == 'authority':
+        issue_scope = Issue.block == current_user.block
+        tombstone_scope = IssueTombstone.block == current_user.block
+    else:
+        issue_scope = Issue.user_id == current_user.id
+        tombstone_scope = IssueTombstone.user_id == current_user.id
+
+    limit = request.args.get('limit', sync.MAX_PAGE, type=int)
+    raw_token = request.args.get('since')
+    if current_user.role != 'authority' and sharding.enabled():
+        # A citizen's issues may be in any district shard (one token part per shard)
+        result = sync.changes_since_sharded(raw_token, issue_scope, tombstone_scope, fields, limit)
+    else:
+        since = sync.parse_token(raw_token)
+        result = None if since is None else sync.changes_since(since, issue_scope, tombstone_scope, fields, limit)
+    if result is None:
+        return jsonify({'error': 'Invalid sync token'}), 400
+    return jsonify(result)
@@ -0,0 +1,66 @@
+from flask import Blueprint, request, jsonify
+import ratelimit
+import uploads
+
+bp = Blueprint('uploads', __name__)
+
+# Resumable upload protocol for large photos/videos over flaky mobile networks:
+#   POST /api/uploads {filename, size}            -> {upload_id, offset}
+#   PUT  /api/uploads/<id>  Content-Range: bytes a-b/size, raw body
+#   GET  /api/uploads/<id>                        -> {offset, size, complete}
+#   POST /api/uploads/<id>/finalize               -> {image_path}
+# then submit the report with upload_id=<id> instead of an image file.
+
+def _status(upload, offset=None):
+    offset = uploads.current_offset(upload) if offset is None else offset
+    response = jsonify({
+        'upload_id': upload.id, 'offset': offset, 'size': upload.size,
+        'complete': upload.completed_at is not None
+    })
+    response.headers['Upload-Offset'] = str(offset)
+    return response
+
+def _error(e):
+    response = jsonify({'success': False, 'error': str(e), 'offset': e.offset})
+    if e.offset is not None:
+        response.headers['Upload-Offset'] = str(e.offset)
+    return response, e.status
+
+@bp.route('/api/uploads', methods=['POST'])
+@ratelimit.limit_uploads('upload_session')
+def create_upload():
+    data = request.get_json(silent=True) or request.form
+    try:
+        upload = uploads.create_session(data.get('filename'), int(data.get('size') or 0))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid upload size'}), 400
+    except uploads.UploadError as e:
+        return _error(e)
+    response = _status(upload, 0)
+    response.status_code = 201
+    return response
+
+@bp.route('/api/uploads/<upload_id>', methods=['GET', 'HEAD'])
+def upload_status(upload_id):
+    try:
+        return _status(uploads.get_session(upload_id))
+    except uploads.UploadError as e:
+        return _error(e)
+
+@bp.route('/api/uploads/<upload_id>', methods=['PUT', 'PATCH'])
+def upload_chunk(upload_id):
+    try:
+        upload = uploads.get_session(upload_id)
+        offset = uploads.write_chunk(upload, request.headers.get('Content-Range'), request.stream, request.content_length)
+    except uploads.UploadError as e:
+        return _error(e)
+    return _status(upload, offset)
+
+@bp.route('/api/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_upload(upload_id):
+    try:
+        upload = uploads.get_session(upload_id)
+        stored_name = uploads.finalize(upload)
+    except uploads.UploadError as e:
+        return _error(e)
+    return jsonify({'success': True, 'upload_id': upload.id, 'image_path': stored_name})
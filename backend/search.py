@@ -0,0 +1,192 @@
+import re
+from sqlalchemy import column, func, literal_column, select, table, text
+from database import db
+from models import Issue
+import sharding
+
+# --- CONFIGURATION ---
+
+MAX_RESULTS = 100
+FTS_TABLE = 'issues_fts'
+
+# Search index DDL per database. Every statement is idempotent, so
+# install_search_index() can run on each `flask init-db`.
+SQLITE_DDL = [
+    # External-content FTS5 index: stores only the inverted index, rows stay in `issues`
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, content='issues', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    # Kept in sync by triggers on every insert/update/delete of issues
+    f"""CREATE TRIGGER IF NOT EXISTS issues_fts_ai AFTER INSERT ON issues BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS issues_fts_ad AFTER DELETE ON issues BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS issues_fts_au AFTER UPDATE OF title, description ON issues BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+# PostgreSQL: expression GIN index, maintained by the database itself
+POSTGRES_TSVECTOR = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))"
+POSTGRES_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_issues_fulltext ON issues USING GIN ({POSTGRES_TSVECTOR})",
+]
+
+# MySQL: InnoDB FULLTEXT index (no IF NOT EXISTS; checked in install_search_index)
+MYSQL_DDL = [
+    "CREATE FULLTEXT INDEX ix_issues_fulltext ON issues (title, description)",
+]
+
+# --- INDEX MANAGEMENT ---
+
+def install_search_index(rebuild=False):
+    """
+    Creates the full-text index for the active database. Existing rows are
+    indexed when the index is first created, or on demand with `rebuild`.
+    """
+    engine = sharding.engine()
+    dialect = engine.dialect.name
+    with engine.begin() as conn:
+        if dialect == 'sqlite':
+            exists = conn.execute(text(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = :name"
+            ), {'name': FTS_TABLE}).scalar()
+            for ddl in SQLITE_DDL:
+                conn.execute(text(ddl))
+            if rebuild or not exists:
+                conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        elif dialect == 'postgresql':
+            for ddl in POSTGRES_DDL:
+                conn.execute(text(ddl))
+        elif dialect in ('mysql', 'mariadb'):
+            exists = conn.execute(text(
+                "SELECT COUNT(*) FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = 'issues' AND index_name = 'ix_issues_fulltext'"
+            )).scalar()
+            if not exists:
+                for ddl in MYSQL_DDL:
+                    conn.execute(text(ddl))
+        else:
+            return False
+    return True
+
+# --- QUERY ---
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+def _tokens(query):
+    return _TOKEN.findall(query or '')
+
+def _fts5_match(tokens):
+    # Quote every token so user input can never be parsed as FTS5 syntax;
+    # the last token is a prefix match for search-as-you-type.
+    quoted = [f'"{t}"' for t in tokens]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+RESULT_COLUMNS = [
+    Issue.id, Issue.title, Issue.category, Issue.status, Issue.severity_score,
+    Issue.state, Issue.district, Issue.block, Issue.image_path, Issue.created_at
+]
+
+class SearchIndexMissing(Exception):
+    """The database being searched has no full-text index yet (see install_search_index)."""
+
+# Engines already seen with their index in place (it is never dropped at runtime)
+_indexed = set()
+
+def _has_index(bind, dialect):
+    if bind in _indexed or dialect not in ('sqlite', 'mysql', 'mariadb'):
+        return True  # PostgreSQL's expression query works (slowly) without its index
+    if dialect == 'sqlite':
+        exists = db.session.execute(text(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = :name"
+        ), {'name': FTS_TABLE}, bind_arguments={'bind': bind}).scalar()
+    else:
+        exists = db.session.execute(text(
+            "SELECT COUNT(*) FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = 'issues' AND index_name = 'ix_issues_fulltext'"
+        ), bind_arguments={'bind': bind}).scalar()
+    if exists:
+        _indexed.add(bind)
+    return bool(exists)
+
+def _search_statement(dialect, tokens):
+    if dialect == 'sqlite':
+        fts = table(FTS_TABLE, column('rowid'))
+        rank = literal_column(f'bm25({FTS_TABLE})')  # lower is better
+        return select(*RESULT_COLUMNS, (-rank).label('rank')).select_from(
+            fts.join(Issue.__table__, Issue.id == fts.c.rowid)
+        ).where(literal_column(FTS_TABLE).op('MATCH')(_fts5_match(tokens)))
+    if dialect == 'postgresql':
+        tsquery = func.plainto_tsquery('english', ' '.join(tokens))
+        rank = func.ts_rank(literal_column(POSTGRES_TSVECTOR), tsquery)
+        return select(*RESULT_COLUMNS, rank.label('rank')).where(
+            literal_column(POSTGRES_TSVECTOR).op('@@')(tsquery)
+        )
+    if dialect in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import match
+        rank = match(Issue.title, Issue.description, against=' '.join(tokens)).in_natural_language_mode()
+        return select(*RESULT_COLUMNS, rank.label('rank')).where(rank > 0)
+    # No full-text support: substring match on every token, newest first
+    stmt = select(*RESULT_COLUMNS, literal_column('0').label('rank'))
+    for t in tokens:
+        stmt = stmt.where((Issue.title.contains(t)) | (Issue.description.contains(t)))
+    return stmt
+
+def search_issues(query, district=None, block=None, category=None, status=None, limit=20, offset=0):
+    """
+    Ranked full-text search over title + description with optional filters.
+    Returns a list of dicts (best match first); empty for an empty query.
+    Raises SearchIndexMissing when a database searched has no index.
+    """
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+
+    filters = []
+    if district:
+        filters.append(Issue.district == district)
+    if block:
+        filters.append(Issue.block == block)
+    if category:
+        filters.append(Issue.category == category)
+    if status:
+        filters.append(Issue.status == status)
+    limit, offset = max(1, min(limit, MAX_RESULTS)), max(0, offset)
+
+    def shard_rows(limit, offset):
+        # The active shard's database decides the dialect (and whether it has an index)
+        bind = db.session.get_bind(mapper=Issue)
+        dialect = bind.dialect.name
+        if not _has_index(bind, dialect):
+            raise SearchIndexMissing('No full-text index; run `flask init-db`.')
+        stmt = _search_statement(dialect, tokens).where(*filters).order_by(
+            literal_column('rank').desc(), Issue.created_at.desc()
+        )
+        return db.session.execute(stmt.limit(limit).offset(offset)).all()
+
+    if district or not sharding.enabled():
+        rows = shard_rows(limit, offset)
+    else:
+        # Spans every issue shard: the best offset+limit of each, merged by rank
+        rows = sharding.gather(
+            lambda: shard_rows(offset + limit, 0), key=lambda row: row.rank, reverse=True
+        )[offset:offset + limit]
+
+    return [{
+        'id': row.id,
+        'title': row.title,
+        'category': row.category,
+        'status': row.status,
+        'severity_score': row.severity_score,
+        'state': row.state,
+        'district': row.district,
+        'block': row.block,
+        'image_path': row.image_path,
+        'created_at': row.created_at.isoformat() if row.created_at else None,
+        'rank': float(row.rank)
+    } for row in rows]
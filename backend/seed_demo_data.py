@@ -1,10 +1,15 @@
-import json
 import random
 from datetime import datetime, timedelta
-from app import app, db, Issue, User
+from app import create_app
+from database import db
+from models import Issue, User
+from locations import get_odisha_data
 
 def seed_demo_data():
+    app = create_app()
     with app.app_context():
+        # Seeding is an explicit CLI action, so make sure the schema exists first
+        db.create_all()
         print("Seeding Massive Realistic Data (100+ Issues)...")
         
         # Get a user (create if needed for FK)
@@ -17,10 +22,8 @@ def seed_demo_data():
             db.session.commit()
 
         # Load Odisha Data for realistic locations
-        try:
-            with open('data/odisha_data.json', 'r') as f:
-                ODISHA_DATA = json.load(f)
-        except FileNotFoundError:
+        ODISHA_DATA = get_odisha_data()
+        if not ODISHA_DATA:
             print("Error: odisha_data.json not found. Using fallback.")
             ODISHA_DATA = {"Khordha": ["Bhubaneswar", "Jatni"], "Cuttack": ["Cuttack Sadar", "Barang"]}
 
@@ -0,0 +1,127 @@
+import math
+from datetime import datetime
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import select
+from database import db
+from models import Issue
+import sharding
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# --- JSON ENCODING ---
+
+def _finite(obj):
+    """`obj` with NaN/Infinity floats replaced by None (what orjson writes for them)."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes with orjson when it is installed and falls
+    back to the standard encoder otherwise, or for anything orjson can't
+    reproduce exactly (including non-ASCII text, which orjson can't \\u-escape).
+    Both paths give the same output: sorted keys, compact separators, Flask's
+    encoding of dates (RFC 822), decimals and UUIDs, non-ASCII text as \\u
+    escapes (Flask's default), and null for NaN/Infinity
+    (which are not valid JSON).
+    """
+
+    def dumps(self, obj, **kwargs):
+        if 'indent' not in kwargs:
+            kwargs.setdefault('separators', (',', ':'))
+        if orjson is not None and kwargs == {'separators': (',', ':')}:
+            try:
+                # Dates go through Flask's default(); non-str keys etc. raise and use the fallback
+                text = orjson.dumps(
+                    obj, default=self.default, option=orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                ).decode('utf-8')
+            except TypeError:
+                pass
+            else:
+                # Re-encoding a non-ASCII payload is cheaper than escaping orjson's output
+                if text.isascii() or not self.ensure_ascii:
+                    return text
+        kwargs.setdefault('allow_nan', False)
+        try:
+            return super().dumps(obj, **kwargs)
+        except ValueError as e:
+            if 'Out of range float' not in str(e):
+                raise
+            return super().dumps(_finite(obj), **kwargs)
+
+# --- ISSUE SERIALIZATION ---
+
+# Every field a list endpoint may return, mapped to its column
+ISSUE_FIELDS = {
+    'id': Issue.id,
+    'title': Issue.title,
+    'description': Issue.description,
+    'category': Issue.category,
+    'status': Issue.status,
+    'severity_score': Issue.severity_score,
+    'severity_level': Issue.severity_level,
+    'location_context': Issue.location_context,
+    'latitude': Issue.latitude,
+    'longitude': Issue.longitude,
+    'state': Issue.state,
+    'district': Issue.district,
+    'block': Issue.block,
+    'image_path': Issue.image_path,
+    'created_at': Issue.created_at,
+    'resolved_at': Issue.resolved_at
+}
+
+# Default payloads (unchanged from the original per-endpoint dicts)
+FEED_FIELDS = ('id', 'title', 'description', 'category', 'status', 'block', 'district', 'image_path', 'created_at')
+ISSUE_LIST_FIELDS = FEED_FIELDS + ('severity_score',)
+
+def parse_fields(raw, default):
+    """
+    Parses a ?fields=a,b,c projection. Returns (fields, error); unknown field
+    names are an error, and a value naming no fields (missing, empty, ",")
+    means `default`, the endpoint's full payload.
+    """
+    fields = [f.strip() for f in (raw or '').split(',') if f.strip()]
+    if not fields:
+        return list(default), None
+    unknown = [f for f in fields if f not in ISSUE_FIELDS]
+    if unknown:
+        return None, f"Unknown field(s): {', '.join(unknown)}"
+    return fields, None
+
+def select_issues(fields, extra=()):
+    """SELECT of just the projected columns (plus `extra` columns for internal use)."""
+    return select(*[ISSUE_FIELDS[f] for f in fields], *extra)
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def rows_to_dicts(rows, fields):
+    """Plain dicts from result rows, no ORM objects involved."""
+    return [{f: _value(v) for f, v in zip(fields, row)} for row in rows]
+
+def object_to_dict(issue, fields):
+    """The rows_to_dicts dict for an Issue already in memory."""
+    return {f: _value(getattr(issue, ISSUE_FIELDS[f].key)) for f in fields}
+
+def fetch_issue_dicts(stmt, fields):
+    return rows_to_dicts(db.session.execute(stmt), fields)
+
+def _newest_first(row):
+    return row[-1] or datetime.min
+
+def fetch_recent_issue_dicts(where, fields, limit=None):
+    """Newest-first issue dicts matching `where`, merged across issue shards."""
+    stmt = select_issues(fields, extra=(Issue.created_at,)).where(*where).order_by(Issue.created_at.desc())
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    rows = sharding.gather(lambda: db.session.execute(stmt).all(), key=_newest_first, reverse=True, limit=limit)
+    return rows_to_dicts(rows, fields)
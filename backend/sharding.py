@@ -0,0 +1,150 @@
+import heapq
+from contextlib import contextmanager
+from flask import current_app, request
+from flask_login import current_user
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy.orm import Session
+from database import db, current_shard, shard_bind_key, GLOBAL_TABLES
+from models import Issue, SyncSequence
+
+# --- CONFIGURATION ---
+
+# Issue ids of the k-th shard (1-based, config order) start at k * ID_BLOCK, so ids stay
+# unique across databases and the owning shard can be read off an id.
+ID_BLOCK = 10 ** 12
+ID_SEQUENCE = 'issue_ids'
+
+# Optional issue sharding by district. ISSUE_SHARDS maps a shard name to its database
+# and districts, e.g. {'coastal': {'uri': 'sqlite:///coastal.db', 'districts': ['Puri', 'Ganjam']}}.
+# Districts not listed stay in the primary database. Users and authorities are global.
+
+def configure(app):
+    """Registers one SQLAlchemy bind per shard; call before db.init_app()."""
+    shards = app.config.get('ISSUE_SHARDS') or {}
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    districts = {}
+    for name, spec in shards.items():
+        binds[shard_bind_key(name)] = spec['uri']
+        for district in spec.get('districts', ()):
+            districts[district] = name
+    app.config['SQLALCHEMY_BINDS'] = binds
+    app.extensions['issue_shards'] = {'names': list(shards), 'districts': districts}
+    if shards:
+        app.before_request(route_request)
+
+def _shards():
+    return current_app.extensions.get('issue_shards') or {'names': [], 'districts': {}}
+
+def enabled():
+    return bool(_shards()['names'])
+
+def shard_names():
+    """Every place issues live: the primary database (None) and each shard."""
+    return [None] + _shards()['names']
+
+def shard_for_district(district):
+    return _shards()['districts'].get(district)
+
+def shard_for_issue_id(issue_id):
+    index = int(issue_id) // ID_BLOCK
+    names = _shards()['names']
+    return names[index - 1] if 0 < index <= len(names) else None
+
+# --- ROUTING ---
+
+@contextmanager
+def use_shard(name):
+    token = current_shard.set(name)
+    try:
+        yield
+    finally:
+        current_shard.reset(token)
+
+def use_district(district):
+    """Points the rest of this request at the shard owning `district` (e.g. a new report's)."""
+    if enabled():
+        current_shard.set(shard_for_district(district))
+
+def use_issue_id(issue_id):
+    """Points the rest of this request at the shard owning `issue_id`."""
+    if enabled():
+        current_shard.set(shard_for_issue_id(issue_id))
+
+def route_request():
+    """
+    before_request hook: a district in the URL or query string picks the
+    shard; otherwise authorities work in their own district's shard, and
+    everything else starts on the primary database.
+    """
+    district = (request.view_args or {}).get('district') or request.args.get('district')
+    if district is None and getattr(current_user, 'role', None) == 'authority':
+        district = current_user.district
+    current_shard.set(shard_for_district(district))
+
+def engine():
+    """Engine for raw DDL/maintenance on the active shard."""
+    shard = current_shard.get()
+    return db.engines[shard_bind_key(shard)] if shard is not None else db.engine
+
+# --- SCATTER-GATHER ---
+
+def scatter(fn, local=False):
+    """
+    [fn() for each shard], with each call running against that shard. With
+    sharding off, or `local` (the caller's scope lives in the active shard
+    anyway), it is just [fn()].
+    """
+    if local or not enabled():
+        return [fn()]
+    results = []
+    for name in shard_names():
+        with use_shard(name):
+            results.append(fn())
+    return results
+
+def gather(fn, key=None, reverse=False, limit=None, local=False):
+    """
+    Concatenated list results of `fn` across shards. With `key`, each
+    shard's list must already be sorted by it; they are merged in order and
+    cut to `limit`.
+    """
+    parts = scatter(fn, local)
+    if len(parts) == 1:
+        return list(parts[0])[:limit] if limit is not None else list(parts[0])
+    if key is None:
+        merged = [item for part in parts for item in part]
+    else:
+        merged = list(heapq.merge(*parts, key=key, reverse=reverse))
+    return merged[:limit] if limit is not None else merged
+
+# --- SCHEMA AND IDS ---
+
+def create_shard_tables():
+    """Creates every non-global table in each shard database."""
+    tables = [t for name, t in db.metadata.tables.items() if name not in GLOBAL_TABLES]
+    for name in _shards()['names']:
+        db.metadata.create_all(db.engines[shard_bind_key(name)], tables=tables)
+
+def _reserve_ids(connection, shard, count):
+    table = SyncSequence.__table__
+    result = connection.execute(
+        update(table).where(table.c.name == ID_SEQUENCE).values(value=table.c.value + count)
+    )
+    if result.rowcount == 0:
+        floor = (_shards()['names'].index(shard) + 1) * ID_BLOCK
+        base = connection.execute(select(func.max(Issue.__table__.c.id))).scalar() or 0
+        connection.execute(insert(table).values(name=ID_SEQUENCE, value=max(floor, base) + count))
+    return connection.execute(select(table.c.value).where(table.c.name == ID_SEQUENCE)).scalar()
+
+@event.listens_for(Session, 'before_flush')
+def _assign_shard_ids(session, flush_context, instances):
+    # New issues in a shard take ids from that shard's own range
+    shard = current_shard.get()
+    if shard is None:
+        return
+    new = [obj for obj in session.new if isinstance(obj, Issue) and obj.id is None]
+    if not new:
+        return
+    last = _reserve_ids(session.connection(), shard, len(new))
+    for offset, obj in enumerate(new):
+        obj.id = last - len(new) + 1 + offset
@@ -0,0 +1,154 @@
+import os
+import re
+import shutil
+import uuid
+from datetime import datetime
+from sqlalchemy import select
+from models import Issue
+import export
+import sharding
+
+# --- CONFIGURATION ---
+
+SNAPSHOT_CHUNK_SIZE = 50000
+# Completed snapshots to keep on disk (older ones are pruned after each run)
+SNAPSHOT_KEEP = 3
+CURRENT_POINTER = 'CURRENT'
+# Snapshot directory names: UTC timestamp to the microsecond plus a random suffix, so
+# runs never collide and names sort chronologically (older second-resolution names match too)
+SNAPSHOT_NAME = re.compile(r'^\d{8}T\d{6}(\d{6}-[0-9a-f]{8})?$')
+
+SNAPSHOT_COLUMNS = [
+    'id', 'category', 'severity_level', 'location_context', 'status',
+    'severity_score', 'state', 'district', 'block', 'created_at', 'resolved_at'
+]
+PARTITION_COLUMNS = ['state', 'district', 'month']
+
+# --- WRITE PATH (periodic job: `flask snapshot-issues`) ---
+
+def write_snapshot(snapshot_root):
+    """
+    Writes all issues as Parquet partitioned by state/district/month into a new
+    timestamped directory, then flips the CURRENT pointer to it. Readers only
+    ever see complete snapshots. Returns (snapshot_path, row_count).
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    name = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+    target = os.path.join(snapshot_root, name)
+    staging = target + '.tmp'
+    os.makedirs(staging, exist_ok=True)
+
+    stmt = select(*[getattr(Issue, c) for c in SNAPSHOT_COLUMNS]).order_by(Issue.id)
+    rows_written = 0
+    for shard, i, rows in _issue_chunks(stmt):
+        df = pd.DataFrame.from_records(rows, columns=SNAPSHOT_COLUMNS)
+        df['created_at'] = pd.to_datetime(df['created_at'])
+        df['resolved_at'] = pd.to_datetime(df['resolved_at'])
+        df['month'] = df['created_at'].dt.strftime('%Y-%m').fillna('unknown')
+        df['state'] = df['state'].fillna('Unknown')
+        df['district'] = df['district'].fillna('Unknown')
+        pq.write_to_dataset(
+            pa.Table.from_pandas(df, preserve_index=False),
+            staging,
+            partition_cols=PARTITION_COLUMNS,
+            basename_template=f'part-{shard or "main"}-{i}-{{i}}.parquet'
+        )
+        rows_written += len(df)
+
+    os.rename(staging, target)
+    pointer_tmp = os.path.join(snapshot_root, CURRENT_POINTER + '.tmp')
+    with open(pointer_tmp, 'w') as f:
+        f.write(name)
+    os.replace(pointer_tmp, os.path.join(snapshot_root, CURRENT_POINTER))
+
+    _prune(snapshot_root, keep=SNAPSHOT_KEEP)
+    return target, rows_written
+
+def _issue_chunks(stmt):
+    """(shard, chunk_number, rows) for every chunk of `stmt` in every issue shard."""
+    for shard in sharding.shard_names():
+        with sharding.use_shard(shard):
+            for i, rows in enumerate(export.iter_chunks(stmt, SNAPSHOT_CHUNK_SIZE)):
+                yield shard, i, rows
+
+def _prune(snapshot_root, keep):
+    snapshots = sorted(
+        d for d in os.listdir(snapshot_root)
+        if SNAPSHOT_NAME.match(d) and os.path.isdir(os.path.join(snapshot_root, d))
+    )
+    for old in snapshots[:-keep]:
+        shutil.rmtree(os.path.join(snapshot_root, old), ignore_errors=True)
+
+# --- READ PATH (pandas over the latest snapshot, never the OLTP database) ---
+
+def current_snapshot(snapshot_root):
+    """Returns (path, name) of the latest complete snapshot, or (None, None)."""
+    try:
+        with open(os.path.join(snapshot_root, CURRENT_POINTER)) as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None, None
+    path = os.path.join(snapshot_root, name)
+    return (path, name) if os.path.isdir(path) else (None, None)
+
+def load_issues(snapshot_path, columns, state=None, district=None, block=None, month_from=None, month_to=None):
+    """
+    Reads only the needed columns; state/district/month filters prune whole
+    partition directories before any file is opened.
+    """
+    import pandas as pd
+
+    filters = []
+    if state:
+        filters.append(('state', '=', state))
+    if district:
+        filters.append(('district', '=', district))
+    if month_from:
+        filters.append(('month', '>=', month_from))
+    if month_to:
+        filters.append(('month', '<=', month_to))
+    if block:
+        filters.append(('block', '=', block))
+
+    wanted = sorted(set(columns) | ({'block'} if block else set()))
+    df = pd.read_parquet(snapshot_path, columns=wanted, filters=filters or None)
+    return df
+
+def category_distribution(snapshot_path, **scope):
+    """Issue counts per month and category: {month: {category: count}}."""
+    df = load_issues(snapshot_path, ['month', 'category'], **scope)
+    if df.empty:
+        return {}
+    counts = df.groupby(['month', 'category'], observed=True).size()
+    result = {}
+    for (month, category), count in counts.items():
+        result.setdefault(str(month), {})[category] = int(count)
+    return result
+
+def resolution_lag_by_block(snapshot_path, **scope):
+    """Resolved-issue lag (hours) per block: count, mean, p50, p90."""
+    df = load_issues(snapshot_path, ['block', 'status', 'created_at', 'resolved_at'], **scope)
+    df = df[(df['status'] == 'Resolved') & df['resolved_at'].notna()]
+    if df.empty:
+        return []
+    lag = (df['resolved_at'] - df['created_at']).dt.total_seconds() / 3600
+    stats = lag.groupby(df['block']).agg(['count', 'mean', 'median', lambda s: s.quantile(0.9)])
+    stats.columns = ['count', 'mean', 'p50', 'p90']
+    return [
+        {
+            'block': block,
+            'resolved_count': int(row['count']),
+            'mean_hours': round(float(row['mean']), 1),
+            'p50_hours': round(float(row['p50']), 1),
+            'p90_hours': round(float(row['p90']), 1)
+        }
+        for block, row in stats.sort_values('mean', ascending=False).iterrows()
+    ]
+
+REPORTS = {
+    'category_distribution': category_distribution,
+    'resolution_lag': resolution_lag_by_block
+}
@@ -0,0 +1,154 @@
+from sqlalchemy import event, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+from database import db
+from models import Issue, IssueTombstone, SyncSequence
+import serializers
+import sharding
+
+# --- CONFIGURATION ---
+
+SEQUENCE_NAME = 'issues'
+
+# Largest page a single /api/sync call returns; clients follow `has_more`
+MAX_PAGE = 1000
+
+# --- CHANGE SEQUENCE ---
+
+def next_sequence(connection, count=1):
+    """
+    Reserves `count` consecutive change numbers and returns the last one
+    (the range is last - count + 1 .. last).
+
+    The counter row is updated inside the caller's transaction, so concurrent
+    writers queue on it and numbers become visible in commit order: a client
+    that has seen N can never later miss a change numbered below N.
+    """
+    table = SyncSequence.__table__
+    result = connection.execute(
+        update(table).where(table.c.name == SEQUENCE_NAME).values(value=table.c.value + count)
+    )
+    if result.rowcount == 0:
+        # First use (or a migrated database): continue from what the rows carry
+        base = connection.execute(select(func.max(Issue.__table__.c.change_seq))).scalar() or 0
+        connection.execute(insert(table).values(name=SEQUENCE_NAME, value=base + count))
+    return connection.execute(select(table.c.value).where(table.c.name == SEQUENCE_NAME)).scalar()
+
+def stamp_updates(connection, updates):
+    """Adds a 'b_seq' change number to each executemany parameter dict."""
+    if not updates:
+        return
+    seq = next_sequence(connection, len(updates)) - len(updates)
+    for params in updates:
+        seq += 1
+        params['b_seq'] = seq
+
+def current_sequence(connection):
+    table = SyncSequence.__table__
+    value = connection.execute(select(table.c.value).where(table.c.name == SEQUENCE_NAME)).scalar()
+    if value is None:
+        value = connection.execute(select(func.max(Issue.__table__.c.change_seq))).scalar()
+    return value or 0
+
+@event.listens_for(Session, 'before_flush')
+def _stamp_issue_changes(session, flush_context, instances):
+    # ORM writes: give every new or modified issue a fresh change number and
+    # leave a tombstone where an issue leaves a scope. Core bulk updates
+    # (rescore.py, the authority queue write-back) call next_sequence directly.
+    stamped = []
+    tombstones = []
+    for obj in session.new:
+        if isinstance(obj, Issue):
+            stamped.append(obj)
+    for obj in session.dirty:
+        if not isinstance(obj, Issue) or not session.is_modified(obj, include_collections=False):
+            continue
+        stamped.append(obj)
+        for old_block in inspect(obj).attrs.block.history.deleted:
+            tombstones.append({'issue_id': obj.id, 'user_id': None, 'block': old_block})
+    for obj in session.deleted:
+        if isinstance(obj, Issue):
+            tombstones.append({'issue_id': obj.id, 'user_id': obj.user_id, 'block': obj.block})
+
+    count = len(stamped) + len(tombstones)
+    if not count:
+        return
+    seq = next_sequence(session.connection(), count) - count
+    for obj in stamped:
+        seq += 1
+        obj.change_seq = seq
+    for tombstone in tombstones:
+        seq += 1
+        session.add(IssueTombstone(change_seq=seq, **tombstone))
+
+# --- DELTA QUERIES ---
+
+def parse_token(raw):
+    """Sync tokens are opaque to clients; returns the sequence number or None if invalid."""
+    if raw in (None, ''):
+        return 0
+    try:
+        value = int(raw)
+    except ValueError:
+        return None
+    return value if value >= 0 else None
+
+def changes_since(since, issue_scope, tombstone_scope, fields, limit=MAX_PAGE):
+    """
+    Issues changed and tombstones recorded after `since` within a scope, in
+    change order. Returns a dict with the next token, the issues, the deleted
+    ids and whether the page was cut short.
+    """
+    limit = max(1, min(limit, MAX_PAGE))
+    # Read the counter first: anything committed after this is picked up now
+    # or on the next call, never skipped.
+    head = current_sequence(db.session.connection())
+
+    stmt = serializers.select_issues(fields, extra=(Issue.change_seq,)).where(
+        issue_scope, Issue.change_seq > since
+    ).order_by(Issue.change_seq).limit(limit + 1)
+    issue_rows = db.session.execute(stmt).all()
+    tombstone_rows = []
+    if since:
+        tombstone_rows = db.session.execute(
+            select(IssueTombstone.issue_id, IssueTombstone.change_seq).where(
+                tombstone_scope, IssueTombstone.change_seq > since
+            ).order_by(IssueTombstone.change_seq).limit(limit + 1)
+        ).all()
+
+    # Merge both streams by change number and cut at `limit`
+    merged = sorted(
+        [(row[-1], 0, row) for row in issue_rows] + [(row[1], 1, row) for row in tombstone_rows],
+        key=lambda item: item[:2]
+    )
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    issues = serializers.rows_to_dicts([row[:-1] for _, kind, row in merged if kind == 0], fields)
+    # An issue that left and came back is in scope now: its row wins
+    returned = {item['id'] for item in issues}
+    deleted = [row[0] for _, kind, row in merged if kind == 1 and row[0] not in returned]
+    token = merged[-1][0] if has_more else max(head, merged[-1][0] if merged else since)
+    return {'token': str(token), 'issues': issues, 'deleted': deleted, 'has_more': has_more}
+
+def changes_since_sharded(raw_token, issue_scope, tombstone_scope, fields, limit=MAX_PAGE):
+    """
+    changes_since over every issue shard, for scopes that span them (a
+    citizen's own issues). The token is one position per shard, dot-separated;
+    returns None for a token that doesn't fit the current shard layout.
+    """
+    names = sharding.shard_names()
+    parts = raw_token.split('.') if raw_token else ['0'] * len(names)
+    positions = [parse_token(part) for part in parts]
+    if len(positions) != len(names) or None in positions:
+        return None
+
+    results = []
+    for name, since in zip(names, positions):
+        with sharding.use_shard(name):
+            results.append(changes_since(since, issue_scope, tombstone_scope, fields, limit))
+    return {
+        'token': '.'.join(result['token'] for result in results),
+        'issues': [item for result in results for item in result['issues']],
+        'deleted': [issue_id for result in results for issue_id in result['deleted']],
+        'has_more': any(result['has_more'] for result in results)
+    }
@@ -0,0 +1,115 @@
+import os
+import sys
+import pytest
+from werkzeug.security import generate_password_hash
+
+# The backend modules import each other by top-level name (run from backend/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from database import db, current_shard
+from models import User, Authority, Issue
+import cri_engine
+import priority_index
+import sharding
+
+@pytest.fixture
+def make_app(tmp_path):
+    """
+    Factory for an app on fresh SQLite files under tmp_path, with its
+    app context pushed and every table created. `shards` maps a shard name
+    to its districts (ISSUE_SHARDS without the URIs).
+    """
+    contexts = []
+
+    def make(shards=None, **config):
+        app = create_app({
+            'TESTING': True,
+            'SECRET_KEY': 'test',
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "primary.db"}',
+            'ISSUE_SHARDS': {
+                name: {'uri': f'sqlite:///{tmp_path / name}.db', 'districts': districts}
+                for name, districts in (shards or {}).items()
+            },
+            'RATE_LIMIT_ENABLED': False,
+            **config
+        })
+        context = app.app_context()
+        context.push()
+        contexts.append(context)
+        # Only the primary bind: Flask-SQLAlchemy keeps every bind key any app
+        # in the process has registered, including other tests' shards
+        db.create_all(bind_key=None)
+        sharding.create_shard_tables()
+        return app
+
+    yield make
+    for context in reversed(contexts):
+        db.session.remove()
+        context.pop()
+    # Per-process state outlives the app: a test client request runs in the
+    # test's own context, so the shard it picked would leak into the next test
+    current_shard.set(None)
+    priority_index._indexes.clear()
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+@pytest.fixture
+def sharded_app(make_app):
+    return make_app(shards={'coastal': ['Puri']})
+
+PASSWORD = 'password'
+
+@pytest.fixture
+def make_user():
+    def make(email='citizen@example.com', **fields):
+        user = User(username=email.split('@')[0], email=email, password=generate_password_hash(PASSWORD),
+                    is_verified=True, **fields)
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make
+
+@pytest.fixture
+def make_authority():
+    def make(email='authority@example.com', district='Khordha', block='Jatani', **fields):
+        # Ids clear of the citizens' so the two tables' ids never collide in a test
+        authority = Authority(id=fields.pop('id', 1000), username=email.split('@')[0], email=email,
+                              password=generate_password_hash(PASSWORD), state='Odisha',
+                              district=district, block=block, **fields)
+        db.session.add(authority)
+        db.session.commit()
+        return authority
+    return make
+
+@pytest.fixture
+def login():
+    """Factory for a test client logged in as `email` through /api/login."""
+    def make(app, email):
+        client = app.test_client()
+        response = client.post('/api/login', json={'email': email, 'password': PASSWORD})
+        assert response.json['success'], response.json
+        return client
+    return make
+
+@pytest.fixture
+def make_issue():
+    """
+    Factory for a committed, scored issue in the shard owning its district
+    (Khordha/Jatani unless given). `rules` picks the scoring version.
+    """
+    def make(user, district='Khordha', block='Jatani', rules=None, **fields):
+        issue = Issue(
+            user_id=user.id, title=fields.pop('title', 'Pothole'), description='d',
+            category=fields.pop('category', 'Pothole'), state='Odisha', district=district, block=block,
+            reporter_trust=user.trust_score, **fields
+        )
+        cri_engine.apply_issue_risk(issue, rules=cri_engine.get_rule_set(rules))
+        with sharding.use_shard(sharding.shard_for_district(district)):
+            db.session.add(issue)
+            db.session.commit()
+            issue_id = issue.id
+        return issue_id
+    return make
@@ -0,0 +1,53 @@
+import threading
+from database import db
+from models import Issue
+import priority_index
+
+def test_top_issues_ranks_open_issues_by_risk(app, make_user, make_issue):
+    user = make_user()
+    low = make_issue(user, severity_level='low')
+    high = make_issue(user, severity_level='high', location_context='school')
+    medium = make_issue(user, severity_level='medium')
+    make_issue(user, block='Bhubaneswar', severity_level='high')
+
+    assert [issue_id for issue_id, _ in priority_index.top_issues('Jatani', 2)] == [high, medium]
+
+    # Applied to this process's index after commit, without a reload
+    db.session.get(Issue, high).status = 'Resolved'
+    db.session.commit()
+    assert [issue_id for issue_id, _ in priority_index.top_issues('Jatani', 5)] == [medium, low]
+
+def test_cold_block_load_does_not_block_other_blocks(app, make_user, make_issue, monkeypatch):
+    user = make_user()
+    make_issue(user, block='Gop')
+    warm = make_issue(user, block='Jatani')
+    loading, release = threading.Event(), threading.Event()
+    load_block = priority_index._load_block
+
+    def slow_load(block, version):
+        if block == 'Gop':
+            loading.set()
+            release.wait(10)
+        return load_block(block, version)
+
+    monkeypatch.setattr(priority_index, '_load_block', slow_load)
+    results = {}
+
+    def top(block):
+        with app.app_context():
+            results[block] = priority_index.top_issues(block, 5)
+            db.session.remove()
+
+    cold = threading.Thread(target=top, args=('Gop',))
+    cold.start()
+    assert loading.wait(5)
+    other = threading.Thread(target=top, args=('Jatani',))
+    other.start()
+    other.join(5)
+    finished_while_loading = not other.is_alive()
+    release.set()
+    cold.join(5)
+
+    assert finished_while_loading
+    assert [issue_id for issue_id, _ in results['Jatani']] == [warm]
+    assert len(results['Gop']) == 1
@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import select, update
+from database import db
+from models import Issue, IssueEvent
+import cri_engine
+import rescore
+import sharding
+
+def _issues():
+    return {issue.id: issue for issue in db.session.execute(select(Issue)).scalars()}
+
+def test_second_run_updates_nothing(app, make_user, make_issue):
+    user = make_user()
+    ids = [make_issue(user, rules='v1') for _ in range(3)]
+
+    assert rescore.rescore_unresolved(chunk_size=2) == 3
+    assert rescore.rescore_unresolved(chunk_size=2) == 0
+    assert {issue.rule_version for issue in _issues().values()} == {'v2'}
+    assert db.session.execute(select(IssueEvent.issue_id).where(IssueEvent.kind == 'score')).scalars().all() == ids
+
+def test_interrupted_run_resumes_where_it_stopped(app, make_user, make_issue, monkeypatch):
+    user = make_user()
+    first, *rest = [make_issue(user, rules='v1') for _ in range(3)]
+    write_chunk = rescore._write_chunk
+    calls = []
+
+    def fail_second_chunk(updates, version, rows):
+        calls.append(rows)
+        if len(calls) == 2:
+            raise RuntimeError('worker killed')
+        return write_chunk(updates, version, rows)
+
+    monkeypatch.setattr(rescore, '_write_chunk', fail_second_chunk)
+    with pytest.raises(RuntimeError):
+        rescore.rescore_unresolved(chunk_size=1)
+    db.session.rollback()
+    assert [issue_id for issue_id, issue in _issues().items() if issue.rule_version == 'v2'] == [first]
+
+    monkeypatch.setattr(rescore, '_write_chunk', write_chunk)
+    assert rescore.rescore_unresolved(chunk_size=1) == 2
+
+def test_issue_resolved_mid_run_is_skipped(app, make_user, make_issue, monkeypatch):
+    user = make_user()
+    kept = make_issue(user, rules='v1')
+    resolved = make_issue(user, rules='v1')
+    score_chunk = rescore._score_chunk
+
+    def resolve_while_scoring(args):
+        # Another request resolves the issue after the chunk was read
+        with db.engine.begin() as connection:
+            connection.execute(update(Issue.__table__).where(Issue.__table__.c.id == resolved).values(
+                status='Resolved', severity_score=0.0
+            ))
+        return score_chunk(args)
+
+    monkeypatch.setattr(rescore, '_score_chunk', resolve_while_scoring)
+    assert rescore.rescore_unresolved() == 1
+
+    issues = _issues()
+    assert issues[kept].rule_version == 'v2'
+    assert (issues[resolved].status, issues[resolved].severity_score, issues[resolved].rule_version) == ('Resolved', 0.0, 'v1')
+    assert db.session.execute(select(IssueEvent.issue_id).where(IssueEvent.kind == 'score')).scalars().all() == [kept]
+
+def test_trust_change_rescores_only_that_reporters_open_issues(sharded_app, make_user, make_issue):
+    reporter = make_user('reporter@example.com')
+    other = make_user('other@example.com')
+    own = {make_issue(reporter), make_issue(reporter, district='Puri', block='Gop')}
+    untouched = {
+        make_issue(reporter, district='Puri', block='Gop', status='Resolved'),
+        make_issue(other, district='Puri', block='Gop'),
+        make_issue(other)
+    }
+
+    reporter.trust_score = 0.5
+    db.session.commit()
+
+    rules = cri_engine.get_rule_set()
+    seen = set()
+    for shard in sharding.shard_names():
+        with sharding.use_shard(shard):
+            for issue in db.session.execute(select(Issue)).scalars():
+                seen.add(issue.id)
+                if issue.id in own:
+                    assert issue.reporter_trust == 0.5
+                    assert issue.severity_score == pytest.approx(cri_engine.calculate_issue_risk(issue, 0.5, rules), abs=0.05)
+                else:
+                    assert issue.reporter_trust == 1.0
+            rescored = db.session.execute(select(IssueEvent.issue_id).where(IssueEvent.kind == 'score')).scalars().all()
+            assert set(rescored) <= own
+            db.session.commit()
+    assert seen == own | untouched
+    # One issue in each database
+    assert {sharding.shard_for_issue_id(issue_id) for issue_id in own} == {None, 'coastal'}
@@ -0,0 +1,32 @@
+import decimal
+import uuid
+from datetime import date, datetime
+import pytest
+import serializers
+
+PAYLOADS = [
+    {'title': 'ଓଡ଼ିଶା road', 'emoji': '😀', 'escapes': '\x01"\\ é', 'n': [1, 2.5, None, True]},
+    {'created_at': datetime(2024, 1, 2, 3, 4, 5), 'day': date(2024, 1, 2),
+     'amount': decimal.Decimal('1.50'), 'ref': uuid.UUID(int=1)},
+    {'score': float('nan'), 'other': float('inf'), 'nested': {'b': 1, 'a': [float('-inf')]}},
+    [{'id': i, 'title': f'Pothole {i}', 'severity_score': i / 3} for i in range(50)],
+]
+
+@pytest.mark.parametrize('payload', PAYLOADS)
+def test_orjson_and_standard_paths_agree(app, payload, monkeypatch):
+    pytest.importorskip('orjson')
+    fast = app.json.dumps(payload)
+    monkeypatch.setattr(serializers, 'orjson', None)
+    assert app.json.dumps(payload) == fast
+    assert fast.isascii()
+
+def test_non_ascii_is_escaped_like_flask(app):
+    assert app.json.dumps({'t': 'ଓ'}) == '{"t":"\\u0b13"}'
+
+@pytest.mark.parametrize('raw', [None, '', ',', ' , '])
+def test_empty_field_list_means_default(raw):
+    assert serializers.parse_fields(raw, ('id', 'title')) == (['id', 'title'], None)
+
+def test_unknown_field_is_an_error():
+    fields, error = serializers.parse_fields('id,password', ('id',))
+    assert fields is None and 'password' in error
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+from database import db
+from models import Issue
+import events
+import geocode
+import sharding
+
+def _resolve(issue_id):
+    with sharding.use_shard(sharding.shard_for_issue_id(issue_id)):
+        db.session.get(Issue, issue_id).status = 'Resolved'
+        db.session.commit()
+
+def test_new_issue_lands_in_its_district_shard(sharded_app, make_user, make_issue):
+    user = make_user()
+    assert sharding.shard_for_issue_id(make_issue(user)) is None
+    assert sharding.shard_for_issue_id(make_issue(user, district='Puri', block='Gop')) == 'coastal'
+
+def test_sla_metrics_merge_every_shard(sharded_app, make_user, make_issue, login):
+    user = make_user()
+    make_issue(user, status='Pending')
+    resolved = make_issue(user, district='Puri', block='Gop', status='Pending')
+    make_issue(user, district='Puri', block='Gop', status='Pending')
+    _resolve(resolved)
+
+    metrics = events.sla_metrics(now=datetime.utcnow() + timedelta(minutes=1))
+    assert metrics['open']['Pending']['count'] == 2
+    assert sum(row['count'] for row in metrics['turnaround_by_authority']) == 1
+
+    # A block in a shard, asked for without its district, is still found
+    client = login(sharded_app, user.email)
+    by_block = client.get('/api/sla?block=Gop').json
+    assert by_block['open']['Pending']['count'] == 1
+    assert [row['count'] for row in by_block['turnaround_by_authority']] == [1]
+
+def test_geocode_learns_centroids_from_every_shard(sharded_app, make_user, make_issue, tmp_path):
+    sharded_app.config['GEOCODE_CENTROIDS_PATH'] = str(tmp_path / 'none.json')
+    geocode._index = None
+    user = make_user()
+    make_issue(user, latitude=20.17, longitude=85.70)
+    make_issue(user, district='Puri', block='Gop', latitude=19.89, longitude=86.09)
+
+    try:
+        assert geocode.reverse_geocode(19.88, 86.10) == ('Odisha', 'Puri', 'Gop')
+        assert geocode.reverse_geocode(20.17, 85.71) == ('Odisha', 'Khordha', 'Jatani')
+    finally:
+        geocode._index = None
@@ -0,0 +1,101 @@
+from database import db
+from models import Issue
+import sharding
+
+def _ids(result):
+    return sorted(item['id'] for item in result['issues'])
+
+def _set_status(issue_id, status):
+    with sharding.use_shard(sharding.shard_for_issue_id(issue_id)):
+        db.session.get(Issue, issue_id).status = status
+        db.session.commit()
+
+def test_delta_after_token_has_only_later_changes(app, make_user, make_issue, login):
+    user = make_user()
+    first, second = make_issue(user), make_issue(user)
+    client = login(app, user.email)
+
+    full = client.get('/api/sync').json
+    assert _ids(full) == [first, second] and full['deleted'] == [] and not full['has_more']
+
+    _set_status(first, 'In Progress')
+    third = make_issue(user)
+    delta = client.get(f"/api/sync?since={full['token']}").json
+    assert _ids(delta) == [first, third]
+    assert int(delta['token']) > int(full['token'])
+
+    assert client.get(f"/api/sync?since={delta['token']}").json == {
+        'token': delta['token'], 'issues': [], 'deleted': [], 'has_more': False
+    }
+
+def test_pages_follow_has_more_in_change_order(app, make_user, make_issue, login):
+    user = make_user()
+    ids = [make_issue(user) for _ in range(3)]
+    client = login(app, user.email)
+
+    seen, token = [], ''
+    while True:
+        page = client.get(f'/api/sync?since={token}&limit=2').json
+        seen += [item['id'] for item in page['issues']]
+        token = page['token']
+        if not page['has_more']:
+            break
+    assert seen == ids
+
+def test_invalid_token_is_rejected(app, make_user, login):
+    user = make_user()
+    client = login(app, user.email)
+    assert client.get('/api/sync?since=-1').status_code == 400
+    assert client.get('/api/sync?since=abc').status_code == 400
+
+def test_deleted_issue_is_sent_as_tombstone(app, make_user, make_issue, login):
+    user = make_user()
+    kept, gone = make_issue(user), make_issue(user)
+    client = login(app, user.email)
+    token = client.get('/api/sync').json['token']
+
+    db.session.delete(db.session.get(Issue, gone))
+    db.session.commit()
+    delta = client.get(f'/api/sync?since={token}').json
+    assert delta['issues'] == [] and delta['deleted'] == [gone]
+    # A full fetch has no tombstones: the client starts from what exists
+    assert _ids(client.get('/api/sync').json) == [kept]
+
+def test_issue_leaving_a_block_is_a_tombstone_for_that_block(app, make_user, make_authority, make_issue, login):
+    user = make_user()
+    authority = make_authority(block='Jatani')
+    moved = make_issue(user, block='Jatani')
+    client = login(app, authority.email)
+    token = client.get('/api/sync').json['token']
+
+    db.session.get(Issue, moved).block = 'Bhubaneswar'
+    db.session.commit()
+    delta = client.get(f'/api/sync?since={token}').json
+    assert delta['issues'] == [] and delta['deleted'] == [moved]
+
+def test_sharded_cursor_keeps_one_position_per_shard(sharded_app, make_user, make_issue, login):
+    user = make_user()
+    primary = make_issue(user)
+    coastal = make_issue(user, district='Puri', block='Gop')
+    client = login(sharded_app, user.email)
+
+    full = client.get('/api/sync').json
+    assert _ids(full) == [primary, coastal]
+    primary_token, coastal_token = full['token'].split('.')
+
+    _set_status(coastal, 'In Progress')
+    delta = client.get(f"/api/sync?since={full['token']}").json
+    assert _ids(delta) == [coastal]
+    # Only the coastal shard's position moved
+    assert delta['token'].split('.')[0] == primary_token
+    assert int(delta['token'].split('.')[1]) > int(coastal_token)
+
+    with sharding.use_shard('coastal'):
+        db.session.delete(db.session.get(Issue, coastal))
+        db.session.commit()
+    delta = client.get(f"/api/sync?since={delta['token']}").json
+    assert delta['issues'] == [] and delta['deleted'] == [coastal]
+
+    # A token from another shard layout (or a bare one) is not silently misread
+    assert client.get(f'/api/sync?since={primary_token}').status_code == 400
+    assert client.get('/api/sync?since=0.0.0').status_code == 400
@@ -0,0 +1,129 @@
+import math
+import random
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select
+from database import db
+from models import Issue, ThresholdAlert
+import thresholds
+
+T0 = datetime(2024, 1, 1)
+TICK = timedelta(seconds=thresholds.TICK_SECONDS)
+
+# --- TIMING WHEEL ---
+
+def test_wheel_fires_every_key_on_its_tick_across_levels():
+    # 4 slots x 3 levels: deadlines past 4 and 16 ticks cascade, past 64 are re-filed from the top
+    wheel = thresholds.TimingWheel(tick=1, start=0, bits=2, levels=3)
+    rng = random.Random(7)
+    deadlines = {key: rng.randint(0, 200) for key in range(300)}
+    for key, deadline in deadlines.items():
+        wheel.schedule(key, deadline)
+
+    fired = {}
+    for now in range(0, 201):
+        for key in wheel.advance(now):
+            assert key not in fired
+            fired[key] = now
+    assert fired == deadlines
+    assert len(wheel) == 0
+
+def test_wheel_reschedule_and_cancel():
+    wheel = thresholds.TimingWheel(tick=10, start=0, bits=2, levels=3)
+    wheel.schedule('a', 95)  # rounds up to tick 10 (t=100)
+    wheel.schedule('b', 50)
+    wheel.schedule('a', 30)  # replaces the earlier deadline
+    wheel.cancel('b')
+    assert 'b' not in wheel
+    assert wheel.advance(29) == []
+    assert wheel.advance(30) == ['a']
+    assert wheel.advance(1000) == []
+
+# --- SCHEDULER ---
+
+def _hours(dt):
+    return (dt - thresholds.priority_index.EPOCH).total_seconds() / 3600
+
+def _at(hours):
+    return thresholds.priority_index.EPOCH + timedelta(hours=hours)
+
+def _alerts():
+    return db.session.execute(select(ThresholdAlert).order_by(ThresholdAlert.id)).scalars().all()
+
+def test_issue_alert_fires_once_at_its_crossing(app, make_user, make_issue):
+    # a = 6 * 1.7 * 1.5 * 4 = 61.2, b = 2 * 4 = 8: crosses 70 about two hours in
+    reporter = make_user(trust_score=4.0)
+    issue_id = make_issue(reporter, category='Water Leakage', severity_level='high',
+                          location_context='school', created_at=T0)
+    a, b = 61.2, 8.0
+    crossing = _at(_hours(T0) + math.exp((thresholds.HIGH_RISK_TARGET - a) / b) - 1)
+
+    scheduler = thresholds.ThresholdScheduler(now=T0)
+    scheduler.load(now=T0)
+    assert scheduler.advance(crossing - TICK) == []
+
+    alerts = scheduler.advance(crossing + TICK)
+    assert [(alert['issue_id'], alert['level']) for alert in alerts] == [(issue_id, 'high_risk')]
+    assert abs(alerts[0]['crossed_at'] - crossing) <= TICK
+    assert db.session.get(Issue, issue_id).severity_score > thresholds.HIGH_RISK_SCORE
+
+    # Already crossed: neither later turns nor a change that re-files the issue alert again
+    assert scheduler.advance(crossing + 100 * TICK) == []
+    db.session.get(Issue, issue_id).reporter_trust = 4.1
+    db.session.commit()
+    assert scheduler.catch_up(now=crossing + 101 * TICK) == 2  # the issue and its block
+    assert scheduler.advance(crossing + 200 * TICK) == []
+    assert len(_alerts()) == 1
+
+def test_already_high_issue_is_not_news_at_load(app, make_user, make_issue):
+    reporter = make_user(trust_score=4.0)
+    make_issue(reporter, category='Water Leakage', severity_level='high', location_context='school', created_at=T0)
+
+    later = T0 + timedelta(hours=5)  # past its crossing
+    scheduler = thresholds.ThresholdScheduler(now=later)
+    scheduler.load(now=later)
+    # Only the block's later move from orange to red is news
+    red = dict(thresholds.BLOCK_BANDS)['red']
+    alerts = scheduler.advance(later + timedelta(days=30))
+    assert [(alert['issue_id'], alert['level']) for alert in alerts] == [(None, 'red')]
+    assert abs(alerts[0]['crossed_at'] - _at(_hours(T0) + math.exp((red - 61.2) / 8.0) - 1)) <= TICK
+    assert [alert.level for alert in _alerts()] == ['red']
+
+def test_block_band_alert_fires_once_at_its_crossing(app, make_user, make_issue):
+    # Three issues with a = 5 * 1.3 * 1.1 = 7.15, b = 2: the block total reaches orange (50) near 115 h
+    reporter = make_user()
+    ids = [make_issue(reporter, severity_level='medium', location_context='residential', created_at=T0) for _ in range(3)]
+    n, a, b = 3, 7.15, 2.0
+    orange = dict(thresholds.BLOCK_BANDS)['orange']
+    crossing = _at(_hours(T0) + math.exp((orange - n * a) / (n * b)) - 1)
+
+    scheduler = thresholds.ThresholdScheduler(now=T0)
+    scheduler.load(now=T0)
+    assert scheduler.advance(crossing - TICK) == []
+
+    alerts = scheduler.advance(crossing + TICK)
+    assert [(alert['block'], alert['level']) for alert in alerts] == [('Jatani', 'orange')]
+    assert abs(alerts[0]['crossed_at'] - crossing) <= TICK
+    assert alerts[0]['score'] == pytest.approx(orange, abs=0.1)
+    # The block's stored scores were brought up to date with the alert
+    assert sum(db.session.get(Issue, issue_id).severity_score for issue_id in ids) == pytest.approx(orange, abs=0.1)
+
+    # Still orange a week later (red is years away): no second alert
+    assert scheduler.advance(crossing + timedelta(days=7)) == []
+    assert [alert.level for alert in _alerts()] == ['orange']
+
+def test_new_issue_pushing_block_over_a_band_alerts_now(app, make_user, make_issue):
+    reporter = make_user()
+    make_issue(reporter, created_at=T0)
+    scheduler = thresholds.ThresholdScheduler(now=T0)
+    scheduler.load(now=T0)
+
+    # One report big enough to put the block past orange on its own
+    make_issue(make_user('trusted@example.com', trust_score=4.0), category='Water Leakage',
+               severity_level='high', location_context='school', created_at=T0)
+    now = T0 + timedelta(minutes=1)
+    scheduler.catch_up(now=now)
+    alerts = scheduler.advance(now + TICK)
+    assert [alert['level'] for alert in alerts] == ['orange']
+    assert alerts[0]['crossed_at'] <= now + TICK
+    assert scheduler.advance(now + timedelta(hours=1)) == []
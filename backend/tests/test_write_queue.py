@@ -0,0 +1,68 @@
+import threading
+from sqlalchemy import func, select
+from database import db
+from models import Issue, IssueEvent
+import write_queue
+
+def _new_issue(user_id, title='Pothole'):
+    return Issue(user_id=user_id, title=title, description='d', category='Pothole',
+                 state='Odisha', district='Khordha', block='Jatani', severity_score=10.0)
+
+def _submit_concurrently(app, issues_per_thread):
+    """Runs save_issue for each thread's issues at once; returns [(id or exception)] per thread."""
+    results = [[] for _ in issues_per_thread]
+    start = threading.Barrier(len(issues_per_thread))
+
+    def submit(index, issues):
+        with app.app_context():
+            start.wait()
+            for issue in issues:
+                try:
+                    results[index].append(write_queue.save_issue(issue))
+                except Exception as e:
+                    results[index].append(e)
+
+    threads = [threading.Thread(target=submit, args=(i, issues)) for i, issues in enumerate(issues_per_thread)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_concurrent_submissions_are_all_kept(make_app, make_user):
+    app = make_app(WRITE_QUEUE_ENABLED=True)
+    user_id = make_user().id
+    results = _submit_concurrently(app, [[_new_issue(user_id) for _ in range(10)] for _ in range(8)])
+
+    ids = [issue_id for result in results for issue_id in result]
+    assert len(ids) == 80 and all(isinstance(issue_id, int) for issue_id in ids)
+    assert len(set(ids)) == 80
+    rows = db.session.execute(select(Issue.id, Issue.change_seq)).all()
+    assert {row.id for row in rows} == set(ids)
+    assert len({row.change_seq for row in rows}) == 80 and None not in {row.change_seq for row in rows}
+    created = db.session.execute(select(IssueEvent.issue_id).where(IssueEvent.kind == 'created')).scalars().all()
+    assert sorted(created) == sorted(ids)
+
+def test_failed_batch_is_reported_to_every_waiting_request(make_app, make_user, monkeypatch):
+    # A long window so every submission lands in one batch
+    app = make_app(WRITE_QUEUE_ENABLED=True, WRITE_QUEUE_MAX_DELAY_MS=500)
+    user_id = make_user().id
+
+    def fail(issues):
+        raise RuntimeError('database unavailable')
+
+    monkeypatch.setattr(write_queue.GroupCommitQueue, '_commit', staticmethod(fail))
+    results = _submit_concurrently(app, [[_new_issue(user_id)] for _ in range(5)])
+
+    assert all(len(result) == 1 and isinstance(result[0], RuntimeError) for result in results)
+    assert db.session.execute(select(func.count()).select_from(Issue)).scalar() == 0
+
+def test_bad_row_fails_only_its_own_request(make_app, make_user):
+    app = make_app(WRITE_QUEUE_ENABLED=True, WRITE_QUEUE_MAX_DELAY_MS=500)
+    user_id = make_user().id
+    results = _submit_concurrently(app, [[_new_issue(user_id, title=None)]] + [[_new_issue(user_id)] for _ in range(4)])
+
+    assert isinstance(results[0][0], Exception)
+    saved = [result[0] for result in results[1:]]
+    assert all(isinstance(issue_id, int) for issue_id in saved)
+    assert db.session.execute(select(Issue.id)).scalars().all() == sorted(saved)
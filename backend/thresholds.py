@@ -0,0 +1,443 @@
+import math
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, insert, select, update
+from database import db
+from models import Issue, IssueTombstone, ThresholdAlert
+import cri_engine
+import events
+import priority_index
+import sharding
+import sync
+
+# --- CONFIGURATION ---
+
+# The analytics high-risk line (an issue counts once severity_score > 70)
+HIGH_RISK_SCORE = 70
+# Stored scores are rounded to 2 places, so aim just past the line
+HIGH_RISK_TARGET = HIGH_RISK_SCORE + 0.01
+
+# Block bands, lowest first: a block's level is how many it has reached
+BLOCK_BANDS = sorted(cri_engine.CRI_THRESHOLDS.items(), key=lambda band: band[1])
+
+# Wheel resolution: crossings fire within one tick of the exact time
+TICK_SECONDS = 10
+# 64 slots per level, 4 levels: 64**4 ticks (~5 years at 10s) before a
+# deadline has to be re-filed from the top level
+WHEEL_BITS = 6
+WHEEL_LEVELS = 4
+
+# Crossings further out than this are filed as a re-check at the horizon instead
+MAX_HORIZON_HOURS = 24 * 365
+CROSSING_ITERATIONS = 40
+
+# Issue changes read per query while catching up with the change sequence
+CHANGE_BATCH = 5000
+
+def _hours(dt):
+    return (dt - priority_index.EPOCH).total_seconds() / 3600
+
+_risk = priority_index.BlockIndex.risk
+
+def _block_level(total):
+    return sum(1 for _, threshold in BLOCK_BANDS if total >= threshold)
+
+# --- TIMING WHEEL ---
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel (Varghese & Lauck, laid out like the classic
+    Linux timer wheel). Level 0 has one slot per tick and every level above
+    is 2**bits times coarser; an entry sits in the finest level whose range
+    covers its deadline and moves down a level each time the wheel turns
+    past its slot there. Scheduling and cancelling are O(1), and advancing
+    costs the ticks passed plus the entries that move or fire, however many
+    entries are waiting.
+    """
+
+    def __init__(self, tick, start, bits=WHEEL_BITS, levels=WHEEL_LEVELS):
+        self.tick = tick
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        self.levels = levels
+        self.current = int(start // tick)  # next tick to process
+        self.slots = [[{} for _ in range(1 << bits)] for _ in range(levels)]
+        self.where = {}  # key -> (level, index)
+
+    def __len__(self):
+        return len(self.where)
+
+    def __contains__(self, key):
+        return key in self.where
+
+    def schedule(self, key, when):
+        """Files `key` to come due at `when` (seconds); replaces its earlier deadline."""
+        self.cancel(key)
+        self._file(key, math.ceil(when / self.tick))
+
+    def cancel(self, key):
+        position = self.where.pop(key, None)
+        if position is not None:
+            del self.slots[position[0]][position[1]][key]
+
+    def _file(self, key, deadline):
+        delta = deadline - self.current
+        if delta < 0:
+            level, index = 0, self.current & self.mask
+        else:
+            slot_deadline = deadline
+            for level in range(self.levels):
+                if delta < 1 << (self.bits * (level + 1)):
+                    break
+            else:
+                # Beyond the top level's range: park at its far end and re-file from there
+                level = self.levels - 1
+                slot_deadline = self.current + (1 << (self.bits * self.levels)) - 1
+            index = (slot_deadline >> (self.bits * level)) & self.mask
+        self.slots[level][index][key] = deadline
+        self.where[key] = (level, index)
+
+    def _cascade(self, level):
+        index = (self.current >> (self.bits * level)) & self.mask
+        entries = self.slots[level][index]
+        self.slots[level][index] = {}
+        for key, deadline in entries.items():
+            self._file(key, deadline)
+        if index == 0 and level + 1 < self.levels:
+            self._cascade(level + 1)
+
+    def advance(self, now):
+        """Turns the wheel through `now` (seconds); returns the keys that came due."""
+        target = int(now // self.tick)
+        due = []
+        while self.current <= target:
+            index = self.current & self.mask
+            if index == 0 and self.levels > 1:
+                self._cascade(1)
+            slot = self.slots[0][index]
+            if slot:
+                self.slots[0][index] = {}
+                for key in slot:
+                    del self.where[key]
+                due.extend(slot)
+            self.current += 1
+        return due
+
+# --- SCHEDULER ---
+
+class IssueState:
+    """What the scheduler keeps per open issue."""
+    __slots__ = ('params', 'block', 'district', 'status', 'score', 'high')
+
+    def __init__(self, params, block, district, status, score, high):
+        self.params = params
+        self.block = block
+        self.district = district
+        self.status = status
+        self.score = score
+        self.high = high
+
+class ThresholdScheduler:
+    """
+    Files the next threshold crossing of every open issue (HIGH_RISK_SCORE)
+    and block (CRI_THRESHOLDS) in a timing wheel.
+
+    Risk only depends on time through b*log(hours + 1), so each crossing time
+    is known in advance: closed-form for an issue, a bisection over the
+    block's issues for a block. After the initial load, work is proportional
+    to crossings and changes: issues changed elsewhere are picked up from
+    the change sequence (sync.py) and only their issue and block are
+    re-filed; a firing writes the current scores back and records a
+    ThresholdAlert.
+
+    Keys carry the issue shard, so one scheduler covers every shard. Run a
+    single scheduler per deployment (`flask escalation-scheduler`).
+    """
+
+    def __init__(self, now=None):
+        now = now or datetime.utcnow()
+        self.rules = cri_engine.get_rule_set()
+        self.turned_at = _hours(now)  # hour the wheel was last advanced to
+        self.wheel = TimingWheel(TICK_SECONDS, _hours(now) * 3600)
+        self.issues = {}  # (shard, issue id) -> IssueState
+        self.blocks = {}  # (shard, block) -> set of issue ids
+        self.levels = {}  # (shard, block) -> band level last seen
+        self.heads = {}  # shard -> change_seq processed
+        self._dirty_issues = set()
+        self._dirty_blocks = set()
+
+    # --- loading and catching up ---
+
+    def _columns(self):
+        return (Issue.id, Issue.category, Issue.severity_level, Issue.location_context, Issue.created_at,
+                Issue.reporter_trust, Issue.block, Issue.district, Issue.status, Issue.severity_score)
+
+    def _apply_row(self, shard, row):
+        """Updates one issue from a row, noting it (and its blocks) for re-filing if anything relevant changed."""
+        issue_id, category, severity, location, created_at, trust, block, district, status, score = row
+        key = (shard, issue_id)
+        state = self.issues.get(key)
+        if status == 'Resolved':
+            if state is not None:
+                self._remove(key)
+            return
+        params = priority_index.issue_params(category, severity, location, created_at, trust, self.rules)
+        if state is not None and state.params == params and state.block == block:
+            state.score, state.status, state.district = score, status, district
+            return
+        if state is not None and state.block != block:
+            self._remove(key)
+            state = None
+        if state is None:
+            state = self.issues[key] = IssueState(params, block, district, status, score, False)
+            self.blocks.setdefault((shard, block), set()).add(issue_id)
+        state.params, state.status, state.score, state.district = params, status, score, district
+        self._dirty_issues.add(key)
+        self._dirty_blocks.add((shard, block))
+
+    def _remove(self, key):
+        state = self.issues.pop(key)
+        self.wheel.cancel(('issue',) + key)
+        self._dirty_issues.discard(key)
+        block_key = (key[0], state.block)
+        self.blocks[block_key].discard(key[1])
+        self._dirty_blocks.add(block_key)
+
+    def load(self, now=None):
+        """Reads every open issue of every shard and files all crossings."""
+        now_hours = _hours(now or datetime.utcnow())
+        self.turned_at = now_hours
+        for shard in sharding.shard_names():
+            with sharding.use_shard(shard):
+                self.heads[shard] = sync.current_sequence(db.session.connection())
+                for row in db.session.execute(select(*self._columns()).where(Issue.status != 'Resolved')):
+                    self._apply_row(shard, row)
+                db.session.remove()
+        self._dirty_issues.clear()
+        self._dirty_blocks.clear()
+        # Where things already stand is not news: remember it, alert only on later crossings
+        for key, state in self.issues.items():
+            state.high = _risk(state.params, now_hours) > HIGH_RISK_TARGET
+            self._file_issue(key, now_hours)
+        for block_key in self.blocks:
+            self.levels[block_key] = _block_level(self._block_total(block_key, now_hours))
+            self._file_block(block_key, now_hours)
+
+    def catch_up(self, now=None):
+        """Applies issue changes committed since the last call and re-files what they affect."""
+        now_hours = _hours(now or datetime.utcnow())
+        for shard in sharding.shard_names():
+            with sharding.use_shard(shard):
+                connection = db.session.connection()
+                # Numbers become visible in commit order (sync.next_sequence):
+                # everything up to the head read first is already committed
+                head = sync.current_sequence(connection)
+                since = self.heads.get(shard, 0)
+                seen = set()
+                while True:
+                    rows = connection.execute(
+                        select(*self._columns(), Issue.change_seq).where(Issue.change_seq > since)
+                        .order_by(Issue.change_seq).limit(CHANGE_BATCH)
+                    ).all()
+                    for row in rows:
+                        self._apply_row(shard, tuple(row[:-1]))
+                        seen.add(row[0])
+                    if len(rows) < CHANGE_BATCH:
+                        break
+                    since = rows[-1][-1]
+                deleted = connection.execute(
+                    select(IssueTombstone.issue_id).where(IssueTombstone.change_seq > self.heads.get(shard, 0))
+                ).scalars().all()
+                # A tombstone also marks an issue leaving a block; if its row changed too, it still exists
+                for issue_id in set(deleted) - seen:
+                    if (shard, issue_id) in self.issues:
+                        self._remove((shard, issue_id))
+                self.heads[shard] = head
+                db.session.remove()
+
+        for key in self._dirty_issues:
+            self._file_issue(key, now_hours)
+        for block_key in self._dirty_blocks:
+            self._file_block(block_key, now_hours)
+        changed = len(self._dirty_issues) + len(self._dirty_blocks)
+        self._dirty_issues.clear()
+        self._dirty_blocks.clear()
+        return changed
+
+    # --- crossing times ---
+
+    def _block_total(self, block_key, hours):
+        shard = block_key[0]
+        return sum(_risk(self.issues[(shard, issue_id)].params, hours) for issue_id in self.blocks.get(block_key, ()))
+
+    def _file_issue(self, key, now_hours):
+        state = self.issues[key]
+        wheel_key = ('issue',) + key
+        if _risk(state.params, now_hours) > HIGH_RISK_TARGET:
+            if state.high:
+                self.wheel.cancel(wheel_key)  # risk only grows until the issue changes
+            else:
+                self.wheel.schedule(wheel_key, now_hours * 3600)  # crossed by a change: alert now
+            return
+        state.high = False
+        a, b, c = state.params
+        if b <= 0 or math.isinf(c):
+            self.wheel.cancel(wheel_key)  # no time escalation: never crosses on its own
+            return
+        exponent = (HIGH_RISK_TARGET - a) / b
+        when = c + math.exp(exponent) - 1 if exponent < math.log(MAX_HORIZON_HOURS * 2) else math.inf
+        self.wheel.schedule(wheel_key, min(max(when, now_hours), now_hours + MAX_HORIZON_HOURS) * 3600)
+
+    def _file_block(self, block_key, now_hours):
+        wheel_key = ('block',) + block_key
+        total = self._block_total(block_key, now_hours)
+        level = _block_level(total)
+        if level > self.levels.get(block_key, 0):
+            self.wheel.schedule(wheel_key, now_hours * 3600)  # crossed by a change: alert now
+            return
+        self.levels[block_key] = level
+        if level == len(BLOCK_BANDS) or not self.blocks.get(block_key):
+            self.wheel.cancel(wheel_key)
+            return
+        threshold = BLOCK_BANDS[level][1]
+        horizon = now_hours + MAX_HORIZON_HOURS
+        if self._block_total(block_key, horizon) < threshold:
+            self.wheel.schedule(wheel_key, horizon * 3600)  # re-check then
+            return
+        # Block risk never decreases with time: bisect for the first hour at the threshold
+        lo, hi = now_hours, horizon
+        for _ in range(CROSSING_ITERATIONS):
+            mid = (lo + hi) / 2
+            if self._block_total(block_key, mid) >= threshold:
+                hi = mid
+            else:
+                lo = mid
+        self.wheel.schedule(wheel_key, hi * 3600)
+
+    # --- firing ---
+
+    def advance(self, now=None):
+        """Fires every crossing due by `now`; returns the alerts written, as dicts."""
+        now = now or datetime.utcnow()
+        now_hours = _hours(now)
+        by_shard = {}
+        for kind, shard, name in self.wheel.advance(now_hours * 3600):
+            by_shard.setdefault(shard, []).append((kind, name))
+
+        alerts = []
+        for shard, due in by_shard.items():
+            scores = {}  # issue id -> new score
+            shard_alerts = []
+            for kind, name in due:
+                if kind == 'issue':
+                    shard_alerts += self._fire_issue((shard, name), now_hours, scores)
+                else:
+                    shard_alerts += self._fire_block((shard, name), now_hours, scores)
+            if scores or shard_alerts:
+                with sharding.use_shard(shard):
+                    self._write(shard, scores, shard_alerts, now)
+                alerts += shard_alerts
+        self.turned_at = now_hours
+        return alerts
+
+    def _fire_issue(self, key, now_hours, scores):
+        state = self.issues.get(key)
+        if state is None:
+            return []
+        risk = round(_risk(state.params, now_hours), 2)
+        if risk <= HIGH_RISK_SCORE or state.high:
+            self._file_issue(key, now_hours)  # early by a tick's rounding: file again
+            return []
+        state.high = True
+        scores[key[1]] = risk
+        crossed = self._crossed_at(lambda hours: _risk(state.params, hours), HIGH_RISK_TARGET, now_hours)
+        return [{'issue_id': key[1], 'district': state.district, 'block': state.block,
+                 'level': 'high_risk', 'score': risk, 'crossed_at': crossed}]
+
+    def _fire_block(self, block_key, now_hours, scores):
+        total = self._block_total(block_key, now_hours)
+        level = _block_level(total)
+        previous = self.levels.get(block_key, 0)
+        alerts = []
+        if level > previous:
+            shard = block_key[0]
+            district = None
+            # Bring the block's stored scores up to date so the map shows the new band
+            for issue_id in self.blocks[block_key]:
+                state = self.issues[(shard, issue_id)]
+                scores[issue_id] = round(_risk(state.params, now_hours), 2)
+                district = state.district
+            name, threshold = BLOCK_BANDS[level - 1]
+            crossed = self._crossed_at(lambda hours: self._block_total(block_key, hours), threshold, now_hours)
+            alerts.append({'issue_id': None, 'district': district,
+                           'block': block_key[1], 'level': name, 'score': round(total, 2), 'crossed_at': crossed})
+            self.levels[block_key] = level
+        self._file_block(block_key, now_hours)
+        return alerts
+
+    def _crossed_at(self, risk_at, threshold, now_hours):
+        # Time escalation crossed it since the last turn (deadlines round up to
+        # a tick, so from one tick before it): bisect for the moment. Already
+        # past it then => a change to the issue(s) did, just now.
+        lo, hi = self.turned_at - TICK_SECONDS / 3600, now_hours
+        if risk_at(lo) >= threshold:
+            lo = hi
+        for _ in range(CROSSING_ITERATIONS):
+            if hi - lo < 1 / 3600:
+                break
+            mid = (lo + hi) / 2
+            if risk_at(mid) >= threshold:
+                hi = mid
+            else:
+                lo = mid
+        return priority_index.EPOCH + timedelta(hours=hi)
+
+    def _write(self, shard, scores, alerts, now):
+        """One executemany score UPDATE (with change numbers and score events) plus the alerts, in one commit."""
+        updates = []
+        previous = {}
+        block_of = {}
+        status_of = {}
+        for issue_id, score in scores.items():
+            state = self.issues[(shard, issue_id)]
+            if state.score is not None and abs(state.score - score) < 0.01:
+                continue
+            updates.append({'b_id': issue_id, 'b_score': score})
+            previous[issue_id] = state.score
+            block_of[issue_id] = state.block
+            status_of[issue_id] = state.status
+            state.score = score
+        connection = db.session.connection()
+        if updates:
+            table = Issue.__table__
+            sync.stamp_updates(connection, updates)
+            connection.execute(update(table).where(table.c.id == bindparam('b_id'), table.c.status != 'Resolved').values(
+                severity_score=bindparam('b_score'), rule_version=self.rules.version, change_seq=bindparam('b_seq')
+            ), updates)
+            events.record_events(connection, events.score_events(updates, previous, block_of, status_of))
+        if alerts:
+            connection.execute(insert(ThresholdAlert.__table__), [{**alert, 'ts': now} for alert in alerts])
+        db.session.commit()
+        db.session.remove()
+
+def run(stop=None, progress=None):
+    """
+    Runs the scheduler until `stop` (a threading.Event) is set: catch up with
+    issue changes and turn the wheel once per tick.
+    """
+    scheduler = ThresholdScheduler()
+    scheduler.load()
+    if progress:
+        progress(f'Tracking {len(scheduler.issues)} open issues in {len(scheduler.blocks)} blocks '
+                 f'({len(scheduler.wheel)} crossings filed).')
+    while stop is None or not stop.is_set():
+        scheduler.catch_up()
+        for alert in scheduler.advance():
+            if progress:
+                subject = f"issue {alert['issue_id']}" if alert['issue_id'] is not None else f"block {alert['block']}"
+                progress(f"{subject} crossed {alert['level']} ({alert['score']}) at {alert['crossed_at']:%Y-%m-%d %H:%M:%S}")
+        wait = TICK_SECONDS - time.time() % TICK_SECONDS
+        if stop is not None:
+            stop.wait(wait)
+        else:
+            time.sleep(wait)
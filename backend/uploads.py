@@ -0,0 +1,133 @@
+import os
+import re
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from werkzeug.utils import secure_filename
+from database import db
+from models import UploadSession
+
+# --- CONFIGURATION ---
+
+# Bytes copied from the request stream per write; nothing larger is ever buffered
+COPY_BUFFER = 256 * 1024
+
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+class UploadError(Exception):
+    """Client error in the upload protocol; `status` is the HTTP status to return."""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+# --- SESSIONS ---
+
+def _part_path(upload_id):
+    return os.path.join(current_app.config['UPLOAD_PARTIAL_FOLDER'], f'{upload_id}.part')
+
+def allowed_file(filename):
+    ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return ext in current_app.config['ALLOWED_EXTENSIONS']
+
+def create_session(filename, size):
+    """Registers an upload of `size` bytes and creates its empty .part file."""
+    filename = secure_filename(filename or '')
+    if not filename or not allowed_file(filename):
+        raise UploadError('File type not allowed')
+    if size <= 0 or size > current_app.config['UPLOAD_MAX_BYTES']:
+        raise UploadError('Invalid upload size', status=413)
+
+    upload = UploadSession(id=uuid.uuid4().hex, filename=filename, size=size)
+    os.makedirs(current_app.config['UPLOAD_PARTIAL_FOLDER'], exist_ok=True)
+    open(_part_path(upload.id), 'wb').close()
+    db.session.add(upload)
+    db.session.commit()
+    return upload
+
+def get_session(upload_id):
+    upload = db.session.get(UploadSession, upload_id) if upload_id else None
+    if upload is None:
+        raise UploadError('Unknown upload', status=404)
+    return upload
+
+def current_offset(upload):
+    """Bytes received so far: the .part file's size, so it survives crashes and restarts."""
+    if upload.completed_at:
+        return upload.size
+    try:
+        return os.path.getsize(_part_path(upload.id))
+    except OSError:
+        return 0
+
+def write_chunk(upload, content_range, stream, length):
+    """
+    Writes one `bytes start-end/total` range from `stream` straight to disk.
+    A range may start anywhere up to the current offset (re-sending bytes
+    already received after a dropped connection is harmless) but not beyond it.
+    Returns the new offset.
+    """
+    if upload.completed_at:
+        raise UploadError('Upload already finalized', status=409, offset=upload.size)
+    match = CONTENT_RANGE.match(content_range or '')
+    if not match:
+        raise UploadError('Content-Range must be "bytes start-end/total"')
+    start, end, total = (int(v) for v in match.groups())
+    if total != upload.size or end < start or end >= total or (length is not None and length != end - start + 1):
+        raise UploadError('Content-Range does not match the upload')
+    if end - start + 1 > current_app.config['UPLOAD_CHUNK_MAX_BYTES']:
+        raise UploadError('Chunk too large', status=413)
+    offset = current_offset(upload)
+    if start > offset:
+        raise UploadError('Range starts past the received bytes', status=409, offset=offset)
+
+    remaining = end - start + 1
+    with open(_part_path(upload.id), 'r+b') as f:
+        f.seek(start)
+        while remaining:
+            data = stream.read(min(COPY_BUFFER, remaining))
+            if not data:
+                break  # client went away; whatever arrived is kept
+            f.write(data)
+            remaining -= len(data)
+    return current_offset(upload)
+
+def finalize(upload):
+    """Moves a fully received upload into UPLOAD_FOLDER; returns its stored name."""
+    if upload.completed_at:
+        return upload.stored_name
+    offset = current_offset(upload)
+    if offset != upload.size:
+        raise UploadError('Upload incomplete', status=409, offset=offset)
+
+    stored_name = f'{upload.id[:12]}_{upload.filename}'
+    upload_folder = current_app.config.get('UPLOAD_FOLDER', 'static/uploads')
+    os.makedirs(upload_folder, exist_ok=True)
+    os.replace(_part_path(upload.id), os.path.join(upload_folder, stored_name))
+    upload.stored_name = stored_name
+    upload.completed_at = datetime.utcnow()
+    db.session.commit()
+    return stored_name
+
+def resolve_upload(upload_id):
+    """Stored file name of a finalized upload, for attaching to an Issue by reference."""
+    upload = get_session(upload_id)
+    if not upload.completed_at:
+        raise UploadError('Upload not finalized', status=409, offset=current_offset(upload))
+    return upload.stored_name
+
+def prune_sessions(max_age_seconds):
+    """Deletes unfinished uploads older than `max_age_seconds` and their .part files."""
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age_seconds)
+    stale = UploadSession.query.filter(
+        UploadSession.completed_at.is_(None), UploadSession.created_at < cutoff
+    ).all()
+    for upload in stale:
+        try:
+            os.remove(_part_path(upload.id))
+        except FileNotFoundError:
+            pass
+        db.session.delete(upload)
+    db.session.commit()
+    return len(stale)
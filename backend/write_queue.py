@@ -0,0 +1,110 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from flask import current_app
+from database import db
+import sharding
+
+# --- GROUP COMMIT QUEUE ---
+
+class GroupCommitQueue:
+    """
+    Write-behind queue for new issues. One writer thread per process collects
+    submissions for up to `max_delay` seconds (or `max_batch` rows) and commits
+    them in a single transaction, so a burst pays one lock acquisition and one
+    fsync per batch instead of per report. Callers block until their batch has
+    committed, so an acknowledged report is always durable.
+    """
+
+    def __init__(self, app, max_batch, max_delay):
+        self.app = app
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.pid = os.getpid()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='issue-group-commit', daemon=True)
+        self._thread.start()
+
+    def submit(self, issue, timeout=None):
+        """Queues a transient Issue and waits for its batch; returns the new issue id."""
+        future = Future()
+        self._queue.put((issue, future))
+        return future.result(timeout)
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            with self.app.app_context():
+                try:
+                    self._commit([issue for issue, _ in batch])
+                    for issue, future in batch:
+                        future.set_result(issue.id)
+                except Exception:
+                    db.session.rollback()
+                    # One bad row must not fail its neighbours: retry one by one
+                    for issue, future in batch:
+                        try:
+                            self._commit([issue])
+                            future.set_result(issue.id)
+                        except Exception as e:
+                            db.session.rollback()
+                            future.set_exception(e)
+                finally:
+                    db.session.remove()
+
+    @staticmethod
+    def _commit(issues):
+        # One transaction per issue shard the batch touches
+        by_shard = {}
+        for issue in issues:
+            by_shard.setdefault(sharding.shard_for_district(issue.district), []).append(issue)
+        for shard, group in by_shard.items():
+            with sharding.use_shard(shard):
+                db.session.add_all(group)
+                db.session.commit()
+                for issue in group:
+                    issue.id  # load the id while the object is still attached
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+def _get_queue(app):
+    # Keyed by pid: a queue (and its thread) created before a fork is not inherited
+    key = (id(app), os.getpid())
+    with _queues_lock:
+        if key not in _queues:
+            _queues[key] = GroupCommitQueue(
+                app, app.config['WRITE_QUEUE_MAX_BATCH'], app.config['WRITE_QUEUE_MAX_DELAY_MS'] / 1000.0
+            )
+        return _queues[key]
+
+def save_issue(issue):
+    """
+    Persists a new Issue and returns its id. With WRITE_QUEUE_ENABLED the row
+    is group-committed by the writer thread; otherwise it is committed on the
+    request's own session as before.
+    """
+    app = current_app._get_current_object()
+    if not app.config.get('WRITE_QUEUE_ENABLED'):
+        db.session.add(issue)
+        db.session.commit()
+        return issue.id
+    # Hand this request's pooled connection back while waiting; otherwise enough
+    # waiting requests would starve the writer thread of a connection.
+    db.session.commit()
+    return _get_queue(app).submit(issue, timeout=app.config['WRITE_QUEUE_TIMEOUT'])
@@ -1,4 +1,5 @@
 import 'dart:convert';
+import 'dart:math';
 import 'package:http/http.dart' as http;
 import 'package:fixity_mobile/models/issue.dart';
 
@@ -7,10 +8,20 @@ class ApiService {
   // Current LAN IP: 10.107.61.242 (Updated: 2025-12-24)
   static const String baseUrl = 'http://10.89.186.242:8000/api';
 
+  // Identifies this device to the server's per-device upload rate limit.
+  // Sent as a header so the server can decide before reading the upload.
+  static final String clientId = _newClientId();
+
+  static String _newClientId() {
+    final random = Random.secure();
+    return List.generate(16, (_) => random.nextInt(256).toRadixString(16).padLeft(2, '0')).join();
+  }
+
   Future<void> submitIssue(Issue issue) async {
     final uri = Uri.parse('$baseUrl/mobile/report');
 
     final request = http.MultipartRequest('POST', uri);
+    request.headers['X-Client-Id'] = clientId;
 
     // Add fields
     request.fields.addAll(issue.toFields());